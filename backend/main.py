@@ -5,6 +5,8 @@ import os
 from datetime import datetime
 import sys
 import io
+import asyncio
+import logging
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -14,9 +16,20 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.resume_parser import ResumeParser
 from utils.job_parser import JobDescriptionParser
 from utils.scoring_engine_openai import ScoringEngine as OpenAIScoringEngine
+from config import config
+
+# Logging is configured by the application entry point, not by the library modules
+logging.basicConfig(level=config.logging.level, format=config.logging.format)
+
+# Serialize responses with orjson when it is installed; scoring results are large nested dicts
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
 
 # Initialize FastAPI app
-app = FastAPI(title="Scorj API")
+app = FastAPI(title="Scorj API", default_response_class=DefaultResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -32,10 +45,21 @@ resume_parser = ResumeParser()
 job_parser = JobDescriptionParser()
 scoring_engine = OpenAIScoringEngine()
 
+@app.on_event("shutdown")
+async def close_scoring_engine():
+    # Release the engine's pooled OpenAI connections (while their event loop still runs) and analysis threads
+    await scoring_engine.aclose()
+
 # Preload embedding model at startup to avoid loading delays
 from utils.embedding_matcher import EmbeddingSkillsMatcher
 EmbeddingSkillsMatcher.preload_model()
 
+def _parse_resume_file(filename: str, file_content: bytes):
+    file_stream = io.BytesIO(file_content)
+    if filename.endswith('.pdf'):
+        return resume_parser.parse_pdf(file_stream)
+    return resume_parser.parse_docx(file_stream)
+
 @app.post("/resume/score")
 async def score_resume(
     resume: UploadFile = File(...),
@@ -60,12 +84,15 @@ async def score_resume(
         raise HTTPException(status_code=400, detail="Unsupported file format. Please upload PDF or DOCX files only.")
     
     file_content = await resume.read()
-    file_stream = io.BytesIO(file_content)
     
-    if resume.filename.endswith('.pdf'):
-        resume_data = resume_parser.parse_pdf(file_stream)
-    elif resume.filename.endswith('.docx'):
-        resume_data = resume_parser.parse_docx(file_stream)
+    # Resume and job parsing are independent blocking model/network calls, so they run side by side
+    if job_url:
+        parse_job = asyncio.to_thread(job_parser.parse_linkedin_job, job_url.strip())
+    else:
+        parse_job = asyncio.to_thread(job_parser.parse_job_description_text, job_description.strip())
+    resume_data, job_data = await asyncio.gather(
+        asyncio.to_thread(_parse_resume_file, resume.filename, file_content), parse_job
+    )
     
     if not resume_data:
         raise HTTPException(status_code=400, detail="Could not parse resume content")
@@ -74,20 +101,12 @@ async def score_resume(
         resume_data['user_comments'] = user_comments.strip()
         resume_data['full_text'] = resume_data.get('full_text', '') + f"\n\nAdditional Context from User:\n{user_comments.strip()}"
     
-    # Parse job description
-    if job_url:
-        job_data = job_parser.parse_linkedin_job(job_url.strip())
-        
-        if not job_data:
-            raise HTTPException(status_code=400, detail="Could not parse job description from URL")
-    else:
-        job_data = job_parser.parse_job_description_text(job_description.strip())
-        
-        if not job_data:
-            raise HTTPException(status_code=400, detail="Could not parse job description text")
+    if not job_data:
+        detail = "Could not parse job description from URL" if job_url else "Could not parse job description text"
+        raise HTTPException(status_code=400, detail=detail)
     
-    # Calculate score
-    result = scoring_engine.calculate_score(resume_data, job_data)
+    # Calculate score without blocking the event loop during the model calls
+    result = await scoring_engine.calculate_score_async(resume_data, job_data)
     score = result.get('final_score', result.get('overall_score', 0))
     feedback = result
     
@@ -125,12 +144,12 @@ async def compare_multiple_jobs(
         raise HTTPException(status_code=400, detail="Unsupported file format. Please upload PDF or DOCX files only.")
     
     file_content = await resume.read()
-    file_stream = io.BytesIO(file_content)
     
-    if resume.filename.endswith('.pdf'):
-        resume_data = resume_parser.parse_pdf(file_stream)
-    elif resume.filename.endswith('.docx'):
-        resume_data = resume_parser.parse_docx(file_stream)
+    # The resume and every job URL are parsed concurrently; each is a blocking model/network call
+    resume_data, *parsed_job_data = await asyncio.gather(
+        asyncio.to_thread(_parse_resume_file, resume.filename, file_content),
+        *(asyncio.to_thread(job_parser.parse_linkedin_job, job_url) for job_url in urls_list)
+    )
     
     if not resume_data:
         raise HTTPException(status_code=400, detail="Could not parse resume content")
@@ -139,29 +158,33 @@ async def compare_multiple_jobs(
         resume_data['user_comments'] = user_comments.strip()
         resume_data['full_text'] = resume_data.get('full_text', '') + f"\n\nAdditional Context from User:\n{user_comments.strip()}"
     
-    # Parse and score each job
+    # Score all parsed jobs concurrently
     results = []
-    for job_url in urls_list:
-        job_data = job_parser.parse_linkedin_job(job_url)
-        
+    parsed_jobs = []
+    for job_url, job_data in zip(urls_list, parsed_job_data):
         if not job_data:
             results.append({
                 "job_url": job_url,
                 "error": "Could not parse job description from URL"
             })
             continue
-            
-        result = scoring_engine.calculate_score(resume_data, job_data)
+        
+        parsed_jobs.append((len(results), job_url, job_data))
+        results.append(None)
+    
+    scored = await scoring_engine.score_many([(resume_data, job_data) for _, _, job_data in parsed_jobs])
+    
+    for (index, job_url, job_data), result in zip(parsed_jobs, scored):
         score = result.get('final_score', result.get('overall_score', 0))
         feedback = result
-        results.append({
+        results[index] = {
             "job_url": job_url,
             "job_title": job_data.get("title", "Unknown"),
             "company": job_data.get("company", "Unknown"),
             "score": score,
             "feedback": feedback,
             "model_used": "openai"
-        })
+        }
     
     return results
 
@@ -192,8 +215,6 @@ async def chat_with_ai(
     context: Optional[str] = Form(None)  # Optional context about recent scoring
 ):
     
-    import openai
-    
     messages = [
         {
             "role": "system", 
@@ -205,8 +226,10 @@ async def chat_with_ai(
         }
     ]
     
-    client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    response = client.chat.completions.create(
+    # Reuse the scoring engine's client and its warm connection pool instead of opening a new one per
+    # question; the call runs in a worker thread so the event loop keeps serving other requests
+    response = await asyncio.to_thread(
+        scoring_engine.openai_client.chat.completions.create,
         model="gpt-4o-mini",
         messages=messages,
         max_tokens=500,
@@ -44,6 +44,29 @@ class ScoringConfig:
     max_tokens: int = 2000
     timeout_seconds: int = 30
     
+    # Input token budget for the per-request prompt; resume/job text is truncated proportionally to fit
+    max_prompt_input_tokens: int = 6000
+    # When a resume is over its share of the budget, keep the lines most similar to the job description
+    # (in original order) instead of cutting the tail off
+    salient_resume_truncation: bool = True
+    
+    # Packed scoring (several candidates per completion): packs are split so the combined prompt and the
+    # per-candidate output allowance (max_tokens each) stay within these limits
+    max_pack_input_tokens: int = 60000
+    max_pack_output_tokens: int = 16000
+    
+    # Skip the model call for candidates below this skills match % who also miss the experience level and
+    # left no comments; they get a fixed low score instead. None disables the shortcut
+    fast_reject_skills_threshold: Optional[float] = None
+    fast_reject_score: int = 5
+    
+    # Analyze short comments that only state a work arrangement, start date or seniority ("Remote only, can
+    # start immediately") with local patterns instead of a model call
+    local_comment_analysis: bool = False
+    
+    # Worker threads for local structured analysis in async/bulk scoring (embedding inference releases the GIL)
+    analysis_workers: int = min(32, (os.cpu_count() or 1) + 4)
+    
     # Confidence thresholds
     high_confidence_threshold: float = 0.8
     medium_confidence_threshold: float = 0.6
@@ -61,6 +84,23 @@ class CacheConfig:
     job_cache_dir: str = "job_descriptions"
     resume_cache_dir: str = "resumes"
     results_cache_dir: str = "scoring_results"
+    results_cache_enabled: bool = True
+    results_cache_hours: int = 24
+    results_memory_entries: int = 256
+    # Parsed model results keyed by the exact request (model, sampling settings, messages); catches inputs
+    # that differ only in fields the prompt does not use
+    prompt_cache_entries: int = 1024
+    # Reuse a cached result for a resume whose text is this similar (word-trigram Jaccard) to one already
+    # scored against the same job, with identical structured fields and comments. None disables it
+    near_duplicate_threshold: Optional[float] = None
+    near_duplicate_entries: int = 1024
+    # Comment analyses kept in memory, keyed by comments and the job requirements they were validated against
+    comment_analysis_entries: int = 1024
+    # Reuse the analysis of earlier comments for the same job when the two comments' embeddings reach this
+    # cosine similarity; None disables the (embedding-costing) semantic tier
+    comment_semantic_threshold: Optional[float] = None
+    comment_semantic_entries: int = 256  # per job
+    comment_semantic_jobs: int = 64
     max_cache_size_mb: int = 100
     cleanup_interval_hours: int = 168  # 1 week
 
@@ -71,10 +111,26 @@ class APIConfig:
     openai_api_key: str = None
     gemini_api_key: str = None
     max_requests_per_minute: int = 60
+    max_tokens_per_minute: int = 200000
+    max_concurrent_requests: int = 10
+    # Backoff for rate-limited (429) and overloaded (503) responses
+    max_retries: int = 3
+    retry_base_delay: float = 1.0
+    # Status polling for Batch API jobs: first interval, doubling up to the max
+    batch_poll_interval_seconds: float = 30.0
+    batch_poll_max_interval_seconds: float = 300.0
+    # Pooled HTTP connections shared by concurrent async calls (HTTP/2 when the h2 package is installed)
+    http2: bool = True
+    max_keepalive_connections: int = 32
+    max_connections: int = 64
+    # Consecutive failed calls (after retries) before scoring stops calling the API for the reset window
+    circuit_breaker_failures: int = 3
+    circuit_breaker_reset_seconds: float = 30.0
     
     def __post_init__(self):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.gemini_api_key = os.getenv("GOOGLE_API_KEY")
+        self.max_concurrent_requests = int(os.getenv("OPENAI_MAX_CONCURRENCY", self.max_concurrent_requests))
 
 
 @dataclass
@@ -1,5 +1,8 @@
+import numpy as np
 import pytest
+from unittest.mock import MagicMock, PropertyMock, patch
 from utils.base_scoring_engine import BaseScoringEngine
+from utils.embedding_matcher import EmbeddingSkillsMatcher, normalize_skill_names
 
 def test_enhanced_skills_matching():
     """
@@ -68,4 +71,80 @@ def test_simplified_scoring_tiers():
     
     assert score_85 == "Strong Match"
     assert score_50 == "Good Match"
-    assert score_20 == "Weak Match"
\ No newline at end of file
+    assert score_20 == "Weak Match"
+
+def test_embedding_cache_reuses_encoded_texts():
+    """
+    Tests that repeated texts are served from the embedding cache and that
+    returned vectors are unit length, so dot products are cosine similarities.
+    """
+    def fake_encode(texts, normalize_embeddings):
+        vectors = np.array([[len(text), 1.0] for text in texts])
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    fake_model = MagicMock()
+    fake_model.encode.side_effect = fake_encode
+
+    matcher = EmbeddingSkillsMatcher(model_name="fake-model")
+    with patch.object(EmbeddingSkillsMatcher, 'model', new_callable=PropertyMock, return_value=fake_model):
+        first = matcher.get_embeddings(["Python", "SQL"])
+        second = matcher.get_embeddings(["sql", "Python", "Docker"])
+
+    assert np.allclose(np.linalg.norm(second, axis=1), 1.0)
+    assert np.allclose(first[0], second[1])
+    # Only "docker" was new on the second call
+    assert fake_model.encode.call_args_list[-1].args[0] == ["docker"]
+
+def test_normalize_skill_names_drops_blanks_and_keeps_originals():
+    """
+    Tests that skill normalization keeps original names aligned with their
+    lowercase forms and returns the same interned strings for equal skills.
+    """
+    originals, names = normalize_skill_names(("Python ", "  ", "SQL"))
+
+    assert originals == ("Python ", "SQL")
+    assert names == ("python", "sql")
+    assert normalize_skill_names((" PYTHON",))[1][0] is names[0]
+
+def test_batch_similarity_matches_single_resume_results():
+    """
+    Tests that matching several resumes against one job in a single batch gives
+    the same per-resume results as matching them one at a time.
+    """
+    def fake_encode(texts, normalize_embeddings):
+        vectors = np.array([[len(text), text.count('a') + 1.0] for text in texts])
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    fake_model = MagicMock()
+    fake_model.encode.side_effect = fake_encode
+
+    matcher = EmbeddingSkillsMatcher(model_name="fake-batch-model")
+    resume_skill_lists = [["Python", "Java"], [], ["Kubernetes", "SQL", "Scala"]]
+    job_skills = ["Java", "SQL"]
+    with patch.object(EmbeddingSkillsMatcher, 'model', new_callable=PropertyMock, return_value=fake_model):
+        batched = matcher.calculate_semantic_similarity_batch(resume_skill_lists, job_skills)
+        single = [matcher.calculate_semantic_similarity(skills, job_skills) for skills in resume_skill_lists]
+
+    assert batched == single
+    # Every skill was encoded by the batch call; the single calls were all cache hits
+    assert fake_model.encode.call_count == 1
+
+def test_skill_aliases_are_embedded_as_canonical_names():
+    """
+    Tests that known skill aliases are embedded as their canonical name, so
+    abbreviations the encoder cannot relate still match exactly.
+    """
+    def fake_encode(texts, normalize_embeddings):
+        vectors = np.array([[float(sum(map(ord, text)) % 97), 1.0] for text in texts])
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    fake_model = MagicMock()
+    fake_model.encode.side_effect = fake_encode
+
+    matcher = EmbeddingSkillsMatcher(model_name="fake-alias-model", skill_aliases={'k8s': 'kubernetes'})
+    with patch.object(EmbeddingSkillsMatcher, 'model', new_callable=PropertyMock, return_value=fake_model):
+        result = matcher.calculate_semantic_similarity(["K8s"], ["Kubernetes"])
+
+    assert result['matched_skills'] == ['Kubernetes']
+    assert result['skill_matches'][0]['resume_skill'] == 'K8s'
+    assert result['skill_matches'][0]['similarity'] == pytest.approx(1.0)
@@ -1,8 +1,14 @@
+import asyncio
 import pytest
 import json
-from unittest.mock import patch, MagicMock
+import httpx
+import numpy as np
+from openai import RateLimitError
+from unittest.mock import patch, MagicMock, AsyncMock
+from config import config
 from utils.structured_comments import (
     process_user_comments,
+    process_user_comments_many_async,
     GPTMultiDimensionalAnalyzer,
     MultiDimensionalAnalysis,
     TechnicalAlignment,
@@ -11,6 +17,7 @@ from utils.structured_comments import (
     RoleFocusAlignment,
     ExperienceLevelAlignment,
     calculate_multi_dimensional_bonuses,
+    calculate_multi_dimensional_bonuses_batch,
     generate_multi_dimensional_feedback
 )
 
@@ -62,6 +69,11 @@ def test_calculate_multi_dimensional_bonuses():
     assert 'availability' not in bonuses # Score is 0, so no bonus key
     assert bonuses['role_focus'] == pytest.approx(0.7 * (0.2 * 20))
     assert bonuses['experience_level'] == pytest.approx(0.5 * (0.2 * 20))
+    
+    # The batched calculation matches the per-candidate one
+    unaligned = MultiDimensionalAnalysis()
+    assert calculate_multi_dimensional_bonuses_batch([analysis, unaligned], dynamic_weights) == [bonuses, {}]
+    assert calculate_multi_dimensional_bonuses_batch([], dynamic_weights) == []
 
 # Test feedback generation
 def test_generate_multi_dimensional_feedback():
@@ -146,6 +158,308 @@ def test_gpt_analyzer_error_handling(mock_openai):
     assert analysis.technical.alignment_score == 0.0
     assert analysis.work_arrangement.preferred_arrangement == ""
 
+# Test batched analysis of several candidates' comments
+@patch('utils.structured_comments.OpenAI')
+def test_gpt_analyzer_batch(mock_openai):
+    """Test that batched comments share one API call and missing entries fall back to a single analysis."""
+    def _entry(arrangement):
+        return {
+            "technical": {"claimed_skills": ["Python"], "experience_claims": [], "technical_confidence": 0.8},
+            "work_arrangement": {"preferred_arrangement": arrangement, "arrangement_strength": 0.8},
+            "availability": {"availability_timeline": "immediate", "availability_urgency": 0.5},
+            "role_focus": {"role_interests": [], "focus_areas": []},
+            "experience_level": {"experience_level_claim": "mid", "confidence_level": 0.7}
+        }
+    
+    batch_response = MagicMock()
+    batch_response.choices[0].message.content = json.dumps(
+        {"results": [dict(_entry("remote"), id=1), dict(_entry("onsite"), id=3)]}
+    )
+    single_response = MagicMock()
+    single_response.choices[0].message.content = json.dumps(_entry("hybrid"))
+    
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.side_effect = [batch_response, single_response]
+    mock_openai.return_value = mock_client
+    
+    analyzer = GPTMultiDimensionalAnalyzer()
+    job_data = {'description': 'remote python developer', 'title': 'Software Engineer'}
+    analyses = analyzer.analyze_comments_batch(["remote please", "", "hybrid works", "onsite is fine"], job_data)
+    
+    assert [analysis.work_arrangement.preferred_arrangement for analysis in analyses] == ["remote", "", "hybrid", "onsite"]
+    assert mock_client.chat.completions.create.call_count == 2
+
+# Test concurrent async analysis with rate-limit retries
+@patch('utils.structured_comments.asyncio.sleep', new_callable=AsyncMock)
+@patch('utils.structured_comments.AsyncOpenAI')
+@patch('utils.structured_comments.OpenAI')
+def test_gpt_analyzer_async_retries_rate_limit(mock_openai, mock_async_openai, mock_sleep):
+    """Test that async analyses run per candidate and back off on 429 before retrying."""
+    rate_limited = RateLimitError(
+        "rate limited",
+        response=httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com")),
+        body=None
+    )
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = json.dumps(
+        {"work_arrangement": {"preferred_arrangement": "remote", "arrangement_strength": 0.8}}
+    )
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=[rate_limited, mock_response, mock_response])
+    mock_async_openai.return_value = mock_client
+    
+    analyzer = GPTMultiDimensionalAnalyzer()
+    analyses = asyncio.run(analyzer.analyze_comments_many_async(["remote please", "", "remote only"], {}, max_concurrency=1))
+    
+    assert [analysis.work_arrangement.preferred_arrangement for analysis in analyses] == ["remote", "", "remote"]
+    assert mock_client.chat.completions.create.call_count == 3
+    mock_sleep.assert_awaited_once()
+
+# Test that every event loop gets its own async client
+@patch('utils.structured_comments.AsyncOpenAI')
+@patch('utils.structured_comments.OpenAI')
+def test_gpt_analyzer_async_client_per_event_loop(mock_openai, mock_async_openai):
+    """Test that a second asyncio.run does not reuse the first loop's client, and that loop errors are not swallowed."""
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = json.dumps(
+        {"work_arrangement": {"preferred_arrangement": "remote", "arrangement_strength": 0.8}}
+    )
+    
+    def loop_bound_client(*args, **kwargs):
+        # Like a real pooled client, it only works in the event loop that created it
+        loop = asyncio.get_running_loop()
+        
+        async def create(**request):
+            if asyncio.get_running_loop() is not loop:
+                raise RuntimeError("Event loop is closed")
+            return mock_response
+        
+        client = MagicMock()
+        client.chat.completions.create = create
+        return client
+    
+    mock_async_openai.side_effect = loop_bound_client
+    analyzer = GPTMultiDimensionalAnalyzer()
+    
+    for comments in ("remote please", "remote only"):
+        analysis = asyncio.run(analyzer.analyze_comments_async(comments, {}))
+        assert analysis.work_arrangement.preferred_arrangement == "remote"
+    assert mock_async_openai.call_count == 2
+    
+    async def analyze_with_stale_client():
+        analyzer._async_client_loop = asyncio.get_running_loop()
+        return await analyzer.analyze_comments_async("remote eventually", {})
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(analyze_with_stale_client())
+
+# Test that aclose releases the async client in the loop that owns it
+@patch('utils.structured_comments.AsyncOpenAI')
+@patch('utils.structured_comments.OpenAI')
+def test_gpt_analyzer_aclose(mock_openai, mock_async_openai):
+    """Test that aclose closes the current loop's client and a later analysis builds a new one."""
+    mock_async_openai.return_value.close = AsyncMock()
+    analyzer = GPTMultiDimensionalAnalyzer()
+    
+    async def open_and_close():
+        client = analyzer._get_async_client()
+        await analyzer.aclose()
+        return client
+    
+    client = asyncio.run(open_and_close())
+    client.close.assert_awaited_once()
+    assert analyzer._async_openai_client is None
+    assert analyzer._async_client_loop is None
+    # Nothing to close once the client is gone
+    asyncio.run(analyzer.aclose())
+    client.close.assert_awaited_once()
+
+# Test offline analysis through the Batch API
+@patch('utils.structured_comments.asyncio.sleep', new_callable=AsyncMock)
+@patch('utils.structured_comments.AsyncOpenAI')
+@patch('utils.structured_comments.OpenAI')
+def test_gpt_analyzer_offline_batch(mock_openai, mock_async_openai, mock_sleep):
+    """Test that offline analyses go through one batch and failed lines fall back to realtime."""
+    body = {"choices": [{"message": {"content": json.dumps(
+        {"work_arrangement": {"preferred_arrangement": "remote", "arrangement_strength": 0.8}}
+    )}}]}
+    output = "\n".join([
+        json.dumps({"custom_id": "comments-0", "response": {"status_code": 200, "body": body}}),
+        json.dumps({"custom_id": "comments-2", "response": {"status_code": 500, "body": {}}}),
+    ])
+    mock_client = MagicMock()
+    mock_client.files.create = AsyncMock(return_value=MagicMock(id="file-in"))
+    mock_client.batches.create = AsyncMock(return_value=MagicMock(id="batch-1", status="in_progress"))
+    mock_client.batches.retrieve = AsyncMock(
+        return_value=MagicMock(id="batch-1", status="completed", output_file_id="file-out")
+    )
+    mock_client.files.content = AsyncMock(return_value=MagicMock(text=output))
+    realtime = MagicMock()
+    realtime.choices[0].message.content = json.dumps(
+        {"work_arrangement": {"preferred_arrangement": "onsite", "arrangement_strength": 0.6}}
+    )
+    mock_client.chat.completions.create = AsyncMock(return_value=realtime)
+    mock_async_openai.return_value = mock_client
+    
+    analyzer = GPTMultiDimensionalAnalyzer()
+    analyses = asyncio.run(analyzer.analyze_comments_offline(["remote please", "", "onsite only"], {}, poll_interval=0))
+    
+    assert [analysis.work_arrangement.preferred_arrangement for analysis in analyses] == ["remote", "", "onsite"]
+    mock_client.batches.create.assert_awaited_once()
+    assert mock_client.chat.completions.create.call_count == 1
+
+# Test that a failed batch falls back to concurrent realtime analyses
+@patch('utils.structured_comments.AsyncOpenAI')
+@patch('utils.structured_comments.OpenAI')
+def test_gpt_analyzer_offline_batch_failure(mock_openai, mock_async_openai, caplog):
+    """Test that a batch that cannot be submitted is logged and every candidate is analyzed in realtime, concurrently."""
+    realtime = MagicMock()
+    realtime.choices[0].message.content = json.dumps(
+        {"work_arrangement": {"preferred_arrangement": "remote", "arrangement_strength": 0.8}}
+    )
+    in_flight = {'now': 0, 'peak': 0}
+    
+    async def create(**request):
+        in_flight['now'] += 1
+        in_flight['peak'] = max(in_flight['peak'], in_flight['now'])
+        await asyncio.sleep(0)
+        in_flight['now'] -= 1
+        return realtime
+    
+    mock_client = MagicMock()
+    mock_client.files.create = AsyncMock(side_effect=ValueError("upload rejected"))
+    mock_client.chat.completions.create = create
+    mock_async_openai.return_value = mock_client
+    
+    analyzer = GPTMultiDimensionalAnalyzer()
+    analyses = asyncio.run(analyzer.analyze_comments_offline(["remote please", "remote only", "remote first"], {}))
+    
+    assert [analysis.work_arrangement.preferred_arrangement for analysis in analyses] == ["remote"] * 3
+    assert in_flight['peak'] > 1
+    assert "upload rejected" in caplog.text
+
+# Test that repeated analyses are served from the cache
+@patch('utils.structured_comments.OpenAI')
+def test_gpt_analyzer_caches_analysis(mock_openai):
+    """Test that the same comments for the same job reach the API only once."""
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = json.dumps(
+        {"work_arrangement": {"preferred_arrangement": "remote", "arrangement_strength": 0.8}}
+    )
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = mock_response
+    mock_openai.return_value = mock_client
+    
+    analyzer = GPTMultiDimensionalAnalyzer()
+    job_data = {'description': 'remote python developer', 'title': 'Software Engineer'}
+    first = analyzer.analyze_comments("remote please", job_data)
+    first.work_arrangement.preferred_arrangement = "changed by caller"
+    second = analyzer.analyze_comments("remote please", job_data)
+    
+    assert second.work_arrangement.preferred_arrangement == "remote"
+    assert mock_client.chat.completions.create.call_count == 1
+    
+    analyzer.analyze_comments("remote please", {'description': 'onsite java developer', 'title': 'Engineer'})
+    assert mock_client.chat.completions.create.call_count == 2
+
+# Test the opt-in local analysis of short stock comments
+@patch('utils.structured_comments.OpenAI')
+def test_gpt_analyzer_local_analysis(mock_openai):
+    """Test that stock comments skip the model when local analysis is on, and anything else still reaches it."""
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = json.dumps({})
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = mock_response
+    mock_openai.return_value = mock_client
+    
+    with patch.object(config.scoring, 'local_comment_analysis', True):
+        analyzer = GPTMultiDimensionalAnalyzer()
+    job_data = {'description': 'fully remote role, start asap', 'title': 'Senior Engineer'}
+    analysis = analyzer.analyze_comments("Remote only, can start immediately", job_data)
+    
+    assert analysis.work_arrangement.preferred_arrangement == "remote"
+    assert analysis.availability.availability_timeline == "immediate"
+    assert analysis.work_arrangement.alignment_score > 0
+    mock_client.chat.completions.create.assert_not_called()
+    
+    analyzer.analyze_comments("Remote only, strong in Python and Django", job_data)
+    assert mock_client.chat.completions.create.call_count == 1
+
+# Test that comments are normalized before prompting
+@patch('utils.structured_comments.OpenAI')
+def test_gpt_analyzer_normalizes_comments(mock_openai):
+    """Test that comments are whitespace-collapsed and capped, and that variants share a cache entry."""
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = json.dumps({})
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = mock_response
+    mock_openai.return_value = mock_client
+    
+    analyzer = GPTMultiDimensionalAnalyzer()
+    analyzer.analyze_comments("  remote\n\n please " + "x" * 2000, {})
+    prompt = mock_client.chat.completions.create.call_args.kwargs['messages'][-1]['content']
+    assert 'Candidate Comments: "remote please x' in prompt
+    assert "x" * (analyzer.MAX_COMMENT_CHARS + 1) not in prompt
+    
+    analyzer.analyze_comments("remote please " + "x" * 3000, {})
+    assert mock_client.chat.completions.create.call_count == 1
+
+# Test the opt-in semantic cache for reworded comments
+@patch('utils.structured_comments.EmbeddingSkillsMatcher')
+@patch('utils.structured_comments.OpenAI')
+def test_gpt_analyzer_semantic_cache(mock_openai, mock_embedder):
+    """Test that comments similar to ones already analyzed for the same job reuse that analysis."""
+    vectors = {"remote work": [1.0, 0.0], "working remotely": [0.96, 0.28], "onsite only": [0.0, 1.0]}
+    mock_embedder.return_value.get_embeddings.side_effect = lambda texts: np.array([vectors[texts[0]]])
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = json.dumps(
+        {"work_arrangement": {"preferred_arrangement": "remote", "arrangement_strength": 0.8}}
+    )
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = mock_response
+    mock_openai.return_value = mock_client
+    
+    with patch.object(config.cache, 'comment_semantic_threshold', 0.9):
+        analyzer = GPTMultiDimensionalAnalyzer()
+    job_data = {'description': 'remote python developer', 'title': 'Software Engineer'}
+    analyzer.analyze_comments("remote work", job_data)
+    reworded = analyzer.analyze_comments("working remotely", job_data)
+    
+    assert reworded.work_arrangement.preferred_arrangement == "remote"
+    assert mock_client.chat.completions.create.call_count == 1
+    
+    # Dissimilar comments, or the same comments for another job, still go to the model
+    analyzer.analyze_comments("onsite only", job_data)
+    analyzer.analyze_comments("working remotely", {'description': 'onsite java developer'})
+    assert mock_client.chat.completions.create.call_count == 3
+
+# Test streamed analysis surfacing partial results
+@patch('utils.structured_comments.OpenAI')
+def test_gpt_analyzer_stream_yields_partial_results(mock_openai):
+    """Test that streamed analyses yield complete fields as they arrive, ending with the full analysis."""
+    content = json.dumps({
+        "technical": {"claimed_skills": ["Python"], "experience_claims": [], "technical_confidence": 0.9},
+        "work_arrangement": {"preferred_arrangement": "remote", "arrangement_strength": 0.8}
+    })
+    chunks = []
+    for start in range(0, len(content), 7):
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = content[start:start + 7]
+        chunks.append(chunk)
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = iter(chunks)
+    mock_openai.return_value = mock_client
+    
+    analyzer = GPTMultiDimensionalAnalyzer()
+    job_data = {'description': 'remote python developer', 'title': 'Software Engineer'}
+    analyses = list(analyzer.analyze_comments_stream("remote python dev", job_data))
+    
+    assert len(analyses) > 1
+    assert analyses[0].work_arrangement.preferred_arrangement == ""
+    assert analyses[-1].technical.claimed_skills == ["Python"]
+    assert analyses[-1].work_arrangement.preferred_arrangement == "remote"
+    assert mock_client.chat.completions.create.call_args.kwargs['stream'] is True
+
 # Test the full integration of process_user_comments
 @patch('utils.structured_comments.GPTMultiDimensionalAnalyzer.analyze_comments')
 @patch('utils.dynamic_weights.DynamicWeightCalculator.calculate_comment_weights')
@@ -172,6 +486,25 @@ def test_process_user_comments_integration(mock_calc_weights, mock_analyze_comme
     assert result['scoring_adjustments']['work_arrangement'] > 0
     assert "Technical Skills" in result['structured_feedback'] # Check if feedback was generated
 
+# Test concurrent processing of many candidates
+@patch('utils.structured_comments.GPTMultiDimensionalAnalyzer.analyze_comments_async', new_callable=AsyncMock)
+@patch('utils.dynamic_weights.DynamicWeightCalculator.calculate_comment_weights')
+def test_process_user_comments_many_async(mock_calc_weights, mock_analyze_comments):
+    """Test that candidates are analyzed concurrently and weights are fetched once per job."""
+    mock_analyze_comments.return_value = MultiDimensionalAnalysis(
+        work_arrangement=WorkArrangementAlignment(preferred_arrangement="remote", arrangement_strength=1.0, alignment_score=1.0)
+    )
+    mock_calc_weights.return_value = {'work_arrangement': 0.5}
+    job_a, job_b = {'title': 'Engineer A'}, {'title': 'Engineer B'}
+    
+    results = asyncio.run(process_user_comments_many_async(
+        [("remote please", job_a), ("", job_a), ("remote only", job_a), ("remote", job_b)]
+    ))
+    
+    assert [result['total_bonus'] for result in results] == [10.0, 0, 10.0, 10.0]
+    assert mock_analyze_comments.await_count == 3
+    assert mock_calc_weights.call_count == 2
+
 # Test specific validation scenarios
 def test_alignment_validation_logic():
     """Test specific validation cases for alignment scores."""
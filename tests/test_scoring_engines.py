@@ -1,7 +1,16 @@
+import asyncio
+import json
+import numpy as np
+import time
+import httpx
 import pytest
-from unittest.mock import patch, MagicMock
-from utils.base_scoring_engine import BaseScoringEngine
+from openai import RateLimitError
+from unittest.mock import patch, MagicMock, AsyncMock
+from utils.base_scoring_engine import BaseScoringEngine, truncate_to_token_budget, allocate_token_budget, TRUNCATION_MARKER
 from utils.scoring_engine_openai import ScoringEngine
+from utils.rate_limiter import AsyncRateLimiter, CircuitBreaker
+from utils.dynamic_weights import DynamicWeightCalculator
+from config import config
 
 @pytest.fixture
 def base_engine():
@@ -9,7 +18,10 @@ def base_engine():
 
 @pytest.fixture
 def openai_engine():
-    return ScoringEngine()
+    engine = ScoringEngine()
+    # Mocked responses must not be served from, or written to, the shared results cache
+    engine.results_cache_enabled = False
+    return engine
 
 class TestBaseScoringEngine:
     def test_base_engine_initialization(self, base_engine):
@@ -22,6 +34,14 @@ class TestBaseScoringEngine:
         assert isinstance(base_engine.score_ranges, dict)
         assert (70, 100) in base_engine.score_ranges
 
+    def test_score_category_lookup(self, base_engine):
+        assert base_engine._get_score_category(100) == "Strong Match"
+        assert base_engine._get_score_category(70) == "Strong Match"
+        assert base_engine._get_score_category(69.5) == "Good Match"
+        assert base_engine._get_score_category(39) == "Weak Match"
+        assert base_engine._get_score_category(120) == "Strong Match"
+        assert base_engine._get_score_category(-5) == "Weak Match"
+
     def test_degree_scoring(self, base_engine):
         assert base_engine._get_degree_score('phd') == 100
         assert base_engine._get_degree_score('master of science') == 80
@@ -29,6 +49,67 @@ class TestBaseScoringEngine:
         assert base_engine._get_degree_score('associate') == 40
         # A diploma should be better than nothing
         assert base_engine._get_degree_score('high school diploma') > 0
+        # Short keywords only match whole words ('ma' must not match inside 'diploma')
+        assert base_engine._get_degree_score('high school diploma') == 20
+        assert base_engine._get_highest_degree([{'degree': 'BS Physics'}, {'degree': 'MS Physics'}]) == 'MS Physics'
+        assert base_engine._get_degree_score('Ph.D. in Physics') == 100
+        assert base_engine._get_degree_score('M.S. Computer Science') == 80
+
+    def test_truncate_to_token_budget(self):
+        short_text = "Python developer"
+        assert truncate_to_token_budget(short_text, 100) == short_text
+
+        long_text = "python " * 5000
+        truncated = truncate_to_token_budget(long_text, 50)
+        assert truncated.endswith(TRUNCATION_MARKER)
+        assert len(truncated) < len(long_text)
+
+    def test_allocate_token_budget(self):
+        assert allocate_token_budget(100, 200, 1000) == (100, 200)
+        assert allocate_token_budget(3000, 1000, 2000) == (1500, 500)
+
+    def test_resume_over_budget_keeps_job_relevant_lines(self, base_engine):
+        lines = ['Jane Doe', 'Python backend developer', 'Hobbies: chess', 'Built Django services']
+        relevant = {'python backend developer', 'built django services', 'python django role'}
+
+        def fake_embeddings(texts):
+            return np.array([[1.0, 0.0] if text.lower() in relevant else [0.0, 1.0] for text in texts])
+
+        base_engine.embedding_matcher.get_embeddings = fake_embeddings
+        with patch('utils.base_scoring_engine.count_tokens', side_effect=lambda text: len(text.split())):
+            fitted = base_engine._fit_resume_to_budget('\n'.join(lines), 'Python Django role', 9)
+
+        assert fitted == 'Python backend developer\nBuilt Django services' + TRUNCATION_MARKER
+
+    def test_prompt_respects_input_budget(self, base_engine):
+        prompt = base_engine._create_base_prompt(
+            {'full_text': 'resume ' * 20000}, {'description': 'job ' * 20000}, {}, "OpenAI"
+        )
+        assert prompt.count(TRUNCATION_MARKER) == 2
+        assert len(prompt) < 6000 * 4 + 1000
+
+    def test_prompt_uses_level_specific_template(self, base_engine):
+        senior = base_engine._create_base_prompt({'full_text': 'resume'}, {'experience_level': 'Senior'}, {})
+        other = base_engine._create_base_prompt({'full_text': 'resume'}, {'experience_level': 'principal'}, {})
+
+        assert "Experience Level: senior\nLevel Focus: Focus on architecture" in senior
+        # Job-side text precedes candidate text so the prompt prefix is shared across resumes
+        assert senior.index("**JOB DESCRIPTION:**") < senior.index("**CANDIDATE ANALYSIS:**") < senior.index("**RESUME:**")
+        assert "Experience Level: principal\n\n**SCORING METHODOLOGY" in other
+
+    def test_prompt_keeps_dollar_signs_in_job_fields(self, base_engine):
+        job = {'title': 'Engineer ($150k, ${bonus})', 'experience_level': 'mid'}
+        prompt = base_engine._create_base_prompt({'full_text': 'resume'}, job, {})
+
+        assert "Position: Engineer ($150k, ${bonus})" in prompt
+
+    def test_extract_years_from_date_formats(self, base_engine):
+        assert base_engine._extract_years_from_date('2018-2021', 2025) == 3
+        assert base_engine._extract_years_from_date('2020 - Present', 2025) == 5
+        assert base_engine._extract_years_from_date('01/2020-07/2022', 2025) == 2.5
+        assert base_engine._extract_years_from_date('2019', 2025) == 1
+        assert base_engine._extract_years_from_date('Since 2021 (CURRENT)', 2025) == 4
+        assert base_engine._extract_years_from_date('', 2025) == 0
 
     def test_experience_calculation(self, base_engine):
         experience = [
@@ -38,11 +119,88 @@ class TestBaseScoringEngine:
         # This will vary based on the current year, so we check it's positive
         assert base_engine._calculate_experience_years(experience) > 3
 
+class TestDynamicWeightCache:
+    def test_weights_requested_once_per_job(self):
+        calculator = DynamicWeightCalculator()
+        weights = {'skills_match': 0.4, 'experience_match': 0.3, 'education_match': 0.1, 'domain_expertise': 0.2}
+        job = {'title': 'Engineer', 'description': 'Build things'}
+
+        with patch.object(calculator, '_request_scoring_weights', return_value=weights) as mock_request:
+            first = calculator.calculate_scoring_weights(job)
+            second = calculator.calculate_scoring_weights(dict(job))
+            calculator.calculate_scoring_weights({'title': 'Analyst', 'description': 'Study things'})
+
+        assert first == second == weights
+        assert mock_request.call_count == 2
+
+    def test_failed_requests_fall_back_without_caching(self):
+        calculator = DynamicWeightCalculator()
+        job = {'title': 'Engineer', 'description': 'Build things'}
+
+        with patch.object(calculator, '_request_scoring_weights', return_value=None) as mock_request:
+            fallback = calculator.calculate_scoring_weights(job)
+            calculator.calculate_scoring_weights(job)
+
+        assert fallback == calculator._get_fallback_scoring_weights()
+        assert mock_request.call_count == 2
+
+class TestAsyncRateLimiter:
+    def test_burst_within_budget_does_not_wait(self):
+        limiter = AsyncRateLimiter(5, time_period=60)
+
+        async def burst():
+            for _ in range(5):
+                await limiter.acquire()
+
+        start = time.monotonic()
+        asyncio.run(burst())
+        assert time.monotonic() - start < 0.05
+        assert not limiter.has_capacity()
+
+    def test_waits_when_budget_exhausted(self):
+        limiter = AsyncRateLimiter(2, time_period=0.2)
+
+        async def burst():
+            for _ in range(3):
+                async with limiter:
+                    pass
+
+        start = time.monotonic()
+        asyncio.run(burst())
+        assert time.monotonic() - start >= 0.08
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        assert not breaker.is_open
+        breaker.record_failure()
+        assert breaker.is_open
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert not breaker.is_open
+
+    def test_closes_after_reset_timeout(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        assert breaker.is_open
+        time.sleep(0.06)
+        assert not breaker.is_open
+
 class TestOpenAIScoringEngine:
     def test_openai_engine_initialization(self, openai_engine):
         assert openai_engine is not None
         assert hasattr(openai_engine, 'openai_client')
 
+    def test_rate_limits_can_be_set_per_engine(self):
+        engine = ScoringEngine(max_requests_per_minute=30, max_tokens_per_minute=90000)
+        assert engine.request_limiter.max_rate == 30
+        assert engine.token_limiter.max_rate == 90000
+
     @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data')
     def test_calculate_score_integration(self, mock_analyze, openai_engine):
         mock_analyze.return_value = {}
@@ -93,4 +251,464 @@ class TestOpenAIScoringEngine:
         }
 
         result = openai_engine.calculate_score(resume_data, job_data)
-        assert result['final_score'] == 85
\ No newline at end of file
+        assert result['final_score'] == 85
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    @patch('utils.base_scoring_engine.process_user_comments')
+    @patch('utils.scoring_engine_openai.process_user_comments')
+    def test_user_comments_analyzed_once(self, mock_process, mock_prompt_process, mock_analyze, mock_weights, openai_engine):
+        mock_process.return_value = {'structured_feedback': 'Relevant focus', 'total_bonus': 3.0}
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = '{"overall_score": 70}'
+        openai_engine.openai_client = MagicMock()
+        openai_engine.openai_client.chat.completions.create.return_value = mock_response
+        openai_engine.weight_calculator.calculate_comment_weights = MagicMock(return_value=None)
+
+        result = openai_engine.calculate_score({'full_text': 'resume', 'user_comments': 'I love Python'}, {'description': 'A job'})
+
+        assert result['final_score'] == 73.0
+        mock_process.assert_called_once()
+        mock_prompt_process.assert_not_called()
+        prompt = openai_engine.openai_client.chat.completions.create.call_args.kwargs['messages'][1]['content']
+        assert 'Relevant focus' in prompt
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._write_cache_file')
+    def test_near_duplicate_resume_reuses_result(self, mock_write, mock_analyze, mock_weights, openai_engine):
+        openai_engine.results_cache_enabled = True
+        openai_engine.near_duplicate_threshold = 0.9
+        openai_engine.openai_client = MagicMock()
+        openai_engine.openai_client.chat.completions.create.return_value.choices[0].message.content = '{"overall_score": 64}'
+        job = {'description': 'A job'}
+        text = ' '.join(f'word{i}' for i in range(100))
+
+        openai_engine.calculate_score({'full_text': text, 'skills': ['Python']}, job)
+        reformatted = openai_engine.calculate_score({'full_text': text.replace(' ', '\n') + ' extra', 'skills': ['Python']}, job)
+        assert reformatted['final_score'] == 64
+        assert openai_engine.openai_client.chat.completions.create.call_count == 1
+
+        # Different structured fields or a different resume text are never treated as duplicates
+        assert openai_engine._find_near_duplicate({'full_text': text, 'skills': ['Java']}, job) is None
+        openai_engine.calculate_score({'full_text': 'an entirely different resume', 'skills': ['Python']}, job)
+        assert openai_engine.openai_client.chat.completions.create.call_count == 2
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._write_cache_file')
+    def test_identical_prompt_reuses_result(self, mock_write, mock_analyze, mock_weights, openai_engine):
+        openai_engine.results_cache_enabled = True
+        openai_engine.openai_client = MagicMock()
+        openai_engine.openai_client.chat.completions.create.return_value.choices[0].message.content = '{"overall_score": 58}'
+        job = {'description': 'A job'}
+
+        # The file name is not part of the prompt, so the second request is identical
+        openai_engine.calculate_score({'full_text': 'same resume', 'file_name': 'a.pdf'}, job)
+        result = openai_engine.calculate_score({'full_text': 'same resume', 'file_name': 'b.pdf'}, job)
+        assert result['final_score'] == 58
+        assert result['openai_results']['processing_info']['cache_hit'] is True
+        assert openai_engine.openai_client.chat.completions.create.call_count == 1
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data')
+    def test_fast_reject_skips_model_call(self, mock_analyze, mock_weights, openai_engine):
+        mock_analyze.return_value = {
+            'skills_analysis': {'match_percentage': 0.0},
+            'experience_analysis': {'experience_level_match': {'meets_requirement': False}}
+        }
+        openai_engine.openai_client = MagicMock()
+
+        # Off by default: the model still scores the candidate
+        openai_engine.openai_client.chat.completions.create.return_value.choices[0].message.content = '{"overall_score": 30}'
+        assert openai_engine.calculate_score({'full_text': 'resume'}, {'description': 'A job'})['final_score'] == 30
+
+        openai_engine.fast_reject_threshold = 10
+        result = openai_engine.calculate_score({'full_text': 'resume'}, {'description': 'A job'})
+        assert result['fast_reject'] is True
+        assert result['match_category'] == 'Weak Match'
+        assert openai_engine.openai_client.chat.completions.create.call_count == 1
+
+        # Comments can lift a candidate, so they always get a model review
+        openai_engine.weight_calculator.calculate_comment_weights = MagicMock(return_value=None)
+        with patch('utils.scoring_engine_openai.process_user_comments', return_value={'total_bonus': 0}):
+            openai_engine.calculate_score({'full_text': 'resume', 'user_comments': 'Keen'}, {'description': 'A job'})
+        assert openai_engine.openai_client.chat.completions.create.call_count == 2
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    def test_score_many_mocked(self, mock_analyze, mock_weights, openai_engine):
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = '{"overall_score": 72}'
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+        openai_engine.async_openai_client = mock_client
+
+        pairs = [({'full_text': f'resume {i}'}, {'description': 'A job'}) for i in range(3)]
+        results = asyncio.run(openai_engine.score_many(pairs, max_concurrency=2))
+
+        assert [result['final_score'] for result in results] == [72, 72, 72]
+        assert mock_client.chat.completions.create.await_count == 3
+
+        resumes = [{'full_text': f'other resume {i}'} for i in range(2)]
+        results = asyncio.run(openai_engine.score_resumes(resumes, {'description': 'A job'}))
+        assert [result['final_score'] for result in results] == [72, 72]
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    @patch('utils.scoring_engine_openai.asyncio.sleep', new_callable=AsyncMock)
+    def test_async_score_retries_rate_limit(self, mock_sleep, mock_analyze, mock_weights, openai_engine):
+        rate_limited = RateLimitError(
+            "rate limited",
+            response=httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com")),
+            body=None
+        )
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = '{"overall_score": 64}'
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(side_effect=[rate_limited, mock_response])
+        openai_engine.async_openai_client = mock_client
+
+        result = asyncio.run(openai_engine.calculate_score_async({'full_text': 'resume'}, {'description': 'A job'}))
+
+        assert result['final_score'] == 64
+        assert mock_client.chat.completions.create.await_count == 2
+        mock_sleep.assert_awaited_once()
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    def test_open_circuit_skips_api_call(self, mock_analyze, mock_weights, openai_engine):
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock()
+        openai_engine.async_openai_client = mock_client
+        for _ in range(openai_engine.circuit_breaker.failure_threshold):
+            openai_engine.circuit_breaker.record_failure()
+
+        result = asyncio.run(openai_engine.calculate_score_async({'full_text': 'resume'}, {'description': 'A job'}))
+
+        assert result['error_occurred'] is True
+        mock_client.chat.completions.create.assert_not_awaited()
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', side_effect=ValueError("broken"))
+    def test_failed_analysis_cancels_comment_analysis(self, mock_analyze, mock_weights, openai_engine):
+        openai_engine.weight_calculator.calculate_comment_weights = MagicMock(return_value=None)
+        comment_analysis = {}
+
+        async def slow_comments(*args):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                comment_analysis['cancelled'] = True
+                raise
+
+        with patch('utils.scoring_engine_openai.process_user_comments_async', side_effect=slow_comments):
+            result = asyncio.run(openai_engine.calculate_score_async(
+                {'full_text': 'resume', 'user_comments': 'Remote only'}, {'description': 'A job'}
+            ))
+
+        assert result['error'] is True
+        assert comment_analysis == {'cancelled': True}
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    def test_identical_inflight_requests_are_coalesced(self, mock_analyze, mock_weights, openai_engine):
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = '{"overall_score": 58}'
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+        openai_engine.async_openai_client = mock_client
+
+        pairs = [({'full_text': 'same resume'}, {'description': 'A job'})] * 3
+        results = asyncio.run(openai_engine.score_many(pairs))
+
+        assert [result['final_score'] for result in results] == [58, 58, 58]
+        assert mock_client.chat.completions.create.await_count == 1
+        assert openai_engine._inflight == {}
+        assert results[1]['openai_results'] is not results[0]['openai_results']
+
+        # Pairs that differ in any field, not just the resume text and job description, are scored separately
+        pairs = [({'full_text': 'same resume', 'skills': skills}, {'description': 'A job'}) for skills in (['Python'], ['Java'])]
+        asyncio.run(openai_engine.score_many(pairs))
+        assert mock_client.chat.completions.create.await_count == 3
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    @patch('utils.scoring_engine_openai.AsyncOpenAI')
+    def test_repeated_event_loops_get_their_own_client(self, mock_async_openai, mock_analyze, mock_weights, openai_engine):
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = '{"overall_score": 70}'
+
+        def loop_bound_client(*args, **kwargs):
+            # Like a real pooled client, it only works in the event loop that created it
+            loop = asyncio.get_running_loop()
+
+            async def create(**request):
+                if asyncio.get_running_loop() is not loop:
+                    raise RuntimeError("Event loop is closed")
+                return mock_response
+
+            client = MagicMock()
+            client.chat.completions.create = create
+            client.close = AsyncMock()
+            return client
+
+        mock_async_openai.side_effect = loop_bound_client
+
+        for text in ('first resume', 'second resume'):
+            results = openai_engine.calculate_scores([({'full_text': text}, {'description': 'A job'})])
+            assert results[0]['final_score'] == 70
+        for text in ('third resume', 'fourth resume'):
+            results = asyncio.run(openai_engine.score_many([({'full_text': text}, {'description': 'A job'})]))
+            assert results[0]['final_score'] == 70
+        assert mock_async_openai.call_count == 4
+
+    @patch('utils.scoring_engine_openai.close_comment_analyzer', new_callable=AsyncMock)
+    @patch('utils.scoring_engine_openai.AsyncOpenAI')
+    def test_aclose_releases_client_and_threads(self, mock_async_openai, mock_close_analyzer, openai_engine):
+        mock_async_openai.return_value.close = AsyncMock()
+
+        async def use_engine():
+            async with openai_engine:
+                await openai_engine._run_analysis(len, [])
+                return openai_engine.async_openai_client, openai_engine._analysis_executor
+
+        client, executor = asyncio.run(use_engine())
+
+        client.close.assert_awaited_once()
+        assert openai_engine._async_client is None
+        assert openai_engine._analysis_executor is None
+        assert executor._shutdown
+        mock_close_analyzer.assert_awaited_once()
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    def test_calculate_score_batch_mocked(self, mock_analyze, mock_weights, openai_engine):
+        def output_line(custom_id, score):
+            return json.dumps({
+                'custom_id': custom_id,
+                'response': {
+                    'status_code': 200,
+                    'body': {
+                        'choices': [{'message': {'content': json.dumps({'overall_score': score})}}],
+                        'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15,
+                                  'prompt_tokens_details': {'cached_tokens': 8}}
+                    }
+                },
+                'error': None
+            })
+
+        mock_client = MagicMock()
+        mock_client.files.create = AsyncMock(return_value=MagicMock(id='file-in'))
+        mock_client.batches.create = AsyncMock(return_value=MagicMock(id='batch-1', status='in_progress'))
+        mock_client.batches.retrieve = AsyncMock(
+            return_value=MagicMock(id='batch-1', status='completed', output_file_id='file-out')
+        )
+        # Output lines come back out of order and one request is missing
+        mock_client.files.content = AsyncMock(
+            return_value=MagicMock(text=output_line('resume-1', 40) + "\n" + output_line('resume-0', 90))
+        )
+        openai_engine.async_openai_client = mock_client
+
+        pairs = [({'full_text': f'resume {i}'}, {'description': 'A job'}) for i in range(3)]
+        results = asyncio.run(openai_engine.calculate_score_batch(pairs, poll_interval=0))
+
+        assert [result['final_score'] for result in results] == [90, 40, 0]
+        assert results[2]['error_occurred'] is True
+        assert results[0]['openai_results']['processing_info']['cached_prompt_tokens'] == 8
+        assert mock_client.batches.create.call_args.kwargs['endpoint'] == '/v1/chat/completions'
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    def test_calculate_score_packed_mocked(self, mock_analyze, mock_weights, openai_engine):
+        packed_response = MagicMock()
+        # Candidate 2 is dropped by the model and must be rescored on its own
+        packed_response.choices[0].message.content = json.dumps(
+            {'results': [{'id': 1, 'overall_score': 55}, {'id': 0, 'overall_score': 81}]}
+        )
+        single_response = MagicMock()
+        single_response.choices[0].message.content = '{"overall_score": 33}'
+
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(side_effect=[packed_response, single_response])
+        openai_engine.async_openai_client = mock_client
+
+        pairs = [({'full_text': f'resume {i}'}, {'description': 'A job'}) for i in range(3)]
+        results = asyncio.run(openai_engine.calculate_score_packed(pairs, pack_size=3))
+
+        assert [result['final_score'] for result in results] == [81, 55, 33]
+        assert mock_client.chat.completions.create.await_count == 2
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    def test_calculate_score_packed_uses_results_cache(self, mock_analyze, mock_weights, openai_engine, tmp_path):
+        openai_engine.results_cache_enabled = True
+        openai_engine.results_cache_dir = tmp_path
+
+        first_response = MagicMock()
+        first_response.choices[0].message.content = json.dumps(
+            {'results': [{'id': 0, 'overall_score': 81}, {'id': 1, 'overall_score': 55}]}
+        )
+        second_response = MagicMock()
+        second_response.choices[0].message.content = json.dumps({'results': [{'id': 0, 'overall_score': 47}]})
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(side_effect=[first_response, second_response])
+        openai_engine.async_openai_client = mock_client
+
+        pairs = [({'full_text': f'resume {i}'}, {'description': 'A job'}) for i in range(2)]
+        asyncio.run(openai_engine.calculate_score_packed(pairs, pack_size=3))
+        pairs.append(({'full_text': 'resume 2'}, {'description': 'A job'}))
+        results = asyncio.run(openai_engine.calculate_score_packed(pairs, pack_size=3))
+
+        # Only the new candidate is packed into the second request
+        assert [result['final_score'] for result in results] == [81, 55, 47]
+        assert mock_client.chat.completions.create.await_count == 2
+        assert '### CANDIDATE id: 1' not in mock_client.chat.completions.create.call_args.kwargs['messages'][-1]['content']
+
+    def test_packs_respect_token_budgets(self, openai_engine):
+        items = [{'prompt': 'x' * 400} for _ in range(20)]
+        with patch('utils.scoring_engine_openai.count_tokens', side_effect=lambda text: len(text) // 4), \
+             patch.multiple(config.scoring, max_tokens=2000, max_pack_output_tokens=16000,
+                            max_pack_input_tokens=len(ScoringEngine.PACKED_PROMPT_HEADER) // 4 + 350):
+            packs = openai_engine._split_into_packs(items, pack_size=10)
+
+        # Output allowance caps packs at 8 candidates; the input budget then allows only 3 per pack
+        assert [len(pack) for pack in packs] == [3, 3, 3, 3, 3, 3, 2]
+        assert [item for pack in packs for item in pack] == items
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    def test_results_cache_skips_repeat_calls(self, mock_analyze, mock_weights, openai_engine, tmp_path):
+        openai_engine.results_cache_enabled = True
+        openai_engine.results_cache_dir = tmp_path
+
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = '{"overall_score": 77}'
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = mock_response
+        openai_engine.openai_client = mock_client
+
+        resume_data = {'full_text': 'cached resume'}
+        job_data = {'description': 'A job'}
+        first = openai_engine.calculate_score(resume_data, job_data)
+        second = openai_engine.calculate_score(resume_data, job_data)
+
+        assert first['final_score'] == second['final_score'] == 77
+        assert second['openai_results']['processing_info']['cache_hit'] is True
+        assert mock_client.chat.completions.create.call_count == 1
+
+        # A fresh process only has the disk layer
+        openai_engine._results_memory_cache.clear()
+        third = openai_engine.calculate_score(resume_data, job_data)
+        assert third['final_score'] == 77
+        assert mock_client.chat.completions.create.call_count == 1
+        assert len(list(tmp_path.glob("*.json"))) == 1
+
+    def test_cache_hits_do_not_share_nested_state(self, openai_engine, tmp_path):
+        openai_engine.results_cache_enabled = True
+        openai_engine.results_cache_dir = tmp_path
+        openai_engine.near_duplicate_threshold = 0.9
+        resume_data, job_data = {'full_text': 'python developer resume'}, {'description': 'A job'}
+        cache_key = openai_engine._get_cache_key(resume_data, job_data)
+        result = {'overall_score': 70, 'strengths': ['python'], 'processing_info': {'cache_hit': False}}
+        openai_engine._cache_result(cache_key, result, resume_data, job_data)
+        openai_engine._remember_prompt_result(b'prompt', result)
+        result['strengths'].append('added after caching')
+
+        hits = [
+            openai_engine._get_exact_cached_result(cache_key),
+            openai_engine._find_near_duplicate(resume_data, job_data),
+            openai_engine._get_prompt_cached(b'prompt')
+        ]
+        for hit in hits:
+            assert hit['strengths'] == ['python']
+            hit['strengths'].append('mutated by caller')
+            hit['processing_info']['cache_hit'] = True
+
+        assert openai_engine._get_exact_cached_result(cache_key)['strengths'] == ['python']
+        assert openai_engine._find_near_duplicate(resume_data, job_data)['processing_info'] == {'cache_hit': False}
+        assert openai_engine._get_prompt_cached(b'prompt')['strengths'] == ['python']
+
+    def test_cache_key_tracks_prompt_and_request_parameters(self, openai_engine, monkeypatch):
+        resume_data, job_data = {'full_text': 'resume'}, {'description': 'A job'}
+        original = openai_engine._get_cache_key(resume_data, job_data)
+        assert openai_engine._get_cache_key(dict(resume_data), dict(job_data)) == original
+
+        monkeypatch.setattr(config.scoring, 'temperature', config.scoring.temperature + 0.1)
+        assert openai_engine._get_cache_key(resume_data, job_data) != original
+        monkeypatch.undo()
+
+        monkeypatch.setattr(ScoringEngine, 'PROMPT_VERSION', 'edited prompt')
+        assert openai_engine._get_cache_key(resume_data, job_data) != original
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    def test_batch_skips_cached_pairs(self, mock_analyze, mock_weights, openai_engine, tmp_path):
+        openai_engine.results_cache_enabled = True
+        openai_engine.results_cache_dir = tmp_path
+        job_data = {'description': 'A job'}
+        openai_engine._cache_result(openai_engine._get_cache_key({'full_text': 'seen'}, job_data), {'overall_score': 66})
+
+        mock_client = MagicMock()
+        mock_client.files.create = AsyncMock()
+        openai_engine.async_openai_client = mock_client
+
+        results = asyncio.run(openai_engine.calculate_score_batch([({'full_text': 'seen'}, job_data)], poll_interval=0))
+
+        assert results[0]['final_score'] == 66
+        mock_client.files.create.assert_not_awaited()
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    def test_async_score_caches_model_result_only(self, mock_analyze, mock_weights, openai_engine, tmp_path):
+        openai_engine.results_cache_enabled = True
+        openai_engine.results_cache_dir = tmp_path
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = '{"overall_score": 81}'
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+        openai_engine.async_openai_client = mock_client
+
+        result = asyncio.run(openai_engine.calculate_score_async({'full_text': 'resume'}, {'description': 'A job'}))
+
+        assert result['final_score'] == 81
+        cache_files = list(tmp_path.glob("*.json"))
+        assert len(cache_files) == 1
+        # The cached entry is the raw model output, not the response assembled from it
+        assert json.loads(cache_files[0].read_text()) == {'overall_score': 81}
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    def test_malformed_score_is_reported_as_error(self, mock_analyze, mock_weights, openai_engine):
+        responses = []
+        for content in ('{"overall_score": "85"}', '{"overall_score": "high"}'):
+            mock_response = MagicMock()
+            mock_response.choices[0].message.content = content
+            responses.append(mock_response)
+        openai_engine.openai_client = MagicMock()
+        openai_engine.openai_client.chat.completions.create.side_effect = responses
+
+        coerced = openai_engine.calculate_score({'full_text': 'resume'}, {'description': 'A job'})
+        malformed = openai_engine.calculate_score({'full_text': 'resume'}, {'description': 'A job'})
+
+        assert coerced['final_score'] == 85
+        assert malformed['error_occurred'] is True
+        assert malformed['final_score'] == 0
+
+    @patch('utils.scoring_engine_openai.ScoringEngine.get_dynamic_weights', return_value={})
+    @patch('utils.scoring_engine_openai.ScoringEngine._analyze_structured_data', return_value={})
+    def test_truncated_completion_is_reported_as_error(self, mock_analyze, mock_weights, openai_engine):
+        mock_response = MagicMock()
+        mock_response.choices[0].finish_reason = 'length'
+        mock_response.choices[0].message.content = '{"overall_score": 70, "summary": "Strong'
+        openai_engine.openai_client = MagicMock()
+        openai_engine.openai_client.chat.completions.create.return_value = mock_response
+
+        result = openai_engine.calculate_score({'full_text': 'resume'}, {'description': 'A job'})
+
+        assert result['error_occurred'] is True
+        assert 'max_tokens' in result['error_message']
+        assert openai_engine.openai_client.chat.completions.create.call_args.kwargs['max_tokens'] == config.scoring.max_tokens
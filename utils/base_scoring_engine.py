@@ -1,80 +1,323 @@
 from typing import Dict, Any, List
+import numpy as np
 from datetime import datetime
+from functools import lru_cache
+import bisect
 import logging
+import re
+import string
 
-from .skills_matcher import SkillsProcessor
+from config import config
+
+from .skills_matcher import get_default_skills_processor
 from .structured_comments import process_user_comments
 from .embedding_matcher import EmbeddingSkillsMatcher
 from .dynamic_weights import DynamicWeightCalculator
 
-# set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Exact token counts when tiktoken is installed, otherwise the ~4 chars/token approximation
+try:
+    import tiktoken
+    _token_encoding = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _token_encoding = None
+
+# Experience date formats fused into one pattern: 01/2020-12/2023, 2020-present, 2020-2023, or a lone year
+_DATE_RE = re.compile(
+    r'(?P<m1>\d{1,2})/(?P<y1>\d{4})\s*[-–]\s*(?P<m2>\d{1,2})/(?P<y2>\d{4})'
+    r'|(?P<ys>\d{4})\s*[-–]\s*(?:(?P<pres>present|current)|(?P<ye>\d{4}))'
+    r'|(?P<ysolo>\d{4})',
+    re.IGNORECASE
+)
+_PRESENT_RE = re.compile(r'present|current', re.IGNORECASE)
+
+# Degree keyword tiers, highest first (5 = doctorate ... 1 = diploma/certificate), matched as whole words
+_DEGREE_TIERS = (
+    (5, frozenset({'phd', 'doctorate', 'doctoral'})),
+    (4, frozenset({'master', 'masters', 'mba', 'ms', 'ma', 'msc', 'meng', 'mtech'})),
+    (3, frozenset({'bachelor', 'bachelors', 'bs', 'ba', 'be', 'bsc', 'beng', 'btech'})),
+    (2, frozenset({'associate', 'associates'})),
+    (1, frozenset({'diploma', 'certificate'})),
+)
+_DEGREE_LEVEL_SCORES = {5: 100, 4: 80, 3: 60, 2: 40, 1: 20, 0: 0}
+_WORD_RE = re.compile(r'[a-z]+')
+
+
+# Degree strings repeat across resumes and each is looked up twice (highest degree, then its score)
+@lru_cache(maxsize=1024)
+def _degree_level(degree: str) -> int:
+    """Highest degree level named in the text, 0 if none"""
+    # Dots are dropped first so abbreviations like "Ph.D." and "M.S." tokenize as one word
+    tokens = set(_WORD_RE.findall(degree.lower().replace('.', '')))
+    for level, keywords in _DEGREE_TIERS:
+        if not keywords.isdisjoint(tokens):
+            return level
+    return 0
+
+
+# Years expected per experience level: (min, max, label shown in the analysis)
+_LEVEL_REQUIREMENTS = {
+    'entry': (0, 2, "0-2 years"),
+    'mid': (3, 6, "3-6 years"),
+    'senior': (7, float('inf'), "7-+ years"),
+}
+
+_ROLE_WORDS = ('engineer', 'developer', 'analyst', 'manager')
+
+
+@lru_cache(maxsize=1024)
+def _keyword_set(text: str) -> frozenset:
+    """Lowercased words longer than three characters, used for keyword-overlap relevance"""
+    return frozenset(word for word in text.lower().split() if len(word) > 3)
+
+
+def _mentions_role(title_lower: str) -> bool:
+    return any(role in title_lower for role in _ROLE_WORDS)
+
+
+# Match categories in ascending order, split at the configured good/strong thresholds
+_SCORE_THRESHOLDS = (config.scoring.good_match_threshold, config.scoring.strong_match_threshold)
+_SCORE_LABELS = ("Weak Match", "Good Match", "Strong Match")
+
+# Date strings repeat heavily across resumes ("2020-2023", "2021 - Present"), so parses are memoized
+@lru_cache(maxsize=4096)
+def _years_from_date(date_str: str, current_year: int) -> float:
+    if not date_str:
+        return 0
+
+    match = _DATE_RE.search(date_str)
+    if not match:
+        return 0
+
+    if match.group('y1'):
+        return (int(match.group('y2')) - int(match.group('y1'))) + (int(match.group('m2')) - int(match.group('m1'))) / 12
+    if match.group('ys'):
+        end_year = current_year if match.group('pres') else int(match.group('ye'))
+        return end_year - int(match.group('ys'))
+    # A lone year counts as one year unless the entry is marked ongoing
+    if _PRESENT_RE.search(date_str) is not None:
+        return current_year - int(match.group('ysolo'))
+    return 1
+
+
+TRUNCATION_MARKER = "\n...[truncated]"
+
+
+@lru_cache(maxsize=512)
+def count_tokens(text: str) -> int:
+    if _token_encoding is None:
+        return (len(text) + 3) // 4
+    return len(_token_encoding.encode(text))
+
+
+def allocate_token_budget(resume_tokens: int, job_tokens: int, budget: int) -> tuple:
+    """Split budget between resume and job text in proportion to their sizes; untouched if both fit"""
+    total = resume_tokens + job_tokens
+    if total <= budget:
+        return resume_tokens, job_tokens
+    resume_budget = budget * resume_tokens // total
+    return resume_budget, budget - resume_budget
+
+
+@lru_cache(maxsize=256)
+def truncate_to_token_budget(text: str, max_tokens: int) -> str:
+    """Trim text to at most max_tokens; cached so a resume scored against many jobs is tokenized once"""
+    if _token_encoding is None:
+        max_chars = max_tokens * 4
+        return text if len(text) <= max_chars else text[:max_chars] + TRUNCATION_MARKER
+    tokens = _token_encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return _token_encoding.decode(tokens[:max_tokens]) + TRUNCATION_MARKER
+
+
+@lru_cache(maxsize=256)
+def _bind_job_fields(template: string.Template, job_fields: tuple) -> string.Template:
+    """Partially apply a prompt template with one job's fields, leaving the per-resume placeholders"""
+    # '$' in job values is escaped so the bound text stays a valid template
+    return string.Template(template.safe_substitute(
+        {name: str(value).replace('$', '$$') for name, value in job_fields}
+    ))
+
+
 class BaseScoringEngine:
     
+    # Static instructions and output schema. Kept identical across requests and sent ahead of the
+    # per-candidate prompt so providers can serve it from their prompt cache.
+    SCORING_SYSTEM_PROMPT = """You are a senior technical recruiter with 15+ years of experience in talent acquisition across multiple industries. You provide detailed, objective, and actionable resume analysis. Analyze the resume against the job requirements and provide comprehensive scoring.
+
+**CRITICAL SCORING GUIDELINES:**
+- Use FULL 0-100 range, avoid clustering around 70-85
+- Score 90-100: Exceptional match, exceeds requirements
+- Score 75-89: Good match with minor gaps
+- Score 60-74: Moderate match, some development needed
+- Score 40-59: Weak match, significant gaps
+- Score 0-39: Poor match, fundamentally misaligned
+- Be decisive: <30% skills = <50 score, >80% skills + good experience = >85 score
+- Apply the scoring weights given with each request exactly
+- Factor in candidate context when provided
+
+**REQUIRED JSON OUTPUT:**
+1. "overall_score": integer 0-100 (factor in candidate context)
+2. "confidence_level": "High"/"Medium"/"Low"
+3. "score_breakdown": {"skills_score": 0-100, "experience_score": 0-100, "education_score": 0-100, "domain_score": 0-100}
+4. "match_category": score interpretation
+5. "summary": brief executive summary (2-3 sentences)
+6. "strengths": key strengths (3-5 items)
+7. "concerns": main concerns (2-4 items)
+8. "missing_skills": list of missing required skills
+9. "matching_skills": list of matching skills found
+10. "experience_assessment": {"relevant_years": number, "role_progression": assessment, "industry_fit": assessment}
+11. "recommendations": list of improvement suggestions (3-5 items)
+12. "risk_factors": list of potential hiring risks (2-3 items)
+
+Return only valid JSON without any markdown formatting or code blocks."""
+    
+    # Per-request prompt, parsed once at import and filled by _create_base_prompt
+    # Job-dependent sections come first so that, when one job is scored against many resumes, the
+    # system message plus this prefix is identical across requests and eligible for automatic prompt caching
+    SCORING_PROMPT_TEMPLATE = string.Template("""
+**JOB CONTEXT:**
+Position: $job_title
+Experience Level: $experience_level$level_guidance
+
+**SCORING METHODOLOGY ($weight_source):**
+Use these exact weights for scoring:
+- Technical Skills Match ($skills_weight%)
+- Experience Relevance ($experience_weight%) 
+- Education & Qualifications ($education_weight%)
+- Domain Expertise ($domain_weight%)
+
+**JOB DESCRIPTION:**
+$job_description
+
+**CANDIDATE ANALYSIS:**
+Pre-calculated Skills Match: $skills_match%
+Experience: $total_years years
+Education: $highest_degree$user_comments_section
+
+**RESUME:**
+$resume_text
+""")
+    
+    # Level-specific rubric, baked into one prompt template per known experience level
+    EXPERIENCE_LEVEL_GUIDANCE = {
+        'entry': "Focus on learning ability, projects, internships and education over years of experience.",
+        'mid': "Focus on hands-on delivery and depth in the core stack; expect independent ownership of features.",
+        'senior': "Focus on architecture, technical leadership and mentorship alongside depth of experience.",
+        'not specified': ""
+    }
+    
+    CANDIDATE_CONTEXT_TEMPLATE = string.Template("""
+
+**CANDIDATE CONTEXT:**
+Applying to $job_title at $company_name. 
+Structured Profile: $structured_feedback
+Scoring Bonus Applied: +$total_bonus points
+Original Comments: "$user_comments"
+""")
+    
     def __init__(self):
-        # Initialize new components
-        self.embedding_matcher = EmbeddingSkillsMatcher()
+        # Initialize new components; the legacy skills processor is the fallback matcher and
+        # supplies the alias table used to canonicalize skills before embedding
+        self.skills_processor = get_default_skills_processor()
+        self.embedding_matcher = EmbeddingSkillsMatcher(skill_aliases=self.skills_processor.normalized_skills)
         self.weight_calculator = DynamicWeightCalculator()
         
         # No hardcoded fallback weights - will use equal distribution if needed
         
         # Simplified 3-tier scoring system
+        good, strong = _SCORE_THRESHOLDS
         self.score_ranges = {
-            (70, 100): "Strong Match",
-            (40, 69): "Good Match", 
-            (0, 39): "Weak Match"
+            (strong, 100): "Strong Match",
+            (good, strong - 1): "Good Match",
+            (0, good - 1): "Weak Match"
         }
         
-        # Keep legacy skills processor as fallback
-        self.skills_processor = SkillsProcessor()
+        # Partially evaluated prompt templates; only resume/job specifics are substituted per request
+        self._prompt_templates_by_level = {
+            level: string.Template(self.SCORING_PROMPT_TEMPLATE.safe_substitute(
+                experience_level=level,
+                level_guidance=f"\nLevel Focus: {guidance}" if guidance else ""
+            ))
+            for level, guidance in self.EXPERIENCE_LEVEL_GUIDANCE.items()
+        }
     
     def get_dynamic_weights(self, job_data: Dict[str, Any]) -> Dict[str, float]:
         """Get dynamic weights for scoring based on job context"""
         return self.weight_calculator.calculate_scoring_weights(job_data)
 
+    def _get_score_category(self, score: float) -> str:
+        """Map a 0-100 score to its match category"""
+        try:
+            return _SCORE_LABELS[bisect.bisect_right(_SCORE_THRESHOLDS, score)]
+        except TypeError:
+            return _SCORE_LABELS[0]
+
     def _enhanced_skills_match(self, resume_skills: List[str], job_skills: List[str]) -> Dict[str, Any]:
         """Use embedding-based semantic matching with fallback to legacy matcher"""
         try:
             # Try embedding-based matching first
             embedding_result = self.embedding_matcher.calculate_semantic_similarity(resume_skills, job_skills)
-            
-            # Convert to expected format
-            return {
-                'match_percentage': embedding_result['coverage_percentage'],
-                'matching_skills': embedding_result['matched_skills'],
-                'total_job_skills': embedding_result['total_job_skills'],
-                'total_matched': embedding_result['total_matched'],
-                'skill_matches': embedding_result['skill_matches'],
-                'similarity_score': embedding_result['similarity_score'],
-                'method': 'embedding'
-            }
+            return self._format_embedding_skills_match(embedding_result)
+        except Exception as e:
+            logger.warning("Embedding matching failed, using fallback: %s", e)
+            return self._legacy_skills_match(resume_skills, job_skills)
+    
+    def _enhanced_skills_match_batch(self, resume_skill_lists: List[List[str]], job_skills: List[str]) -> List[Dict[str, Any]]:
+        """_enhanced_skills_match for many resumes against one job, embedding all skills in one pass"""
+        try:
+            embedding_results = self.embedding_matcher.calculate_semantic_similarity_batch(resume_skill_lists, job_skills)
         except Exception as e:
-            logger.warning(f"Embedding matching failed, using fallback: {e}")
-            # Fallback to legacy matching
-            legacy_result = self.skills_processor.match_skills(resume_skills, job_skills)
-            legacy_result['method'] = 'legacy'
-            return legacy_result
+            logger.warning("Batched embedding matching failed, matching resumes individually: %s", e)
+            return [self._enhanced_skills_match(resume_skills, job_skills) for resume_skills in resume_skill_lists]
+        
+        results = []
+        for resume_skills, embedding_result in zip(resume_skill_lists, embedding_results):
+            try:
+                results.append(self._format_embedding_skills_match(embedding_result))
+            except KeyError:
+                # Same fallback as the single-resume path when embeddings yield no comparison
+                results.append(self._legacy_skills_match(resume_skills, job_skills))
+        return results
+    
+    def _format_embedding_skills_match(self, embedding_result: Dict[str, Any]) -> Dict[str, Any]:
+        # Convert to expected format
+        return {
+            'match_percentage': embedding_result['coverage_percentage'],
+            'matching_skills': embedding_result['matched_skills'],
+            'total_job_skills': embedding_result['total_job_skills'],
+            'total_matched': embedding_result['total_matched'],
+            'skill_matches': embedding_result['skill_matches'],
+            'similarity_score': embedding_result['similarity_score'],
+            'method': 'embedding'
+        }
+    
+    def _legacy_skills_match(self, resume_skills: List[str], job_skills: List[str]) -> Dict[str, Any]:
+        legacy_result = self.skills_processor.match_skills(resume_skills, job_skills)
+        legacy_result['method'] = 'legacy'
+        return legacy_result
 
-    def _calculate_experience_relevance(self, experience: List[Dict], job_title: str, job_description: str) -> Dict[str, Any]:
+    def _calculate_experience_relevance(self, experience: List[Dict], job_title: str, job_description: str,
+                                        current_year: int = None) -> Dict[str, Any]:
         """Use embedding-based experience matching with fallback to legacy method"""
         if not experience:
             return {'relevance_score': 0, 'relevant_years': 0, 'total_years': 0}
         
+        current_year = current_year or datetime.now().year
         try:
             # Try embedding-based experience matching
             embedding_result = self.embedding_matcher.calculate_experience_similarity(experience, job_description)
             
-            # Calculate years for relevant experiences
-            total_years = self._calculate_experience_years(experience)
+            # Parse each entry's dates once; total and relevant years both read from this
+            entry_years = [self._extract_years_from_date(exp.get('date', ''), current_year) for exp in experience]
+            total_years = sum(entry_years)
             relevant_years = 0
             
             for rel_exp in embedding_result['relevant_experiences']:
-                exp_index = rel_exp['index']
-                years = self._extract_years_from_date(experience[exp_index].get('date', ''), datetime.now().year)
                 # Weight years by similarity score
-                relevant_years += years * rel_exp['similarity']
+                relevant_years += entry_years[rel_exp['index']] * rel_exp['similarity']
             
             return {
                 'relevance_score': embedding_result['similarity_score'] * 100,
@@ -86,39 +329,33 @@ class BaseScoringEngine:
             }
             
         except Exception as e:
-            logger.warning(f"Embedding experience matching failed, using fallback: {e}")
+            logger.warning("Embedding experience matching failed, using fallback: %s", e)
             # Fallback to legacy method
-            return self._legacy_calculate_experience_relevance(experience, job_title, job_description)
+            return self._legacy_calculate_experience_relevance(experience, job_title, job_description, current_year)
     
-    def _legacy_calculate_experience_relevance(self, experience: List[Dict], job_title: str, job_description: str) -> Dict[str, Any]:
+    def _legacy_calculate_experience_relevance(self, experience: List[Dict], job_title: str, job_description: str,
+                                               current_year: int = None) -> Dict[str, Any]:
         """Legacy keyword-based experience relevance calculation"""
         
+        current_year = current_year or datetime.now().year
         total_years = 0
         relevant_years = 0
         
-        # Extract key job keywords
-        job_keywords = set()
-        for word in (job_title + " " + job_description).lower().split():
-            if len(word) > 3:  # Filter out short words
-                job_keywords.add(word)
+        # Extract key job keywords (cached per job text, shared by every resume scored against the job)
+        job_keywords = _keyword_set(job_title + " " + job_description)
+        total_job_keywords = len(job_keywords)
+        job_title_is_role = _mentions_role(job_title.lower())
         
         for exp in experience:
-            years = self._extract_years_from_date(exp.get('date', ''), datetime.now().year)
+            years = self._extract_years_from_date(exp.get('date', ''), current_year)
             total_years += years
             
             # Check relevance based on title and description similarity
             exp_title = exp.get('title', '').lower()
             exp_desc = exp.get('description', '').lower()
             
-            # Extract experience keywords
-            exp_keywords = set()
-            for word in (exp_title + " " + exp_desc).split():
-                if len(word) > 3:
-                    exp_keywords.add(word)
-            
             # Calculate keyword overlap
-            overlap = len(job_keywords.intersection(exp_keywords))
-            total_job_keywords = len(job_keywords)
+            overlap = len(job_keywords.intersection(_keyword_set(exp_title + " " + exp_desc)))
             
             # More generous relevance calculation
             if total_job_keywords > 0:
@@ -127,9 +364,8 @@ class BaseScoringEngine:
                 relevance_factor = 0.5  # Default moderate relevance
             
             # Boost relevance for obvious title matches
-            if any(key in exp_title for key in ['engineer', 'developer', 'analyst', 'manager']):
-                if any(key in job_title.lower() for key in ['engineer', 'developer', 'analyst', 'manager']):
-                    relevance_factor = max(relevance_factor, 0.8)
+            if job_title_is_role and _mentions_role(exp_title):
+                relevance_factor = max(relevance_factor, 0.8)
             
             relevant_years += years * relevance_factor
         
@@ -144,55 +380,31 @@ class BaseScoringEngine:
         }
 
     def _get_highest_degree(self, education: List[Dict]) -> str:
-        degree_hierarchy = {
-            'phd': 5, 'doctorate': 5, 'doctoral': 5,
-            'master': 4, 'masters': 4, 'mba': 4, 'ms': 4, 'ma': 4,
-            'bachelor': 3, 'bachelors': 3, 'bs': 3, 'ba': 3, 'be': 3,
-            'associate': 2, 'associates': 2,
-            'diploma': 1, 'certificate': 1
-        }
-        
         highest_level = 0
         highest_degree = 'No degree specified'
         
         for edu in education:
-            degree = edu.get('degree', '').lower()
-            for degree_type, level in degree_hierarchy.items():
-                if degree_type in degree and level > highest_level:
-                    highest_level = level
-                    highest_degree = edu.get('degree', degree_type)
+            degree = edu.get('degree', '')
+            level = _degree_level(degree)
+            if level > highest_level:
+                highest_level = level
+                highest_degree = degree
         
         return highest_degree
 
     def _get_degree_score(self, degree: str) -> int:
-        degree_lower = degree.lower()
-        if any(term in degree_lower for term in ['phd', 'doctorate', 'doctoral']):
-            return 100
-        elif any(term in degree_lower for term in ['master', 'mba', 'ms', 'ma']):
-            return 80
-        elif any(term in degree_lower for term in ['bachelor', 'bs', 'ba', 'be']):
-            return 60
-        elif any(term in degree_lower for term in ['associate']):
-            return 40
-        elif any(term in degree_lower for term in ['diploma', 'certificate']):
-            return 20
-        else:
-            return 0
+        return _DEGREE_LEVEL_SCORES[_degree_level(degree)]
 
     def _evaluate_experience_level(self, years: float, required_level: str) -> Dict[str, Any]:
-        level_requirements = {
-            'entry': (0, 2),
-            'mid': (3, 6),
-            'senior': (7, float('inf'))
-        }
+        requirement = _LEVEL_REQUIREMENTS.get(required_level.lower() if required_level else '')
         
-        if required_level.lower() in level_requirements:
-            min_years, max_years = level_requirements[required_level.lower()]
+        if requirement is not None:
+            min_years, max_years, required_range = requirement
             meets_requirement = min_years <= years <= max_years
             
             return {
                 'meets_requirement': meets_requirement,
-                'required_range': f"{min_years}-{max_years if max_years != float('inf') else '+'} years",
+                'required_range': required_range,
                 'actual_years': years,
                 'level_match_score': 100 if meets_requirement else max(0, 100 - abs(years - min_years) * 10)
             }
@@ -204,50 +416,18 @@ class BaseScoringEngine:
             'level_match_score': 70  # Neutral score
         }
 
-    def _calculate_experience_years(self, experience: List[Dict]) -> float:
-        total_years = 0
-        current_year = datetime.now().year
-        
-        for exp in experience:
-            date_str = exp.get('date', '')
-            years = self._extract_years_from_date(date_str, current_year)
-            total_years += years
-            
-        return total_years
+    def _calculate_experience_years(self, experience: List[Dict], current_year: int = None) -> float:
+        current_year = current_year or datetime.now().year
+        return sum(_years_from_date(exp.get('date', ''), current_year) for exp in experience)
 
     def _extract_years_from_date(self, date_str: str, current_year: int) -> float:
-        if not date_str:
-            return 0
-            
-        import re
-        
-        # Handle various date formats
-        date_patterns = [
-            r'(\d{4})\s*[-–]\s*(\d{4})',  # 2020-2023
-            r'(\d{4})\s*[-–]\s*(?:present|current)',  # 2020-present
-            r'(\d{1,2})/(\d{4})\s*[-–]\s*(\d{1,2})/(\d{4})',  # 01/2020-12/2023
-            r'(\d{4})',  # Just year
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, date_str.lower())
-            if match:
-                if 'present' in date_str.lower() or 'current' in date_str.lower():
-                    start_year = int(match.group(1))
-                    return current_year - start_year
-                elif len(match.groups()) >= 2:
-                    start_year = int(match.group(1))
-                    end_year = int(match.group(2)) if match.group(2).isdigit() else current_year
-                    return end_year - start_year
-                else:
-                    return 1  # Default to 1 year if only one year found
-        
-        return 0
+        return _years_from_date(date_str, current_year)
 
-    def _create_base_prompt(self, resume_data: Dict[str, Any], job_data: Dict[str, Any], structured_analysis: Dict[str, Any], provider: str = "AI", dynamic_weights: Dict[str, float] = None) -> str:
+    def _create_base_prompt(self, resume_data: Dict[str, Any], job_data: Dict[str, Any], structured_analysis: Dict[str, Any], provider: str = "AI", dynamic_weights: Dict[str, float] = None,
+                            structured_comments_data: Dict[str, Any] = None) -> str:
         
-        resume_text = resume_data.get('full_text', 'Not available')
-        job_description = job_data.get('description', 'Not available')
+        resume_text = resume_data.get('full_text') or 'Not available'
+        job_description = job_data.get('description') or 'Not available'
         job_title = job_data.get('title', 'Not specified')
         experience_level = job_data.get('experience_level', 'not specified')
         
@@ -259,11 +439,11 @@ class BaseScoringEngine:
         # Check for user comments with enhanced contextual integration
         user_comments = resume_data.get('user_comments', '')
         user_comments_section = ""
-        structured_comments_data = {}
         
         if user_comments:
-            # Process structured comments
-            structured_comments_data = process_user_comments(user_comments, job_data)
+            # Reuse the caller's comment analysis when available; it is a model call
+            if structured_comments_data is None:
+                structured_comments_data = process_user_comments(user_comments, job_data)
             
             # Extract company name from job data if available
             company_name = job_data.get('company', 'the company')
@@ -275,14 +455,13 @@ class BaseScoringEngine:
             # IMPORTANT: Only include comments in AI prompt if they provide positive bonus
             # This prevents misaligned comments from negatively influencing the base score
             if total_bonus > 0:
-                user_comments_section = f"""
-
-**CANDIDATE CONTEXT:**
-Applying to {job_title} at {company_name}. 
-Structured Profile: {structured_feedback}
-Scoring Bonus Applied: +{total_bonus:.1f} points
-Original Comments: "{user_comments}"
-"""
+                user_comments_section = self.CANDIDATE_CONTEXT_TEMPLATE.substitute(
+                    job_title=job_title,
+                    company_name=company_name,
+                    structured_feedback=structured_feedback,
+                    total_bonus=f"{total_bonus:.1f}",
+                    user_comments=user_comments
+                )
             else:
                 # Don't include misaligned comments in the prompt to avoid negative influence
                 user_comments_section = ""
@@ -301,56 +480,73 @@ Original Comments: "{user_comments}"
             domain_weight = 20
             weight_source = "STATIC (fallback)"
 
-        base_prompt = f"""
-You are a senior technical recruiter with 15+ years of experience. Analyze this resume against the job requirements and provide comprehensive scoring.
-
-**JOB CONTEXT:**
-Position: {job_title}
-Experience Level: {experience_level}
-Pre-calculated Skills Match: {skills_analysis.get('match_percentage', 0):.1f}%
-Experience: {experience_analysis.get('total_years', 0)} years
-Education: {education_analysis.get('highest_degree', 'Not specified')}{user_comments_section}
-
-**SCORING METHODOLOGY ({weight_source}):**
-Use these exact weights for scoring:
-- Technical Skills Match ({skills_weight}%)
-- Experience Relevance ({experience_weight}%) 
-- Education & Qualifications ({education_weight}%)
-- Domain Expertise ({domain_weight}%)
-
-**CRITICAL SCORING GUIDELINES:**
-- Use FULL 0-100 range, avoid clustering around 70-85
-- Score 90-100: Exceptional match, exceeds requirements
-- Score 75-89: Good match with minor gaps
-- Score 60-74: Moderate match, some development needed
-- Score 40-59: Weak match, significant gaps
-- Score 0-39: Poor match, fundamentally misaligned
-- Be decisive: <30% skills = <50 score, >80% skills + good experience = >85 score
-- Factor in candidate context when provided
-
-**REQUIRED JSON OUTPUT:**
-1. "overall_score": integer 0-100 (factor in candidate context)
-2. "confidence_level": "High"/"Medium"/"Low"
-3. "score_breakdown": {{"skills_score": 0-100, "experience_score": 0-100, "education_score": 0-100, "domain_score": 0-100}}
-4. "match_category": score interpretation
-5. "summary": brief executive summary (2-3 sentences)
-6. "strengths": key strengths (3-5 items)
-7. "concerns": main concerns (2-4 items)
-8. "missing_skills": list of missing required skills
-9. "matching_skills": list of matching skills found
-10. "experience_assessment": {{"relevant_years": number, "role_progression": assessment, "industry_fit": assessment}}
-11. "recommendations": list of improvement suggestions (3-5 items)
-12. "risk_factors": list of potential hiring risks (2-3 items)
-
-**RESUME:**
-{resume_text}
-
-**JOB DESCRIPTION:**
-{job_description}
+        # Known levels use their prebuilt template; anything else falls back to the generic one
+        prompt_template = self._prompt_templates_by_level.get(
+            str(experience_level).strip().lower(), self.SCORING_PROMPT_TEMPLATE
+        )
+        
+        # Job-side fields are bound once per job and template; only candidate fields vary per resume
+        prompt_template = _bind_job_fields(prompt_template, (
+            ('job_title', job_title),
+            ('experience_level', experience_level),
+            ('level_guidance', ''),
+            ('weight_source', weight_source),
+            ('skills_weight', skills_weight),
+            ('experience_weight', experience_weight),
+            ('education_weight', education_weight),
+            ('domain_weight', domain_weight)
+        ))
+        
+        prompt_fields = {
+            'skills_match': f"{skills_analysis.get('match_percentage', 0):.1f}",
+            'total_years': experience_analysis.get('total_years', 0),
+            'highest_degree': education_analysis.get('highest_degree', 'Not specified'),
+            'user_comments_section': user_comments_section
+        }
+        
+        # Fit resume and job text into whatever the input budget leaves after the fixed scaffolding
+        fixed_tokens = count_tokens(prompt_template.substitute(prompt_fields, resume_text='', job_description=''))
+        resume_tokens = count_tokens(resume_text)
+        job_tokens = count_tokens(job_description)
+        resume_budget, job_budget = allocate_token_budget(
+            resume_tokens, job_tokens, max(0, config.scoring.max_prompt_input_tokens - fixed_tokens)
+        )
+        if resume_budget < resume_tokens or job_budget < job_tokens:
+            logger.info("Prompt over budget, truncating resume %s->%s and job %s->%s tokens (%s fixed)",
+                        resume_tokens, resume_budget, job_tokens, job_budget, fixed_tokens)
+        
+        return prompt_template.substitute(
+            prompt_fields,
+            resume_text=self._fit_resume_to_budget(resume_text, job_description, resume_budget),
+            job_description=truncate_to_token_budget(job_description, job_budget)
+        )
 
-Return only valid JSON without any markdown formatting or code blocks.
-"""
-        return base_prompt
+    def _fit_resume_to_budget(self, resume_text: str, job_description: str, max_tokens: int) -> str:
+        """Trim the resume to max_tokens, preferring the lines most relevant to the job"""
+        if count_tokens(resume_text) <= max_tokens:
+            return resume_text
+        
+        lines = [line.strip() for line in resume_text.split('\n') if line.strip()]
+        if config.scoring.salient_resume_truncation and len(lines) > 1:
+            try:
+                line_embeddings = self.embedding_matcher.get_embeddings(lines)
+                job_embedding = self.embedding_matcher.get_embeddings([job_description])
+            except Exception as e:
+                logger.warning("Salient resume truncation failed, truncating the tail instead: %s", e)
+                line_embeddings = job_embedding = np.array([])
+            
+            if line_embeddings.size and job_embedding.size and len(line_embeddings) == len(lines):
+                similarities = line_embeddings @ job_embedding[0]
+                kept, used = [], count_tokens(TRUNCATION_MARKER)
+                for index in np.argsort(-similarities, kind='stable'):
+                    line_tokens = count_tokens(lines[index]) + 1
+                    if used + line_tokens <= max_tokens:
+                        kept.append(index)
+                        used += line_tokens
+                if kept:
+                    return "\n".join(lines[index] for index in sorted(kept)) + TRUNCATION_MARKER
+        
+        return truncate_to_token_budget(resume_text, max_tokens)
 
     def _create_standard_error_response(self, provider: str, error_message: str) -> Dict[str, Any]:
         return {
@@ -1,21 +1,60 @@
 from openai import OpenAI
-import json
 import os
-from typing import Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional
 import logging
 from dotenv import load_dotenv
+from .json_utils import json_loads
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 class DynamicWeightCalculator:
+    # Weights depend only on the job, so screening many resumes against one job asks GPT once per job
+    weights_cache_size = 256
+    
     def __init__(self):
         self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.model = "gpt-4o-mini"
+        self._weights_cache: "OrderedDict[tuple, Dict[str, float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+    
+    def _get_or_compute(self, key: tuple, compute: Callable[[], Optional[Dict[str, float]]]) -> Optional[Dict[str, float]]:
+        """Return cached weights for key, computing them at most once even under concurrent callers"""
+        with self._cache_lock:
+            if key in self._weights_cache:
+                self._weights_cache.move_to_end(key)
+                return dict(self._weights_cache[key])
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            with self._cache_lock:
+                cached = self._weights_cache.get(key)
+            if cached is not None:
+                return dict(cached)
+            
+            weights = compute()
+            with self._cache_lock:
+                # Failures are not cached so a transient API error does not pin the fallback weights
+                if weights is not None:
+                    self._weights_cache[key] = weights
+                    while len(self._weights_cache) > self.weights_cache_size:
+                        self._weights_cache.popitem(last=False)
+                self._key_locks.pop(key, None)
+        return dict(weights) if weights is not None else None
     
     def calculate_scoring_weights(self, job_data: Dict[str, Any]) -> Dict[str, float]:
         """Use GPT to determine dynamic weights for main scoring components"""
-        
+        key = (
+            'scoring', job_data.get('title', 'Not specified'), job_data.get('company', 'Not specified'),
+            job_data.get('experience_level', 'Not specified'), job_data.get('description', 'Not available')[:1500]
+        )
+        weights = self._get_or_compute(key, lambda: self._request_scoring_weights(job_data))
+        return weights if weights is not None else self._get_fallback_scoring_weights()
+    
+    def _request_scoring_weights(self, job_data: Dict[str, Any]) -> Optional[Dict[str, float]]:
         prompt = f"""
         Analyze this job posting and determine the optimal scoring weights based on what the employer emphasizes most.
         
@@ -64,24 +103,31 @@ class DynamicWeightCalculator:
                 max_tokens=500
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json_loads(response.choices[0].message.content)
             weights = result.get('weights', {})
             
             # Validate and normalize weights
             if self._validate_weights(weights):
-                logger.info(f"Dynamic scoring weights calculated: {weights}")
+                logger.info("Dynamic scoring weights calculated: %s", weights)
                 return weights
             else:
                 logger.warning("Invalid weights from GPT, using fallback")
-                return self._get_fallback_scoring_weights()
+                return None
                 
         except Exception as e:
-            logger.error(f"Error calculating dynamic scoring weights: {e}")
-            return self._get_fallback_scoring_weights()
+            logger.error("Error calculating dynamic scoring weights: %s", e)
+            return None
     
     def calculate_comment_weights(self, job_data: Dict[str, Any]) -> Dict[str, float]:
         """Use GPT to determine dynamic weights for comment evaluation dimensions"""
-        
+        key = (
+            'comment', job_data.get('title', 'Not specified'), job_data.get('company', 'Not specified'),
+            job_data.get('description', 'Not available')[:1200]
+        )
+        weights = self._get_or_compute(key, lambda: self._request_comment_weights(job_data))
+        return weights if weights is not None else self._get_fallback_comment_weights()
+    
+    def _request_comment_weights(self, job_data: Dict[str, Any]) -> Optional[Dict[str, float]]:
         prompt = f"""
         Analyze this job posting and determine how much weight each candidate self-assessment dimension should have.
         
@@ -131,20 +177,20 @@ class DynamicWeightCalculator:
                 max_tokens=400
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json_loads(response.choices[0].message.content)
             weights = result.get('weights', {})
             
             # Validate and normalize weights
             if self._validate_weights(weights):
-                logger.info(f"Dynamic comment weights calculated: {weights}")
+                logger.info("Dynamic comment weights calculated: %s", weights)
                 return weights
             else:
                 logger.warning("Invalid comment weights from GPT, using fallback")
-                return self._get_fallback_comment_weights()
+                return None
                 
         except Exception as e:
-            logger.error(f"Error calculating dynamic comment weights: {e}")
-            return self._get_fallback_comment_weights()
+            logger.error("Error calculating dynamic comment weights: %s", e)
+            return None
     
     def _validate_weights(self, weights: Dict[str, float]) -> bool:
         """Validate that weights are valid and sum to approximately 1.0"""
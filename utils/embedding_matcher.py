@@ -1,15 +1,37 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from typing import List, Dict, Any, Tuple, Optional
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import List, Dict, Any, Tuple, Optional, TYPE_CHECKING
+from collections import OrderedDict
+from functools import lru_cache
+import sys
+import threading
 import logging
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=512)
+def normalize_skill_names(skills: Tuple[str, ...]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Drop blank skills and return (original names, interned lowercase names) in matching order.
+    
+    Cached per skill list, so a resume or job scored many times is normalized once.
+    """
+    originals = []
+    names = []
+    for skill in skills:
+        name = skill.strip().lower()
+        if name:
+            originals.append(skill)
+            names.append(sys.intern(name))
+    return tuple(originals), tuple(names)
+
+
 class ModelSingleton:
     """Singleton to ensure model is loaded only once"""
     _instance: Optional['ModelSingleton'] = None
-    _model: Optional[SentenceTransformer] = None
+    _model: Optional['SentenceTransformer'] = None
     _model_name: Optional[str] = None
     
     def __new__(cls):
@@ -17,31 +39,46 @@ class ModelSingleton:
             cls._instance = super().__new__(cls)
         return cls._instance
     
-    def get_model(self, model_name: str = "all-MiniLM-L6-v2") -> Optional[SentenceTransformer]:
+    def get_model(self, model_name: str = "all-MiniLM-L6-v2") -> Optional['SentenceTransformer']:
         """Get model, loading it only if not already loaded or if different model requested"""
         if self._model is None or self._model_name != model_name:
             try:
-                logger.info(f"Loading embedding model: {model_name}")
+                logger.info("Loading embedding model: %s", model_name)
+                # Imported on first load: sentence_transformers pulls in torch and dominates import time
+                from sentence_transformers import SentenceTransformer
                 self._model = SentenceTransformer(model_name)
                 self._model_name = model_name
-                logger.info(f"Successfully loaded embedding model: {model_name}")
+                logger.info("Successfully loaded embedding model: %s", model_name)
             except Exception as e:
-                logger.error(f"Failed to load embedding model: {e}")
+                logger.error("Failed to load embedding model: %s", e)
                 self._model = None
                 self._model_name = None
         else:
-            logger.debug(f"Reusing cached embedding model: {model_name}")
+            logger.debug("Reusing cached embedding model: %s", model_name)
         
         return self._model
 
 class EmbeddingSkillsMatcher:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    # Process-wide cache of unit-normalized embeddings keyed by (model, cleaned text); skills and
+    # job descriptions recur across scoring calls, so most lookups skip the encoder entirely
+    _embedding_cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+    _embedding_cache_lock = threading.Lock()
+    embedding_cache_size = 10000
+    
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", skill_aliases: Optional[Dict[str, str]] = None):
         """Initialize with a lightweight, fast sentence transformer model"""
         self.model_singleton = ModelSingleton()
         self.model_name = model_name
+        # Lowercase alias -> canonical skill name; aliases the encoder cannot relate ("k8s", "psql")
+        # are embedded as their canonical form so they match exactly
+        self.skill_aliases = skill_aliases or {}
+    
+    def _canonical_names(self, names: Tuple[str, ...]) -> List[str]:
+        aliases = self.skill_aliases
+        return [aliases.get(name, name) for name in names]
     
     @property
-    def model(self) -> Optional[SentenceTransformer]:
+    def model(self) -> Optional['SentenceTransformer']:
         """Get the model from singleton"""
         return self.model_singleton.get_model(self.model_name)
     
@@ -53,7 +90,7 @@ class EmbeddingSkillsMatcher:
         logger.info("Embedding model preloaded at startup")
     
     def get_embeddings(self, texts: List[str]) -> np.ndarray:
-        """Get embeddings for a list of texts"""
+        """Get L2-normalized embeddings for a list of texts, so cosine similarity is a plain dot product"""
         if not self.model:
             return np.array([])
         
@@ -62,38 +99,94 @@ class EmbeddingSkillsMatcher:
         if not cleaned_texts:
             return np.array([])
         
-        try:
-            embeddings = self.model.encode(cleaned_texts)
-            return embeddings
-        except Exception as e:
-            logger.error(f"Error generating embeddings: {e}")
-            return np.array([])
+        return self._embed_cleaned(cleaned_texts)
+    
+    def _embed_cleaned(self, cleaned_texts) -> np.ndarray:
+        """Embed texts that are already stripped, lowercased and non-empty"""
+        cache = EmbeddingSkillsMatcher._embedding_cache
+        vectors = {}
+        with self._embedding_cache_lock:
+            for text in cleaned_texts:
+                key = (self.model_name, text)
+                if key in cache:
+                    cache.move_to_end(key)
+                    vectors[text] = cache[key]
+        
+        missing = [text for text in dict.fromkeys(cleaned_texts) if text not in vectors]
+        if missing:
+            try:
+                encoded = self.model.encode(missing, normalize_embeddings=True)
+            except Exception as e:
+                logger.error("Error generating embeddings: %s", e)
+                return np.array([])
+            
+            with self._embedding_cache_lock:
+                for text, vector in zip(missing, encoded):
+                    vectors[text] = vector
+                    cache[(self.model_name, text)] = vector
+                while len(cache) > self.embedding_cache_size:
+                    cache.popitem(last=False)
+        
+        return np.vstack([vectors[text] for text in cleaned_texts])
     
     def calculate_semantic_similarity(self, resume_skills: List[str], job_skills: List[str]) -> Dict[str, Any]:
         """Calculate semantic similarity between resume and job skills"""
         if not resume_skills or not job_skills:
-            return {
-                'similarity_score': 0.0,
-                'matched_skills': [],
-                'skill_matches': [],
-                'coverage_percentage': 0.0
-            }
+            return self._empty_similarity()
+        
+        # Normalize once; blank entries are dropped so embedding rows line up with skill indices
+        resume_skills, resume_names = normalize_skill_names(tuple(resume_skills))
+        job_skills, job_names = normalize_skill_names(tuple(job_skills))
         
         # Get embeddings
-        resume_embeddings = self.get_embeddings(resume_skills)
-        job_embeddings = self.get_embeddings(job_skills)
+        resume_embeddings = self._embed_cleaned(self._canonical_names(resume_names)) if resume_names and self.model else np.array([])
+        job_embeddings = self._embed_cleaned(self._canonical_names(job_names)) if job_names and self.model else np.array([])
         
         if resume_embeddings.size == 0 or job_embeddings.size == 0:
-            return {
-                'similarity_score': 0.0,
-                'matched_skills': [],
-                'skill_matches': [],
-                'coverage_percentage': 0.0
-            }
+            return self._empty_similarity()
         
         # Calculate similarity matrix
-        similarity_matrix = cosine_similarity(resume_embeddings, job_embeddings)
+        return self._summarize_skill_similarity(resume_embeddings @ job_embeddings.T, resume_skills, job_skills)
+    
+    def calculate_semantic_similarity_batch(self, resume_skill_lists: List[List[str]], job_skills: List[str]) -> List[Dict[str, Any]]:
+        """Match several resumes' skills against one job's skills.
+        
+        All skills go through a single encode call and a single similarity matmul, which is then
+        split back into one (resume skills x job skills) block per resume.
+        """
+        if not job_skills:
+            return [self._empty_similarity() for _ in resume_skill_lists]
+        
+        job_skills, job_names = normalize_skill_names(tuple(job_skills))
+        normalized = [normalize_skill_names(tuple(skills)) if skills else ((), ()) for skills in resume_skill_lists]
+        all_names = [name for _, names in normalized for name in names]
+        if not job_names or not all_names or not self.model:
+            return [self._empty_similarity() for _ in resume_skill_lists]
         
+        embeddings = self._embed_cleaned(self._canonical_names(job_names) + self._canonical_names(all_names))
+        if embeddings.size == 0:
+            return [self._empty_similarity() for _ in resume_skill_lists]
+        job_embeddings, resume_matrix = embeddings[:len(job_names)], embeddings[len(job_names):]
+        
+        boundaries = np.cumsum([len(names) for _, names in normalized])[:-1]
+        blocks = np.split(resume_matrix @ job_embeddings.T, boundaries)
+        return [
+            self._summarize_skill_similarity(block, originals, job_skills) if originals else self._empty_similarity()
+            for (originals, _), block in zip(normalized, blocks)
+        ]
+    
+    @staticmethod
+    def _empty_similarity() -> Dict[str, Any]:
+        return {
+            'similarity_score': 0.0,
+            'matched_skills': [],
+            'skill_matches': [],
+            'coverage_percentage': 0.0
+        }
+    
+    @staticmethod
+    def _summarize_skill_similarity(similarity_matrix: np.ndarray, resume_skills, job_skills) -> Dict[str, Any]:
+        """Turn a (resume skills x job skills) similarity matrix into the skills-match summary"""
         # Find best matches for each job skill
         matched_skills = []
         skill_matches = []
@@ -147,7 +240,7 @@ class EmbeddingSkillsMatcher:
             return {'similarity_score': 0.0, 'relevant_experiences': []}
         
         # Calculate similarities
-        similarities = cosine_similarity(exp_embeddings, job_embedding).flatten()
+        similarities = (exp_embeddings @ job_embedding.T).flatten()
         
         # Find relevant experiences (similarity > threshold)
         relevant_experiences = []
@@ -194,7 +287,7 @@ class EmbeddingSkillsMatcher:
             return {'relevance_score': 0.0, 'relevant_education': []}
         
         # Calculate similarities
-        similarities = cosine_similarity(edu_embeddings, job_embedding).flatten()
+        similarities = (edu_embeddings @ job_embedding.T).flatten()
         
         # Find most relevant education
         max_similarity = np.max(similarities) if len(similarities) > 0 else 0.0
@@ -1,4 +1,7 @@
 import logging
+import logging.handlers
+import queue
+import atexit
 import traceback
 import time
 from datetime import datetime, timedelta
@@ -100,11 +103,18 @@ class ErrorHandler:
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(detailed_formatter)
         
+        # File writes happen on a listener thread; request handlers only enqueue records
+        log_queue = queue.SimpleQueue()
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, error_handler, respect_handler_level=True
+        )
+        self._log_listener.start()
+        atexit.register(self._log_listener.stop)
+        
         # Setup main logger
         self.logger = logging.getLogger('ResumeRoast')
         self.logger.setLevel(logging.INFO)
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(error_handler)
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
         
         # Prevent duplicate logs
         self.logger.propagate = False
@@ -12,13 +12,14 @@ from openai import OpenAI
 
 from config import config
 from utils.error_handling import error_handler, ComponentMonitor, ErrorCategory, ErrorSeverity
-from utils.skills_matcher import SkillsProcessor
+from utils.skills_matcher import get_default_skills_processor
+from utils.json_utils import json_loads
 
 class JobDescriptionParser:
     def __init__(self):
         self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.model = "gpt-4o-mini"
-        self.skills_processor = SkillsProcessor()  # Initialize our skills processor
+        self.skills_processor = get_default_skills_processor()  # Shared with the scoring engine
         
         parser_config = config.job_parser
         self.user_agents = parser_config.user_agents
@@ -82,7 +83,7 @@ class JobDescriptionParser:
         if not description or description == "Job description not available":
             structured_data = soup.find('script', type='application/ld+json')
             if structured_data:
-                data = json.loads(structured_data.string)
+                data = json_loads(structured_data.string)
                 if isinstance(data, dict) and 'description' in data:
                     description = data['description']
         
@@ -105,7 +106,7 @@ class JobDescriptionParser:
         skills = job_data.get('skills', [])
         
         if not description or len(description.strip()) < 50:
-            error_handler.logger.warning(f"Description too short: {len(description.strip()) if description else 0} chars")
+            error_handler.logger.warning("Description too short: %s chars", len(description.strip()) if description else 0)
             return False
             
         if title == "Unknown Position":
@@ -211,7 +212,7 @@ class JobDescriptionParser:
         
         structured_data = soup.find('script', type='application/ld+json')
         if structured_data:
-            data = json.loads(structured_data.string)
+            data = json_loads(structured_data.string)
             if isinstance(data, dict) and 'description' in data:
                 return data['description']
         
@@ -248,7 +249,7 @@ class JobDescriptionParser:
             taxonomy_skills = self.skills_processor.extract_skills_from_text(description)
             ai_skills = self._extract_skills_openai(description)
             all_skills = list(set(taxonomy_skills + ai_skills))  # Combine and deduplicate
-            error_handler.logger.info(f"Extracted {len(all_skills)} skills using enhanced matching")
+            error_handler.logger.info("Extracted %s skills using enhanced matching", len(all_skills))
             return all_skills
         else:
             return self._extract_skills_openai(description)
@@ -281,7 +282,7 @@ class JobDescriptionParser:
             temperature=0.1
         )
         
-        result = json.loads(response.choices[0].message.content)
+        result = json_loads(response.choices[0].message.content)
         return result.get('skills', [])
 
     def _extract_requirements_openai(self, description: str) -> List[str]:
@@ -309,7 +310,7 @@ class JobDescriptionParser:
             temperature=0.1
         )
         
-        result = json.loads(response.choices[0].message.content)
+        result = json_loads(response.choices[0].message.content)
         return result.get('requirements', [])
 
     def extract_experience_level(self, description: str) -> str:
@@ -342,7 +343,7 @@ class JobDescriptionParser:
             temperature=0.1
         )
         
-        result = json.loads(response.choices[0].message.content)
+        result = json_loads(response.choices[0].message.content)
         level = result.get('experience_level', 'not specified')
         
         if level in ['entry', 'mid', 'senior', 'not specified']:
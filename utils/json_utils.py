@@ -0,0 +1,71 @@
+"""JSON helpers backed by orjson when it is installed, with stdlib fallbacks.
+
+orjson parses and serializes several times faster than the stdlib json module and raises
+JSONDecodeError subclasses of ValueError, so callers handle errors the same way either way.
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+    json_loads = orjson.loads
+    
+    def stable_json_bytes(obj: Any) -> bytes:
+        """Deterministic serialization (sorted keys) for hashing cache keys"""
+        return orjson.dumps(
+            obj, default=str,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    
+    def json_bytes(obj: Any, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+except ImportError:
+    json_loads = json.loads
+    
+    def stable_json_bytes(obj: Any) -> bytes:
+        """Deterministic serialization (sorted keys) for hashing cache keys"""
+        return json.dumps(obj, sort_keys=True, default=str).encode('utf-8')
+    
+    def json_bytes(obj: Any, indent: bool = False) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def loads_partial(text: str) -> Any:
+    """Parse the longest usable prefix of a truncated JSON document, such as a response still streaming in.
+    
+    Open containers are closed. A string or number still being written is dropped, cutting the text back
+    to the last element boundary, so every value returned is complete. Returns None when nothing parses yet.
+    """
+    closers = []
+    # (index, closers at that point): cutting the text at index and appending the closers gives valid nesting
+    cuts = []
+    in_string = escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            closers.append('}' if char == '{' else ']')
+            cuts.append((index + 1, ''.join(reversed(closers))))
+        elif char in '}]':
+            if closers:
+                closers.pop()
+        elif char == ',':
+            cuts.append((index, ''.join(reversed(closers))))
+    
+    candidates = []
+    if not in_string and text.rstrip()[-1:] in ('"', '}', ']'):
+        candidates.append(text + ''.join(reversed(closers)))
+    candidates.extend(text[:index] + suffix for index, suffix in reversed(cuts))
+    for candidate in candidates:
+        try:
+            return json_loads(candidate)
+        except ValueError:
+            continue
+    return None
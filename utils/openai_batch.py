@@ -0,0 +1,64 @@
+"""OpenAI Batch API round trip shared by offline scoring and offline comment analysis.
+
+Batches cost half as much as realtime calls and draw on a separate rate-limit pool, at up to
+24h turnaround.
+"""
+import asyncio
+import logging
+from typing import Any, Dict
+
+from openai import AsyncOpenAI
+from config import config
+from .json_utils import json_bytes, json_loads
+from .openai_retries import with_retries
+
+logger = logging.getLogger(__name__)
+
+_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+async def run_chat_batch(client: AsyncOpenAI, requests: Dict[str, Dict[str, Any]], filename: str = "batch.jsonl",
+                         poll_interval: float = None) -> Dict[str, Dict[str, Any]]:
+    """Submit chat completion requests (custom_id -> request body) as one batch, wait for it to finish and
+    return its output lines keyed by custom_id"""
+    jsonl = b"\n".join(
+        json_bytes({'custom_id': custom_id, 'method': 'POST', 'url': '/v1/chat/completions', 'body': body})
+        for custom_id, body in requests.items()
+    )
+    batch_file = await with_retries(client.files.create, file=(filename, jsonl), purpose="batch")
+    batch = await with_retries(
+        client.batches.create, input_file_id=batch_file.id, endpoint="/v1/chat/completions", completion_window="24h"
+    )
+    logger.info("Submitted OpenAI batch %s with %s requests", batch.id, len(requests))
+
+    # Back off exponentially so long-running batches are not polled at the initial rate for hours
+    delay = poll_interval if poll_interval is not None else config.api.batch_poll_interval_seconds
+    max_delay = max(delay, config.api.batch_poll_max_interval_seconds)
+    while batch.status not in _FINAL_STATUSES:
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+        batch = await with_retries(client.batches.retrieve, batch.id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"OpenAI batch {batch.id} ended with status {batch.status}")
+
+    outputs = {}
+    content = await with_retries(client.files.content, batch.output_file_id)
+    for raw_line in content.text.splitlines():
+        if raw_line.strip():
+            line = json_loads(raw_line)
+            outputs[line['custom_id']] = line
+    return outputs
+
+
+def batch_response_body(line: Dict[str, Any]) -> Dict[str, Any]:
+    """Completion body of a successful batch output line; ValueError for failed requests and truncated answers"""
+    response = line.get('response') or {}
+    if line.get('error') or response.get('status_code') != 200:
+        error = line.get('error') or {'status_code': response.get('status_code')}
+        raise ValueError(f"Batch request {line.get('custom_id')} failed: {error}")
+
+    body = response['body']
+    if body['choices'][0].get('finish_reason') == 'length':
+        raise ValueError(f"Batch request {line.get('custom_id')} was cut off at max_tokens")
+    return body
@@ -0,0 +1,34 @@
+"""Retry handling shared by the async OpenAI call sites.
+
+Clients are created with max_retries=0 and wrapped in with_retries, so each attempt goes back
+through the caller's own rate limiting instead of being multiplied by SDK-level retries.
+"""
+import asyncio
+import logging
+import random
+
+from openai import APIConnectionError, APIStatusError
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+def is_transient_api_error(error: Exception) -> bool:
+    """Connection failures, timeouts, rate limits and server errors; worth retrying and a sign the API is unhealthy"""
+    if isinstance(error, APIConnectionError):
+        return True
+    return isinstance(error, APIStatusError) and (error.status_code in (408, 409, 429) or error.status_code >= 500)
+
+
+async def with_retries(call, *args, **kwargs):
+    """Await call(*args, **kwargs), retrying transient API failures with exponential backoff and jitter"""
+    for attempt in range(config.api.max_retries + 1):
+        try:
+            return await call(*args, **kwargs)
+        except (APIStatusError, APIConnectionError) as e:
+            if not is_transient_api_error(e) or attempt == config.api.max_retries:
+                raise
+            delay = config.api.retry_base_delay * (2 ** attempt)
+            delay += random.uniform(0, delay)
+            logger.warning("OpenAI request failed (%s), retrying in %.1fs", e.__class__.__name__, delay)
+            await asyncio.sleep(delay)
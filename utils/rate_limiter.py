@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """Leaky-bucket limiter allowing at most max_rate units per time_period across concurrent coroutines"""
+
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._rate_per_sec = max_rate / time_period
+        self._level = 0.0
+        self._last_check = time.monotonic()
+
+    def _leak(self):
+        now = time.monotonic()
+        self._level = max(0.0, self._level - (now - self._last_check) * self._rate_per_sec)
+        self._last_check = now
+
+    def has_capacity(self, amount: float = 1.0) -> bool:
+        self._leak()
+        return self._level + amount <= self.max_rate
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # A single request larger than the whole budget would otherwise wait forever
+        amount = min(amount, self.max_rate)
+        # No lock needed: the check-and-consume below never yields to the event loop
+        while not self.has_capacity(amount):
+            await asyncio.sleep((self._level + amount - self.max_rate) / self._rate_per_sec)
+        self._level += amount
+
+    async def __aenter__(self):
+        await self.acquire()
+        return None
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
+
+
+class CircuitBreaker:
+    """Fails calls fast for reset_timeout seconds after failure_threshold consecutive provider failures"""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._open_until = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._open_until = 0.0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            # After the timeout the next call goes through as a probe; one more failure reopens the circuit
+            self._open_until = time.monotonic() + self.reset_timeout
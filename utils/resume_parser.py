@@ -3,8 +3,20 @@ from docx import Document
 from typing import Dict, List, Optional
 import re
 import os
-import json
 from openai import OpenAI
+from .json_utils import json_loads
+
+# Regex fallbacks run per line over whole resumes, so their patterns are compiled once at import
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'[\+]?[1-9]?[\s-]?\(?[0-9]{3}\)?[\s-]?[0-9]{3}[\s-]?[0-9]{4}')
+_YEAR_RE = re.compile(r'(?i)(20\d{2}|19\d{2})')
+_SKILL_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'(?i)(python|java|javascript|typescript|react|angular|vue|node\.js|express|django|flask|fastapi)',
+    r'(?i)(aws|azure|gcp|cloud|docker|kubernetes|terraform)',
+    r'(?i)(sql|mysql|postgresql|mongodb|redis|elasticsearch)',
+    r'(?i)(machine learning|deep learning|ai|nlp|computer vision)',
+    r'(?i)(agile|scrum|kanban|ci/cd|devops)'
+))
 
 class ResumeParser:
     def __init__(self):
@@ -17,6 +29,7 @@ class ResumeParser:
             'projects': r'(?i)(projects|portfolio)',
             'certifications': r'(?i)(certifications|certificates)'
         }
+        self._section_patterns = [(section, re.compile(pattern)) for section, pattern in self.sections.items()]
 
     def parse_pdf(self, file) -> Dict[str, str]:
         text = ""
@@ -87,7 +100,7 @@ class ResumeParser:
                 temperature=0.1
             )
             
-            parsed_data = json.loads(response.choices[0].message.content)
+            parsed_data = json_loads(response.choices[0].message.content)
             
             structured_text = {
                 'full_text': text,
@@ -115,11 +128,11 @@ class ResumeParser:
         }
 
         # Extract basic contact info using regex
-        email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
+        email_match = _EMAIL_RE.search(text)
         if email_match:
             structured_text['contact_info']['email'] = email_match.group()
 
-        phone_match = re.search(r'[\+]?[1-9]?[\s-]?\(?[0-9]{3}\)?[\s-]?[0-9]{3}[\s-]?[0-9]{4}', text)
+        phone_match = _PHONE_RE.search(text)
         if phone_match:
             structured_text['contact_info']['phone'] = phone_match.group()
 
@@ -139,8 +152,8 @@ class ResumeParser:
                 continue
 
             section_found = False
-            for section, pattern in self.sections.items():
-                if re.search(pattern, line):
+            for section, pattern in self._section_patterns:
+                if pattern.search(line):
                     if current_section != 'other':
                         structured_text['sections'][current_section] = '\n'.join(current_content)
                     current_section = section
@@ -185,7 +198,7 @@ class ResumeParser:
                 temperature=0.1
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json_loads(response.choices[0].message.content)
             return result.get('skills', [])
             
         except Exception as e:
@@ -193,17 +206,9 @@ class ResumeParser:
             return self._extract_skills_regex(text)
 
     def _extract_skills_regex(self, text: str) -> List[str]:
-        skill_patterns = [
-            r'(?i)(python|java|javascript|typescript|react|angular|vue|node\.js|express|django|flask|fastapi)',
-            r'(?i)(aws|azure|gcp|cloud|docker|kubernetes|terraform)',
-            r'(?i)(sql|mysql|postgresql|mongodb|redis|elasticsearch)',
-            r'(?i)(machine learning|deep learning|ai|nlp|computer vision)',
-            r'(?i)(agile|scrum|kanban|ci/cd|devops)'
-        ]
-
         skills = set()
-        for pattern in skill_patterns:
-            matches = re.finditer(pattern, text)
+        for pattern in _SKILL_PATTERNS:
+            matches = pattern.finditer(text)
             for match in matches:
                 skills.add(match.group().lower())
 
@@ -233,7 +238,7 @@ class ResumeParser:
                 temperature=0.1
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json_loads(response.choices[0].message.content)
             return result.get('experience', [])
             
         except Exception as e:
@@ -246,7 +251,7 @@ class ResumeParser:
         
         current_entry = {}
         for line in lines:
-            if re.search(r'(?i)(20\d{2}|19\d{2})', line):
+            if _YEAR_RE.search(line):
                 if current_entry:
                     experience_entries.append(current_entry)
                 current_entry = {'date': line.strip()}
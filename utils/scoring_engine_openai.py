@@ -1,33 +1,185 @@
 import os
-import json
-import re
-from openai import OpenAI
-from typing import Dict, Any, Tuple, List
+import asyncio
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
+from typing import Dict, Any, Tuple, List, Optional
 from datetime import datetime
+from types import MappingProxyType
 import logging
 from dotenv import load_dotenv
-from .base_scoring_engine import BaseScoringEngine
+from config import config
+from .base_scoring_engine import BaseScoringEngine, count_tokens
+from .structured_comments import (
+    close_comment_analyzer, process_user_comments, process_user_comments_async, process_user_comments_batch
+)
+from .rate_limiter import AsyncRateLimiter, CircuitBreaker
+from .openai_retries import is_transient_api_error, with_retries
+from .openai_batch import batch_response_body, run_chat_batch
+from .json_utils import json_loads, json_bytes, stable_json_bytes
+
+try:
+    import h2  # noqa: F401  # httpx only speaks HTTP/2 with the h2 package installed
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# Shared read-only default for missing nested analysis sections
+_EMPTY_MAPPING = MappingProxyType({})
+
+
+def _text_shingles(text: str) -> frozenset:
+    """Word trigrams of text, so formatting and whitespace differences do not affect similarity"""
+    words = text.lower().split()
+    return frozenset(zip(words, words[1:], words[2:])) if len(words) >= 3 else frozenset(((*words,),))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    # |a ∪ b| follows from the intersection, so only one set is built
+    overlap = len(a & b)
+    return overlap / (len(a) + len(b) - overlap)
+
+
+def _validate_scoring_result(result: Any) -> Dict[str, Any]:
+    """Check a parsed model result has a usable overall_score, coercing numeric strings and clamping to 0-100"""
+    if not isinstance(result, dict):
+        raise ValueError("Scoring response is not a JSON object")
+    
+    score = result.get('overall_score')
+    if isinstance(score, str):
+        try:
+            score = float(score)
+        except ValueError:
+            pass
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or score != score:
+        raise ValueError(f"Scoring response has no numeric overall_score: {result.get('overall_score')!r}")
+    
+    result['overall_score'] = min(100, max(0, score))
+    return result
 
 # Load environment variables
 load_dotenv()
 
-# set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ScoringEngine(BaseScoringEngine):
-    def __init__(self):
+    # Built once and shared by reference across requests; the SDK only reads it
+    SYSTEM_MESSAGE = {"role": "system", "content": BaseScoringEngine.SCORING_SYSTEM_PROMPT}
+    
+    PACKED_PROMPT_HEADER = """Score each candidate below independently against its own job description.
+
+Return a JSON object {"results": [...]} with exactly one entry per candidate. Each entry must contain
+"id" (the candidate id) plus every field of the REQUIRED JSON OUTPUT.
+
+"""
+    
+    # Part of every results cache key; changes whenever any prompt text does
+    PROMPT_VERSION = hashlib.blake2b(
+        "\0".join((
+            BaseScoringEngine.SCORING_SYSTEM_PROMPT, BaseScoringEngine.SCORING_PROMPT_TEMPLATE.template, PACKED_PROMPT_HEADER
+        )).encode(), digest_size=8
+    ).hexdigest()
+    
+    def __init__(self, max_requests_per_minute: int = None, max_tokens_per_minute: int = None,
+                 fast_reject_threshold: float = None):
         super().__init__()  # Initialize base class
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # The sync path leans on the SDK's retry loop (exponential backoff with jitter, honours Retry-After)
+        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=config.api.max_retries)
+        # Async client and its connection pool, built on first use in each event loop; released by aclose()
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
         self.openai_model = "gpt-4o-mini"
+        self.fast_reject_threshold = (
+            fast_reject_threshold if fast_reject_threshold is not None else config.scoring.fast_reject_skills_threshold
+        )
+        # Shared across concurrent async scores so bulk runs stay within the account quota
+        self.request_limiter = AsyncRateLimiter(max_requests_per_minute or config.api.max_requests_per_minute)
+        self.token_limiter = AsyncRateLimiter(max_tokens_per_minute or config.api.max_tokens_per_minute)
+        # Shared by every path so a known outage fails fast instead of waiting out retries per candidate
+        self.circuit_breaker = CircuitBreaker(
+            config.api.circuit_breaker_failures, config.api.circuit_breaker_reset_seconds
+        )
+        # Scoring tasks currently running, keyed by request hash, so duplicates can await them
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Dedicated pool for structured analysis, created on first async use
+        self._analysis_executor: Optional[ThreadPoolExecutor] = None
+        
+        # Model results cached in memory (LRU) and on disk, keyed by resume, job and model
+        self.results_cache_enabled = config.cache.results_cache_enabled
+        self._results_memory_cache: OrderedDict = OrderedDict()
+        self.results_cache_dir = Path(config.cache.base_dir) / config.cache.results_cache_dir
+        self.results_cache_dir.mkdir(parents=True, exist_ok=True)
+        self._prompt_cache: OrderedDict = OrderedDict()
+        # Near-duplicate lookup over recent results: cache key -> (group key, shingles, result, stored at)
+        self.near_duplicate_threshold = config.cache.near_duplicate_threshold
+        self._near_duplicate_index: OrderedDict = OrderedDict()
+
+    def _build_async_client(self) -> AsyncOpenAI:
+        # One keep-alive pool for all async calls: HTTP/2 multiplexes concurrent scoring requests over a
+        # single TLS connection instead of paying a handshake per cold call
+        http_client = DefaultAsyncHttpxClient(
+            http2=config.api.http2 and _HTTP2_AVAILABLE,
+            timeout=float(config.scoring.timeout_seconds),
+            limits=httpx.Limits(
+                max_keepalive_connections=config.api.max_keepalive_connections,
+                max_connections=config.api.max_connections,
+            ),
+        )
+        # Retries are handled by with_retries so each attempt is rate limited; SDK-level retries
+        # would multiply attempts and bypass the limiters
+        return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0, http_client=http_client)
+
+    @property
+    def async_openai_client(self) -> AsyncOpenAI:
+        """Client for the running event loop; pooled connections are bound to the loop that opened them"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop not in (None, loop):
+            # A pool left behind by an earlier loop cannot be closed from this one, so it is dropped
+            self._async_client = self._build_async_client()
+            self._async_client_loop = loop
+        return self._async_client
+
+    @async_openai_client.setter
+    def async_openai_client(self, client: AsyncOpenAI) -> None:
+        # A client assigned directly is used as is, in whatever loop is running
+        self._async_client = client
+        self._async_client_loop = None
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections and the analysis threads; both are recreated if the engine is used again"""
+        client, loop = self._async_client, self._async_client_loop
+        self._async_client = self._async_client_loop = None
+        if client is not None and loop in (None, asyncio.get_running_loop()):
+            await client.close()
+        executor, self._analysis_executor = self._analysis_executor, None
+        if executor is not None:
+            # Work already submitted finishes on its own; nothing here waits for it
+            executor.shutdown(wait=False)
+        # The comment analyzer is shared across engines, but its pool is bound to this same loop
+        await close_comment_analyzer()
 
-    def _analyze_structured_data(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def __aenter__(self) -> "ScoringEngine":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _analyze_structured_data(self, resume_data: Dict[str, Any], job_data: Dict[str, Any],
+                                 now: datetime = None, skills_analysis: Dict[str, Any] = None) -> Dict[str, Any]:
+        now = now or datetime.now()
         analysis = {
             'skills_analysis': {},
             'experience_analysis': {},
             'education_analysis': {},
             'metadata': {
-                'analysis_timestamp': datetime.now().isoformat(),
+                'analysis_timestamp': now.isoformat(),
                 'resume_length': len(resume_data.get('full_text', '')),
                 'job_description_length': len(job_data.get('description', ''))
             }
@@ -37,7 +189,9 @@ class ScoringEngine(BaseScoringEngine):
         resume_skills = resume_data.get('skills', [])
         job_skills = job_data.get('skills', []) or job_data.get('required_skills', [])
         
-        if job_skills:
+        if skills_analysis is not None:
+            analysis['skills_analysis'] = skills_analysis
+        elif job_skills:
             # Use enhanced skills matching from base class
             skills_match_result = self._enhanced_skills_match(resume_skills, job_skills)
             analysis['skills_analysis'] = skills_match_result
@@ -49,11 +203,9 @@ class ScoringEngine(BaseScoringEngine):
             job_description = job_data.get('description', '')
             required_level = job_data.get('experience_level', 'not specified')
             
-            # Calculate experience relevance
-            relevance_result = self._calculate_experience_relevance(resume_experience, job_title, job_description)
-            
-            # Traditional experience calculation for fallback
-            total_years = self._calculate_experience_years(resume_experience)
+            # Relevance and total years come from the same pass over the experience entries
+            relevance_result = self._calculate_experience_relevance(resume_experience, job_title, job_description, now.year)
+            total_years = relevance_result['total_years']
             
             analysis['experience_analysis'] = {
                 'total_years': total_years,
@@ -77,156 +229,787 @@ class ScoringEngine(BaseScoringEngine):
         
         return analysis
 
-    def _create_enhanced_prompt(self, resume_data: Dict[str, Any], job_data: Dict[str, Any], structured_analysis: Dict[str, Any], dynamic_weights: Dict[str, float] = None) -> str:
-        return self._create_base_prompt(resume_data, job_data, structured_analysis, "OpenAI", dynamic_weights)
+    def _skills_analyses(self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+        """Skills analysis for every pair, matching all resumes that share a job's skills in one embedding pass"""
+        by_job: Dict[tuple, List[int]] = {}
+        for index, (_, job_data) in enumerate(pairs):
+            job_skills = job_data.get('skills', []) or job_data.get('required_skills', [])
+            if job_skills:
+                by_job.setdefault(tuple(job_skills), []).append(index)
+        
+        analyses: List[Optional[Dict[str, Any]]] = [None] * len(pairs)
+        for job_skills, indices in by_job.items():
+            resume_skill_lists = [pairs[index][0].get('skills', []) for index in indices]
+            for index, result in zip(indices, self._enhanced_skills_match_batch(resume_skill_lists, list(job_skills))):
+                analyses[index] = result
+        return analyses
+
+    def _comment_analyses(self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[Optional[Tuple[float, Dict[str, Any]]]]:
+        """Comment bonus for every pair, analyzing the comments of candidates that share a job together"""
+        by_job: Dict[bytes, List[int]] = {}
+        for index, (resume_data, job_data) in enumerate(pairs):
+            if (resume_data.get('user_comments') or '').strip():
+                by_job.setdefault(stable_json_bytes(job_data), []).append(index)
+        
+        analyses: List[Optional[Tuple[float, Dict[str, Any]]]] = [None] * len(pairs)
+        for indices in by_job.values():
+            # A lone candidate gains nothing from batching; _calculate_comment_bonus handles it as usual
+            if len(indices) < 2:
+                continue
+            job_data = pairs[indices[0]][1]
+            try:
+                comment_weights = self.weight_calculator.calculate_comment_weights(job_data)
+            except Exception as e:
+                logger.warning("Failed to get dynamic comment weights: %s", e)
+                comment_weights = None
+            
+            comments_list = [pairs[index][0]['user_comments'] for index in indices]
+            for index, data in zip(indices, process_user_comments_batch(comments_list, job_data, comment_weights)):
+                analyses[index] = (data.get('total_bonus', 0), data)
+        return analyses
+
+    def _create_enhanced_prompt(self, resume_data: Dict[str, Any], job_data: Dict[str, Any], structured_analysis: Dict[str, Any], dynamic_weights: Dict[str, float] = None,
+                                structured_comments_data: Dict[str, Any] = None) -> str:
+        return self._create_base_prompt(resume_data, job_data, structured_analysis, "OpenAI", dynamic_weights, structured_comments_data)
+
+    def _build_request(self, prompt: str) -> Dict[str, Any]:
+        return {
+            'model': self.openai_model,
+            'messages': [
+                self.SYSTEM_MESSAGE,
+                {"role": "user", "content": prompt}
+            ],
+            'response_format': {"type": "json_object"},
+            'temperature': config.scoring.temperature,
+            'max_tokens': config.scoring.max_tokens,
+            'top_p': 0.9,
+            'seed': 42
+        }
+
+    async def _create_completion_async(self, request: Dict[str, Any]):
+        # Prompt tokens (plus per-message framing) and the completion allowance count against the TPM budget
+        estimated_tokens = sum(count_tokens(m['content']) + 4 for m in request['messages']) + request['max_tokens']
+        
+        # Every attempt, retries included, goes back through the rate limiters
+        async def _attempt():
+            await self.request_limiter.acquire()
+            await self.token_limiter.acquire(estimated_tokens)
+            return await self.async_openai_client.chat.completions.create(**request)
+        
+        self._check_circuit()
+        try:
+            response = await with_retries(_attempt)
+        except Exception as e:
+            self._record_api_failure(e)
+            raise
+        self.circuit_breaker.record_success()
+        return response
+
+    def _check_circuit(self) -> None:
+        if self.circuit_breaker.is_open:
+            raise RuntimeError("OpenAI temporarily unavailable after repeated failures; skipping the API call")
+
+    def _record_api_failure(self, error: Exception) -> None:
+        # Only provider-side failures count; a bad request or unparseable response says nothing about availability
+        if is_transient_api_error(error):
+            self.circuit_breaker.record_failure()
+
+    async def _run_analysis(self, func, *args):
+        # Kept off the default executor so bulk analysis does not queue behind (or starve) blocking API calls
+        if self._analysis_executor is None:
+            self._analysis_executor = ThreadPoolExecutor(
+                max_workers=config.scoring.analysis_workers, thread_name_prefix="scoring-analysis"
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._analysis_executor, func, *args)
+
+    def _get_cache_key(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> str:
+        # Keyed on the prompts and request parameters too, so editing them (or the config) invalidates old results
+        request_parameters = {key: value for key, value in self._build_request('').items() if key != 'messages'}
+        key_source = stable_json_bytes({
+            'resume': resume_data, 'job': job_data, 'prompt_version': self.PROMPT_VERSION, 'request': request_parameters
+        })
+        return hashlib.blake2b(key_source, digest_size=16).hexdigest()
+
+    def _get_cached_result(self, cache_key: str, resume_data: Dict[str, Any] = None,
+                           job_data: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Exact cached result for cache_key, else (when given the inputs) a near-duplicate resume's result"""
+        cached = self._get_exact_cached_result(cache_key)
+        if cached is None and resume_data is not None:
+            cached = self._find_near_duplicate(resume_data, job_data)
+        return cached
+
+    def _get_exact_cached_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        if not self.results_cache_enabled:
+            return None
+        
+        cached = self._results_memory_cache.get(cache_key)
+        if cached is None:
+            cache_file = self.results_cache_dir / f"{cache_key}.json"
+            if not cache_file.exists():
+                return None
+            if time.time() - cache_file.stat().st_mtime >= config.cache.results_cache_hours * 3600:
+                return None
+            try:
+                cached = json_loads(cache_file.read_bytes())
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable results cache entry %s: %s", cache_file.name, e)
+                return None
+            self._remember_result(cache_key, cached)
+        else:
+            self._results_memory_cache.move_to_end(cache_key)
+        
+        # Callers extend the result (and its nested dicts) in place, so hand out a deep copy
+        return copy.deepcopy(cached)
+
+    def _remember_result(self, cache_key: str, openai_result: Dict[str, Any]) -> None:
+        self._results_memory_cache[cache_key] = openai_result
+        self._results_memory_cache.move_to_end(cache_key)
+        while len(self._results_memory_cache) > config.cache.results_memory_entries:
+            self._results_memory_cache.popitem(last=False)
+
+    def _near_duplicate_group(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> str:
+        # Everything that shapes the prompt except the resume text must match exactly
+        resume_fields = {key: value for key, value in resume_data.items() if key != 'full_text'}
+        return self._get_cache_key(resume_fields, job_data)
+
+    def _find_near_duplicate(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not self.results_cache_enabled or self.near_duplicate_threshold is None or not self._near_duplicate_index:
+            return None
+        
+        group = self._near_duplicate_group(resume_data, job_data)
+        shingles = _text_shingles(resume_data.get('full_text') or '')
+        expires_before = time.monotonic() - config.cache.results_cache_hours * 3600
+        best_key, best_similarity = None, self.near_duplicate_threshold
+        for cache_key, (entry_group, entry_shingles, _, stored_at) in list(self._near_duplicate_index.items()):
+            if entry_group != group or stored_at < expires_before:
+                continue
+            similarity = _jaccard(shingles, entry_shingles)
+            if similarity >= best_similarity:
+                best_key, best_similarity = cache_key, similarity
+        
+        if best_key is None:
+            return None
+        self._near_duplicate_index.move_to_end(best_key)
+        logger.info("Reusing result of a near-duplicate resume (similarity %.3f)", best_similarity)
+        return copy.deepcopy(self._near_duplicate_index[best_key][2])
+
+    def _index_near_duplicate(self, cache_key: str, resume_data: Optional[Dict[str, Any]], job_data: Dict[str, Any],
+                              snapshot: Dict[str, Any]) -> None:
+        if self.near_duplicate_threshold is None or resume_data is None:
+            return
+        self._near_duplicate_index[cache_key] = (
+            self._near_duplicate_group(resume_data, job_data),
+            _text_shingles(resume_data.get('full_text') or ''),
+            snapshot,
+            time.monotonic()
+        )
+        self._near_duplicate_index.move_to_end(cache_key)
+        while len(self._near_duplicate_index) > config.cache.near_duplicate_entries:
+            self._near_duplicate_index.popitem(last=False)
+
+    def _cache_result(self, cache_key: str, openai_result: Dict[str, Any], resume_data: Dict[str, Any] = None,
+                      job_data: Dict[str, Any] = None) -> None:
+        if not self.results_cache_enabled:
+            return
+        
+        snapshot = copy.deepcopy(openai_result)
+        self._remember_result(cache_key, snapshot)
+        self._index_near_duplicate(cache_key, resume_data, job_data, snapshot)
+        self._write_cache_file(cache_key, snapshot)
+
+    def _cache_result_in_background(self, cache_key: str, openai_result: Dict[str, Any], resume_data: Dict[str, Any] = None,
+                                    job_data: Dict[str, Any] = None) -> Optional[asyncio.Task]:
+        # Same as _cache_result, but the disk write runs in a worker thread instead of on the event loop.
+        # The snapshot is taken now, before callers extend openai_result in place
+        if not self.results_cache_enabled:
+            return None
+        
+        snapshot = copy.deepcopy(openai_result)
+        self._remember_result(cache_key, snapshot)
+        self._index_near_duplicate(cache_key, resume_data, job_data, snapshot)
+        return asyncio.create_task(asyncio.to_thread(self._write_cache_file, cache_key, snapshot))
+
+    def _write_cache_file(self, cache_key: str, snapshot: Dict[str, Any]) -> None:
+        try:
+            (self.results_cache_dir / f"{cache_key}.json").write_bytes(json_bytes(snapshot, indent=True))
+        except (OSError, TypeError) as e:
+            logger.warning("Failed to write results cache entry: %s", e)
+
+    def _cached_processing_info(self) -> Dict[str, Any]:
+        return {'model_used': self.openai_model, 'provider': 'OpenAI', 'cache_hit': True}
+
+    def clear_cache(self) -> None:
+        self._results_memory_cache.clear()
+        self._prompt_cache.clear()
+        self._near_duplicate_index.clear()
+        for cache_file in self.results_cache_dir.glob("*.json"):
+            cache_file.unlink()
+
+    def _parse_openai_response(self, response, validate: bool = True) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        # response_format=json_object guarantees bare JSON, so the content is parsed as-is; a malformed
+        # score raises here and is reported through the error response instead of failing downstream
+        choice = response.choices[0]
+        if getattr(choice, 'finish_reason', None) == 'length':
+            raise ValueError("OpenAI response was cut off at max_tokens before the JSON was complete")
+        openai_result = json_loads(choice.message.content)
+        if validate:
+            _validate_scoring_result(openai_result)
+        
+        # Add processing info
+        usage = getattr(response, 'usage', None)
+        prompt_details = getattr(usage, 'prompt_tokens_details', None)
+        processing_info = {
+            'model_used': self.openai_model,
+            'provider': 'OpenAI',
+            'cache_hit': False,
+            'prompt_tokens': usage.prompt_tokens if usage is not None else 'unknown',
+            'completion_tokens': usage.completion_tokens if usage is not None else 'unknown',
+            'total_tokens': usage.total_tokens if usage is not None else 'unknown',
+            # Prompt tokens served from OpenAI's automatic prefix cache (system prompt + job context)
+            'cached_prompt_tokens': getattr(prompt_details, 'cached_tokens', None) or 0
+        }
+        
+        logger.info("OpenAI scoring completed. Score: %s", openai_result.get('overall_score', 0))
+        return openai_result, processing_info
+
+    def _calculate_comment_bonus(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+        # Process structured comments and apply bonus with dynamic weights
+        user_comments = resume_data.get('user_comments', '')
+        structured_bonus = 0
+        structured_comments_data = {}
+        
+        if user_comments:
+            # Get dynamic weights for comment evaluation
+            try:
+                comment_weights = self.weight_calculator.calculate_comment_weights(job_data)
+            except Exception as e:
+                logger.warning("Failed to get dynamic comment weights: %s", e)
+                comment_weights = None
+            
+            structured_comments_data = process_user_comments(user_comments, job_data, comment_weights)
+            structured_bonus = structured_comments_data.get('total_bonus', 0)
+        
+        return structured_bonus, structured_comments_data
+
+    async def _calculate_comment_bonus_async(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+        """_calculate_comment_bonus with the comment analysis awaited on the async client"""
+        user_comments = resume_data.get('user_comments', '')
+        if not user_comments:
+            return 0, {}
+        
+        try:
+            comment_weights = await asyncio.to_thread(self.weight_calculator.calculate_comment_weights, job_data)
+        except Exception as e:
+            logger.warning("Failed to get dynamic comment weights: %s", e)
+            comment_weights = None
+        
+        structured_comments_data = await process_user_comments_async(user_comments, job_data, comment_weights)
+        return structured_comments_data.get('total_bonus', 0), structured_comments_data
+
+    def _build_comprehensive_response(self, resume_data: Dict[str, Any], openai_result: Dict[str, Any], processing_info: Dict[str, Any],
+                                      structured_analysis: Dict[str, Any], dynamic_weights: Dict[str, float],
+                                      structured_bonus: float, structured_comments_data: Dict[str, Any],
+                                      start_time: float, now: datetime = None) -> Dict[str, Any]:
+        # Phase 3: Final Score Calculation with Structured Comments Bonus
+        base_score = openai_result.get('overall_score', 0)
+        user_comments = resume_data.get('user_comments', '')
+        
+        # Only apply bonus if comments actually align with job requirements
+        if structured_bonus > 0:
+            final_score = min(100, base_score + structured_bonus)
+            logger.info("Score calculation: Base=%s, Aligned Bonus=%s, Final=%s", base_score, structured_bonus, final_score)
+        else:
+            final_score = base_score
+            logger.info("Score calculation: Base=%s, No alignment bonus (comments don't match job), Final=%s", base_score, final_score)
+        
+        # Phase 4: Create Comprehensive Response
+        processing_time = time.perf_counter() - start_time
+        timestamp = (now or datetime.now()).isoformat()
+        if not processing_info.get('error'):
+            processing_info['processing_timestamp'] = timestamp
+        
+        # The parsed model result is owned by this call, so extend it in place rather than copying it
+        comprehensive_response = openai_result
+        comprehensive_response['final_score'] = final_score
+        comprehensive_response['match_category'] = openai_result.get('match_category') or self._get_score_category(final_score)
+        comprehensive_response['structured_analysis'] = structured_analysis
+        comprehensive_response['structured_comments'] = structured_comments_data
+        comprehensive_response['openai_results'] = {'processing_info': processing_info}
+        comprehensive_response['transparency'] = {
+            'methodology': 'OpenAI GPT + Embeddings + Dynamic Weights + Context Bonuses',
+            'processing_time_seconds': round(processing_time, 2),
+            'timestamp': timestamp,
+            'dynamic_weights': dynamic_weights,
+            'score_components': {
+                'structured_score': structured_analysis.get('structured_score', 0),
+                'openai_base_score': base_score if not openai_result.get('error_occurred') else 0,
+                'context_bonus': structured_bonus,
+                'bonus_applied': structured_bonus > 0,
+                'final_score': final_score
+            },
+            'validation': {
+                'embedding_matching': structured_analysis.get('skills_analysis', _EMPTY_MAPPING).get('method') == 'embedding',
+                'dynamic_weights_applied': bool(dynamic_weights),
+                'openai_available': not openai_result.get('error_occurred', False),
+                'fallback_used': openai_result.get('error_occurred', False),
+                'comments_provided': bool(user_comments),
+                'comments_aligned_with_job': bool(user_comments and structured_bonus > 0),
+                'bonus_earned': structured_bonus > 0
+            }
+        }
+        
+        logger.info("OpenAI resume scoring completed. Final score: %s", final_score)
+        return comprehensive_response
+
+    def _create_calculation_error(self, error: Exception) -> Dict[str, Any]:
+        return {
+            'overall_score': 0,
+            'confidence_level': 'Low',
+            'match_category': 'Error',
+            'summary': f'Analysis failed: {str(error)}',
+            'error': True,
+            'error_message': str(error)
+        }
+
+    def _fast_reject_result(self, resume_data: Dict[str, Any], structured_analysis: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Synthetic low score for candidates the structured analysis already rules out, None if the model should decide"""
+        if self.fast_reject_threshold is None or resume_data.get('user_comments'):
+            return None
+        
+        skills_analysis = structured_analysis.get('skills_analysis') or {}
+        level_match = (structured_analysis.get('experience_analysis') or {}).get('experience_level_match') or {}
+        if 'match_percentage' not in skills_analysis or level_match.get('meets_requirement') is not False:
+            return None
+        
+        skills_match = skills_analysis['match_percentage']
+        if skills_match >= self.fast_reject_threshold:
+            return None
+        
+        logger.info("Fast reject: %.1f%% skills match and experience level not met, skipping model call", skills_match)
+        return {
+            'overall_score': config.scoring.fast_reject_score,
+            'confidence_level': 'Low',
+            'summary': f"Rejected without model review: {skills_match:.1f}% skills match and experience level not met.",
+            'fast_reject': True
+        }
+
+    def _prompt_cache_key(self, request: Dict[str, Any]) -> bytes:
+        return hashlib.blake2b(stable_json_bytes(request), digest_size=16).digest()
+
+    def _get_prompt_cached(self, key: bytes) -> Optional[Dict[str, Any]]:
+        if not self.results_cache_enabled:
+            return None
+        cached = self._prompt_cache.get(key)
+        if cached is None:
+            return None
+        self._prompt_cache.move_to_end(key)
+        logger.info("Using cached OpenAI result for an identical prompt")
+        return copy.deepcopy(cached)
+
+    def _remember_prompt_result(self, key: bytes, openai_result: Dict[str, Any]) -> None:
+        if not self.results_cache_enabled:
+            return
+        self._prompt_cache[key] = copy.deepcopy(openai_result)
+        self._prompt_cache.move_to_end(key)
+        while len(self._prompt_cache) > config.cache.prompt_cache_entries:
+            self._prompt_cache.popitem(last=False)
+
+    def _call_openai(self, prompt: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Score a prepared prompt; transient 429/5xx/connection failures are retried by the client"""
+        request = self._build_request(prompt)
+        key = self._prompt_cache_key(request)
+        cached = self._get_prompt_cached(key)
+        if cached is not None:
+            return cached, self._cached_processing_info()
+        
+        self._check_circuit()
+        try:
+            response = self.openai_client.chat.completions.create(**request)
+        except Exception as e:
+            self._record_api_failure(e)
+            raise
+        self.circuit_breaker.record_success()
+        openai_result, processing_info = self._parse_openai_response(response)
+        self._remember_prompt_result(key, openai_result)
+        return openai_result, processing_info
+
+    async def _call_openai_async(self, prompt: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Async _call_openai: rate limited, with the engine's retry loop"""
+        request = self._build_request(prompt)
+        key = self._prompt_cache_key(request)
+        cached = self._get_prompt_cached(key)
+        if cached is not None:
+            return cached, self._cached_processing_info()
+        
+        response = await self._create_completion_async(request)
+        openai_result, processing_info = self._parse_openai_response(response)
+        self._remember_prompt_result(key, openai_result)
+        return openai_result, processing_info
 
     def calculate_score(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
             logger.info("Starting OpenAI resume scoring with dynamic weights and embeddings...")
-            start_time = datetime.now()
+            start_time = time.perf_counter()
+            now = datetime.now()
             
             # Phase 0: Get dynamic weights for this job
-            logger.info("Phase 0: Calculating dynamic weights...")
+            logger.debug("Phase 0: Calculating dynamic weights...")
             dynamic_weights = self.get_dynamic_weights(job_data)
-            logger.info(f"Dynamic weights: {dynamic_weights}")
+            logger.debug("Dynamic weights: %s", dynamic_weights)
             
             # Phase 1: Structured Data Analysis with embeddings
-            logger.info("Phase 1: Performing structured data analysis with embeddings...")
-            structured_analysis = self._analyze_structured_data(resume_data, job_data)
+            logger.debug("Phase 1: Performing structured data analysis with embeddings...")
+            structured_analysis = self._analyze_structured_data(resume_data, job_data, now)
+            
+            # Comments are analyzed once; the prompt context and the bonus both come from this result
+            structured_bonus, structured_comments_data = self._calculate_comment_bonus(resume_data, job_data)
             
             # Phase 2: OpenAI Analysis with dynamic weights
-            logger.info("Phase 2: Performing OpenAI analysis with dynamic weights...")
+            logger.debug("Phase 2: Performing OpenAI analysis with dynamic weights...")
+            cache_key = self._get_cache_key(resume_data, job_data)
+            openai_result = self._get_cached_result(cache_key, resume_data, job_data)
+            fast_reject = self._fast_reject_result(resume_data, structured_analysis) if openai_result is None else None
             try:
-                prompt = self._create_enhanced_prompt(resume_data, job_data, structured_analysis, dynamic_weights)
-                
-                response = self.openai_client.chat.completions.create(
-                    model=self.openai_model,
-                    messages=[
-                        {
-                            "role": "system", 
-                            "content": "You are a senior technical recruiter with 15+ years of experience in talent acquisition across multiple industries. You provide detailed, objective, and actionable resume analysis."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.1,
-                    max_tokens=2000,
-                    top_p=0.9,
-                    seed=42
-                )
-                
-                feedback_json = response.choices[0].message.content
-                openai_result = json.loads(feedback_json)
-                
-                # Add processing info
-                processing_info = {
-                    'model_used': self.openai_model,
-                    'provider': 'OpenAI',
-                    'processing_timestamp': datetime.now().isoformat(),
-                    'prompt_tokens': response.usage.prompt_tokens if hasattr(response, 'usage') else 'unknown',
-                    'completion_tokens': response.usage.completion_tokens if hasattr(response, 'usage') else 'unknown',
-                    'total_tokens': response.usage.total_tokens if hasattr(response, 'usage') else 'unknown'
-                }
-                
-                logger.info(f"OpenAI scoring completed. Score: {openai_result.get('overall_score', 0)}")
+                if openai_result is not None:
+                    logger.info("Using cached OpenAI scoring result")
+                    processing_info = self._cached_processing_info()
+                elif fast_reject is not None:
+                    openai_result, processing_info = fast_reject, {'provider': 'OpenAI', 'fast_reject': True}
+                else:
+                    prompt = self._create_enhanced_prompt(resume_data, job_data, structured_analysis, dynamic_weights,
+                                                          structured_comments_data)
+                    openai_result, processing_info = self._call_openai(prompt)
+                    self._cache_result(cache_key, openai_result, resume_data, job_data)
                 
             except Exception as e:
-                logger.error(f"OpenAI scoring failed: {e}")
+                logger.error("OpenAI scoring failed: %s", e)
                 openai_result = self._create_error_response(str(e))
                 processing_info = {'error': True, 'provider': 'OpenAI'}
             
-            # Phase 3: Final Score Calculation with Structured Comments Bonus
-            base_score = openai_result.get('overall_score', 0)
+            return self._build_comprehensive_response(
+                resume_data, openai_result, processing_info, structured_analysis, dynamic_weights,
+                structured_bonus, structured_comments_data, start_time, now
+            )
+            
+        except Exception as e:
+            logger.error("Error in calculate_score: %s", e)
+            return self._create_calculation_error(e)
+
+    async def calculate_score_async(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of calculate_score; identical requests already in flight share one scoring run"""
+        # Keyed on every input field, like the results cache, so only truly identical requests are merged
+        key = self._get_cache_key(resume_data, job_data)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            logger.info("Joining in-flight scoring request for identical resume/job pair")
+            # Joiners get their own copy; the result's nested sections belong to the first caller
+            return copy.deepcopy(await asyncio.shield(inflight))
+        
+        # Lookup and registration happen without an await in between, so no lock is needed
+        task = asyncio.ensure_future(self._calculate_score_async(resume_data, job_data))
+        self._inflight[key] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _calculate_score_async(self, resume_data: Dict[str, Any], job_data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            logger.info("Starting async OpenAI resume scoring...")
+            start_time = time.perf_counter()
+            now = datetime.now()
             
-            # Process structured comments and apply bonus with dynamic weights
-            user_comments = resume_data.get('user_comments', '')
-            structured_bonus = 0
-            structured_comments_data = {}
+            # Comment analysis is independent of phases 0-1, so it runs alongside them; its result feeds
+            # both the prompt context and the bonus, so comments are analyzed only once per score
+            comment_bonus_task = asyncio.create_task(self._calculate_comment_bonus_async(resume_data, job_data))
             
-            if user_comments:
-                from .structured_comments import process_user_comments
-                # Get dynamic weights for comment evaluation
-                try:
-                    comment_weights = self.weight_calculator.calculate_comment_weights(job_data)
-                except Exception as e:
-                    logger.warning(f"Failed to get dynamic comment weights: {e}")
-                    comment_weights = None
+            # Phases 0-1 are blocking (sync OpenAI client, embedding model) and independent of each other,
+            # so they run concurrently off the event loop
+            try:
+                dynamic_weights, structured_analysis = await asyncio.gather(
+                    asyncio.to_thread(self.get_dynamic_weights, job_data),
+                    self._run_analysis(self._analyze_structured_data, resume_data, job_data, now)
+                )
+            except BaseException:
+                # Don't leave the comment analysis making API calls (outside any caller's concurrency bound)
+                # after this score has already failed
+                comment_bonus_task.cancel()
+                await asyncio.gather(comment_bonus_task, return_exceptions=True)
+                raise
+            structured_bonus, structured_comments_data = await comment_bonus_task
+            
+            cache_key = self._get_cache_key(resume_data, job_data)
+            openai_result = self._get_cached_result(cache_key, resume_data, job_data)
+            fast_reject = self._fast_reject_result(resume_data, structured_analysis) if openai_result is None else None
+            cache_write = None
+            try:
+                if openai_result is not None:
+                    logger.info("Using cached OpenAI scoring result")
+                    processing_info = self._cached_processing_info()
+                elif fast_reject is not None:
+                    openai_result, processing_info = fast_reject, {'provider': 'OpenAI', 'fast_reject': True}
+                else:
+                    prompt = self._create_enhanced_prompt(resume_data, job_data, structured_analysis, dynamic_weights,
+                                                          structured_comments_data)
+                    openai_result, processing_info = await self._call_openai_async(prompt)
+                    # Persist while the response is assembled rather than blocking the loop on disk I/O
+                    cache_write = self._cache_result_in_background(cache_key, openai_result, resume_data, job_data)
                 
-                structured_comments_data = process_user_comments(user_comments, job_data, comment_weights)
-                structured_bonus = structured_comments_data.get('total_bonus', 0)
-            
-            # Only apply bonus if comments actually align with job requirements
-            if structured_bonus > 0:
-                final_score = min(100, base_score + structured_bonus)
-                logger.info(f"Score calculation: Base={base_score}, Aligned Bonus={structured_bonus}, Final={final_score}")
-            else:
-                final_score = base_score
-                logger.info(f"Score calculation: Base={base_score}, No alignment bonus (comments don't match job), Final={final_score}")
-            
-            # Phase 4: Create Comprehensive Response
-            processing_time = (datetime.now() - start_time).total_seconds()
-            
-            comprehensive_response = {
-                **openai_result,
-                'final_score': final_score,
-                'structured_analysis': structured_analysis,
-                'structured_comments': structured_comments_data,
-                'openai_results': {
-                    'result': openai_result,
-                    'processing_info': processing_info
-                },
-                'transparency': {
-                    'methodology': 'OpenAI GPT + Embeddings + Dynamic Weights + Context Bonuses',
-                    'processing_time_seconds': round(processing_time, 2),
-                    'timestamp': datetime.now().isoformat(),
-                    'dynamic_weights': dynamic_weights,
-                    'score_components': {
-                        'structured_score': structured_analysis.get('structured_score', 0),
-                        'openai_base_score': openai_result.get('overall_score', 0) if not openai_result.get('error_occurred') else 0,
-                        'context_bonus': structured_bonus,
-                        'bonus_applied': structured_bonus > 0,
-                        'final_score': final_score
-                    },
-                    'validation': {
-                        'embedding_matching': structured_analysis.get('skills_analysis', {}).get('method') == 'embedding',
-                        'dynamic_weights_applied': bool(dynamic_weights),
-                        'openai_available': not openai_result.get('error_occurred', False),
-                        'fallback_used': openai_result.get('error_occurred', False),
-                        'comments_provided': bool(user_comments),
-                        'comments_aligned_with_job': bool(user_comments and structured_bonus > 0),
-                        'bonus_earned': structured_bonus > 0
-                    }
-                }
-            }
+            except Exception as e:
+                logger.error("OpenAI scoring failed: %s", e)
+                openai_result = self._create_error_response(str(e))
+                processing_info = {'error': True, 'provider': 'OpenAI'}
             
-            logger.info(f"OpenAI resume scoring completed. Final score: {final_score}")
-            return comprehensive_response
+            result = self._build_comprehensive_response(
+                resume_data, openai_result, processing_info, structured_analysis, dynamic_weights,
+                structured_bonus, structured_comments_data, start_time, now
+            )
+            if cache_write is not None:
+                await cache_write
+            return result
             
         except Exception as e:
-            logger.error(f"Error in calculate_score: {e}")
-            return {
-                'overall_score': 0,
-                'confidence_level': 'Low',
-                'match_category': 'Error',
-                'summary': f'Analysis failed: {str(e)}',
-                'error': True,
-                'error_message': str(e)
-            }
+            logger.error("Error in calculate_score_async: %s", e)
+            return self._create_calculation_error(e)
 
-    def _create_error_response(self, error_message: str) -> Dict[str, Any]:
+    async def score_many(self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]], max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """Score (resume_data, job_data) pairs concurrently, bounded by max_concurrency in-flight requests"""
+        semaphore = asyncio.Semaphore(max_concurrency or config.api.max_concurrent_requests)
+        
+        async def _bounded(resume_data, job_data):
+            async with semaphore:
+                return await self.calculate_score_async(resume_data, job_data)
+        
+        return await asyncio.gather(*(_bounded(resume_data, job_data) for resume_data, job_data in pairs))
+
+    async def score_resumes(self, resumes: List[Dict[str, Any]], job_data: Dict[str, Any], max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """Score several resumes against one job concurrently, results in input order"""
+        return await self.score_many([(resume_data, job_data) for resume_data in resumes], max_concurrency)
+
+    def calculate_scores(self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]], max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """Sync wrapper around score_many for callers without an event loop"""
+        async def _score_and_close():
+            # The pooled connections belong to the loop asyncio.run creates here and closes on return
+            async with self:
+                return await self.score_many(pairs, max_concurrency)
+        
+        return asyncio.run(_score_and_close())
+
+    def _prepare_batch_item(self, resume_data: Dict[str, Any], job_data: Dict[str, Any], now: datetime = None,
+                            skills_analysis: Dict[str, Any] = None,
+                            comment_analysis: Tuple[float, Dict[str, Any]] = None) -> Dict[str, Any]:
+        dynamic_weights = self.get_dynamic_weights(job_data)
+        structured_analysis = self._analyze_structured_data(resume_data, job_data, now, skills_analysis)
+        if comment_analysis is None:
+            comment_analysis = self._calculate_comment_bonus(resume_data, job_data)
+        structured_bonus, structured_comments_data = comment_analysis
+        prompt = self._create_enhanced_prompt(resume_data, job_data, structured_analysis, dynamic_weights,
+                                              structured_comments_data)
         return {
-            "overall_score": 0,
-            "confidence_level": "Low",
-            "score_breakdown": {"skills_score": 0, "experience_score": 0, "education_score": 0, "domain_score": 0},
-            "match_category": "Error - OpenAI analysis failed",
-            "summary": f"Analysis failed due to OpenAI error: {error_message}",
-            "strengths": [],
-            "concerns": ["OpenAI analysis unavailable"],
-            "missing_skills": [],
-            "matching_skills": [],
-            "experience_assessment": {"relevant_years": 0, "role_progression": "Unknown", "industry_fit": "Unknown"},
-            "recommendations": ["Retry analysis when OpenAI service is available"],
-            "risk_factors": ["OpenAI analysis incomplete"],
-            "error_occurred": True,
-            "error_message": error_message
+            'dynamic_weights': dynamic_weights,
+            'structured_analysis': structured_analysis,
+            'structured_bonus': structured_bonus,
+            'structured_comments_data': structured_comments_data,
+            'prompt': prompt,
+            'request': self._build_request(prompt)
+        }
+
+    def _parse_batch_output_line(self, line: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        body = batch_response_body(line)
+        openai_result = _validate_scoring_result(json_loads(body['choices'][0]['message']['content']))
+        usage = body.get('usage') or {}
+        processing_info = {
+            'model_used': self.openai_model,
+            'provider': 'OpenAI',
+            'batch': True,
+            'prompt_tokens': usage.get('prompt_tokens', 'unknown'),
+            'completion_tokens': usage.get('completion_tokens', 'unknown'),
+            'total_tokens': usage.get('total_tokens', 'unknown'),
+            'cached_prompt_tokens': (usage.get('prompt_tokens_details') or {}).get('cached_tokens') or 0
         }
+        return openai_result, processing_info
+
+    def _create_multi_prompt(self, prompts: List[str]) -> str:
+        parts = [self.PACKED_PROMPT_HEADER]
+        for index, prompt in enumerate(prompts):
+            parts.append(f"### CANDIDATE id: {index}\n")
+            parts.append(prompt)
+            parts.append("\n")
+        return "".join(parts)
+
+    def _split_into_packs(self, items: List[Dict[str, Any]], pack_size: int) -> List[List[Dict[str, Any]]]:
+        """Group items in order into packs of at most pack_size that fit the packed input and output budgets"""
+        # The output allowance caps how many candidates one completion can answer in full
+        pack_size = max(1, min(pack_size, config.scoring.max_pack_output_tokens // config.scoring.max_tokens))
+        input_budget = config.scoring.max_pack_input_tokens - count_tokens(self.PACKED_PROMPT_HEADER)
+        
+        packs, pack, pack_tokens = [], [], 0
+        for item in items:
+            item_tokens = count_tokens(item['prompt'])
+            if pack and (len(pack) == pack_size or pack_tokens + item_tokens > input_budget):
+                packs.append(pack)
+                pack, pack_tokens = [], 0
+            pack.append(item)
+            pack_tokens += item_tokens
+        if pack:
+            packs.append(pack)
+        return packs
+
+    async def _score_pack(self, items: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Score several prepared items in one completion; items the model drops are rescored individually"""
+        parsed = {}
+        processing_info = {'error': True, 'provider': 'OpenAI'}
+        try:
+            request = self._build_request(self._create_multi_prompt([item['prompt'] for item in items]))
+            request['max_tokens'] = min(config.scoring.max_tokens * len(items), config.scoring.max_pack_output_tokens)
+            response = await self._create_completion_async(request)
+            packed_result, processing_info = self._parse_openai_response(response, validate=False)
+            processing_info['packed_candidates'] = len(items)
+            for entry in packed_result.get('results', []):
+                if not isinstance(entry, dict) or not isinstance(entry.get('id'), int):
+                    continue
+                try:
+                    _validate_scoring_result(entry)
+                except ValueError:
+                    continue
+                parsed[entry.pop('id')] = entry
+        except Exception as e:
+            logger.warning("Packed OpenAI scoring failed, falling back to single requests: %s", e)
+        
+        outputs = []
+        for index, item in enumerate(items):
+            if index in parsed:
+                outputs.append((parsed[index], dict(processing_info)))
+                continue
+            try:
+                response = await self._create_completion_async(item['request'])
+                outputs.append(self._parse_openai_response(response))
+            except Exception as e:
+                logger.error("OpenAI scoring failed: %s", e)
+                outputs.append((self._create_error_response(str(e)), {'error': True, 'provider': 'OpenAI'}))
+        return outputs
+
+    async def calculate_score_packed(self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]], pack_size: int = 5,
+                                     max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """Score pairs with pack_size candidates per completion, for deployments limited by requests per minute"""
+        start_time = time.perf_counter()
+        # One clock reading for the whole run, shared by every item's analysis and response
+        now = datetime.now()
+        semaphore = asyncio.Semaphore(max_concurrency or config.api.max_concurrent_requests)
+        
+        async def _prepare(resume_data, job_data, skills_analysis, comment_analysis):
+            async with semaphore:
+                return await self._run_analysis(self._prepare_batch_item, resume_data, job_data, now, skills_analysis,
+                                                comment_analysis)
+        
+        async def _bounded_pack(pack):
+            async with semaphore:
+                return await self._score_pack(pack)
+        
+        skills_analyses, comment_analyses = await asyncio.gather(
+            self._run_analysis(self._skills_analyses, pairs),
+            self._run_analysis(self._comment_analyses, pairs)
+        )
+        items = await asyncio.gather(*(
+            _prepare(resume_data, job_data, skills_analysis, comment_analysis)
+            for (resume_data, job_data), skills_analysis, comment_analysis in zip(pairs, skills_analyses, comment_analyses)
+        ))
+        
+        # Pairs scored before (or with an identical prompt) are served from the caches; only the rest are packed
+        cache_keys = [self._get_cache_key(resume_data, job_data) for resume_data, job_data in pairs]
+        prompt_keys = [self._prompt_cache_key(item['request']) for item in items]
+        outputs: List[Optional[Tuple[Dict[str, Any], Dict[str, Any]]]] = [None] * len(pairs)
+        for index, (resume_data, job_data) in enumerate(pairs):
+            cached = self._get_cached_result(cache_keys[index], resume_data, job_data)
+            if cached is None:
+                cached = self._get_prompt_cached(prompt_keys[index])
+            if cached is not None:
+                outputs[index] = (cached, self._cached_processing_info())
+        pending = [index for index, output in enumerate(outputs) if output is None]
+        
+        packs = self._split_into_packs([items[index] for index in pending], pack_size)
+        pack_outputs = await asyncio.gather(*(_bounded_pack(pack) for pack in packs))
+        scored = (output for pack_output in pack_outputs for output in pack_output)
+        for index, (openai_result, processing_info) in zip(pending, scored):
+            outputs[index] = (openai_result, processing_info)
+            if not processing_info.get('error'):
+                resume_data, job_data = pairs[index]
+                self._remember_prompt_result(prompt_keys[index], openai_result)
+                self._cache_result(cache_keys[index], openai_result, resume_data, job_data)
+        
+        results = []
+        for (resume_data, _), item, (openai_result, processing_info) in zip(pairs, items, outputs):
+            results.append(self._build_comprehensive_response(
+                resume_data, openai_result, processing_info, item['structured_analysis'], item['dynamic_weights'],
+                item['structured_bonus'], item['structured_comments_data'], start_time, now
+            ))
+        return results
+
+    async def calculate_score_batch(self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                                    poll_interval: float = None) -> List[Dict[str, Any]]:
+        """Score pairs through the OpenAI Batch API (half price, separate rate-limit pool, up to 24h turnaround)"""
+        start_time = time.perf_counter()
+        # One clock reading for the whole run, shared by every item's analysis and response
+        now = datetime.now()
+        semaphore = asyncio.Semaphore(config.api.max_concurrent_requests)
+        
+        # Weights, structured analysis and comment bonuses still run locally/synchronously per pair
+        async def _prepare(resume_data, job_data, skills_analysis, comment_analysis):
+            async with semaphore:
+                return await self._run_analysis(self._prepare_batch_item, resume_data, job_data, now, skills_analysis,
+                                                comment_analysis)
+        
+        skills_analyses, comment_analyses = await asyncio.gather(
+            self._run_analysis(self._skills_analyses, pairs),
+            self._run_analysis(self._comment_analyses, pairs)
+        )
+        items = await asyncio.gather(*(
+            _prepare(resume_data, job_data, skills_analysis, comment_analysis)
+            for (resume_data, job_data), skills_analysis, comment_analysis in zip(pairs, skills_analyses, comment_analyses)
+        ))
+        
+        # Pairs scored before are served from the results cache; only the rest go into the batch
+        cache_keys = [self._get_cache_key(resume_data, job_data) for resume_data, job_data in pairs]
+        cached_results = [
+            self._get_cached_result(cache_key, resume_data, job_data)
+            for cache_key, (resume_data, job_data) in zip(cache_keys, pairs)
+        ]
+        pending = [index for index, cached in enumerate(cached_results) if cached is None]
+        
+        outputs = {}
+        batch_error = None
+        if pending:
+            requests = {f"resume-{index}": items[index]['request'] for index in pending}
+            try:
+                outputs = await run_chat_batch(self.async_openai_client, requests, "scoring_batch.jsonl", poll_interval)
+            except Exception as e:
+                logger.error("OpenAI batch scoring failed: %s", e)
+                batch_error = str(e)
+        
+        results = []
+        for index, ((resume_data, job_data), item) in enumerate(zip(pairs, items)):
+            openai_result = cached_results[index]
+            try:
+                if openai_result is not None:
+                    processing_info = self._cached_processing_info()
+                else:
+                    if batch_error:
+                        raise RuntimeError(batch_error)
+                    line = outputs.get(f"resume-{index}")
+                    if line is None:
+                        raise ValueError(f"Batch output missing resume-{index}")
+                    openai_result, processing_info = self._parse_batch_output_line(line)
+                    self._cache_result(cache_keys[index], openai_result, resume_data, job_data)
+            except Exception as e:
+                openai_result = self._create_error_response(str(e))
+                processing_info = {'error': True, 'provider': 'OpenAI', 'batch': True}
+            
+            results.append(self._build_comprehensive_response(
+                resume_data, openai_result, processing_info, item['structured_analysis'], item['dynamic_weights'],
+                item['structured_bonus'], item['structured_comments_data'], start_time, now
+            ))
+        
+        return results
+
+    def _create_error_response(self, error_message: str) -> Dict[str, Any]:
+        return self._create_standard_error_response("OpenAI", error_message)
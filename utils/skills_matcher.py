@@ -1,11 +1,53 @@
 from typing import Dict, Any, List, Set, Tuple
 import re
 from difflib import SequenceMatcher
+from functools import lru_cache
 import logging
 
+try:
+    # Optional: C++ edit-distance ratio, much faster than difflib on short strings
+    from rapidfuzz import fuzz
+    _RAPIDFUZZ = True
+except ImportError:
+    _RAPIDFUZZ = False
+
+try:
+    # Optional: C-level similarity matrix plus an optimal one-to-one assignment
+    import numpy as np
+    from rapidfuzz import process
+    from scipy.optimize import linear_sum_assignment
+    _FAST_MATCHING = True
+except ImportError:
+    _FAST_MATCHING = False
+
 logger = logging.getLogger(__name__)
 
+_NON_SKILL_CHARS_RE = re.compile(r'[^\w\s+#]')
+_WHITESPACE_RE = re.compile(r'\s+')
+# Common technology names picked up from free text in addition to the alias vocabulary
+_PROGRAMMING_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'\b(python|java|javascript|typescript|c\+\+|c#|php|ruby|go|rust|swift|kotlin)\b',
+    r'\b(html|css|sql|bash|shell|powershell)\b',
+    r'\b(react|angular|vue|node|express|django|flask|spring)\b',
+    r'\b(aws|azure|gcp|docker|kubernetes|jenkins|git)\b',
+    r'\b(mysql|postgresql|mongodb|redis|elasticsearch)\b'
+))
+# Canonical skill -> categorize_skills bucket; anything else is 'other'
+_SKILL_CATEGORIES = {
+    skill: category
+    for category, skills in (
+        ('programming_languages', ('python', 'javascript', 'java', 'c++', 'c#', 'typescript', 'php', 'ruby', 'go', 'rust')),
+        ('frameworks_libraries', ('react', 'angular', 'vue', 'node', 'express', 'django', 'flask', 'fastapi', 'spring')),
+        ('databases', ('mysql', 'postgresql', 'mongodb', 'redis', 'sqlite')),
+        ('cloud_devops', ('aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins')),
+        ('data_ml', ('pandas', 'numpy', 'tensorflow', 'pytorch', 'scikit-learn')),
+    )
+    for skill in skills
+}
+
 class SkillsProcessor:
+    # Upper bound on memoized normalizations; the same skills recur across every resume and job
+    normalize_cache_size = 10000
     
     def __init__(self):
         # Common skill variations and aliases
@@ -68,6 +110,30 @@ class SkillsProcessor:
         for canonical, aliases in self.skill_aliases.items():
             for alias in aliases:
                 self.normalized_skills[alias.lower()] = canonical
+        
+        # Whole known vocabulary as one alternation, longest first, so text is scanned once rather than
+        # once per skill; the lookahead keeps matches that start inside a longer one ("aws" in "amazon aws")
+        self._all_known_skills = frozenset(self.skill_aliases).union(self.normalized_skills)
+        # Two different canonical names are known-distinct skills, however alike they look ("java", "javascript")
+        self._canonical_skills = frozenset(self.skill_aliases)
+        self._vocabulary_re = re.compile(r'(?=\b(' + '|'.join(
+            re.escape(skill) for skill in sorted(self._all_known_skills, key=len, reverse=True)
+        ) + r')\b)')
+        
+        # Partial-match indexes, both keyed to an alias's position in normalized_skills so the earliest
+        # alias wins as in a linear scan: every substring of every alias (skill inside an alias), and one
+        # alternation in table order whose per-position lookahead finds the earliest alias inside a skill
+        aliases = list(self.normalized_skills)
+        self._alias_rank = {alias: rank for rank, alias in enumerate(aliases)}
+        self._alias_substring_rank: Dict[str, int] = {}
+        for rank, alias in enumerate(aliases):
+            for start in range(len(alias)):
+                for end in range(start + 1, len(alias) + 1):
+                    self._alias_substring_rank.setdefault(alias[start:end], rank)
+        self._alias_in_skill_re = re.compile('(?=(' + '|'.join(re.escape(alias) for alias in aliases) + '))')
+        self._alias_canonicals = list(self.normalized_skills.values())
+        
+        self._normalize_cache: Dict[str, str] = {}
     
     def extract_skill_string(self, skill) -> str:
         """
@@ -80,32 +146,54 @@ class SkillsProcessor:
     def normalize_skill(self, skill) -> str:
         # Handle both string and dict formats using helper method
         skill_str = self.extract_skill_string(skill)
-            
-        skill_clean = re.sub(r'[^\w\s+#]', '', skill_str.lower().strip())
-        skill_clean = re.sub(r'\s+', ' ', skill_clean)
+        
+        cached = self._normalize_cache.get(skill_str)
+        if cached is not None:
+            return cached
+        
+        normalized = self._normalize_skill_string(skill_str)
+        if len(self._normalize_cache) >= self.normalize_cache_size:
+            self._normalize_cache.clear()
+        self._normalize_cache[skill_str] = normalized
+        return normalized
+    
+    def _normalize_skill_string(self, skill_str: str) -> str:
+        skill_clean = _NON_SKILL_CHARS_RE.sub('', skill_str.lower().strip())
+        skill_clean = _WHITESPACE_RE.sub(' ', skill_clean)
         
         # Check direct mapping
         if skill_clean in self.normalized_skills:
             return self.normalized_skills[skill_clean]
         
-        # Check for partial matches
-        for normalized, canonical in self.normalized_skills.items():
-            if skill_clean in normalized or normalized in skill_clean:
-                return canonical
+        # Blank input would be a substring of every alias
+        if not skill_clean:
+            return skill_clean
+        
+        # Check for partial matches: the first alias that contains, or is contained in, the skill
+        ranks = [self._alias_rank[alias] for alias in self._alias_in_skill_re.findall(skill_clean)]
+        contained_in = self._alias_substring_rank.get(skill_clean)
+        if contained_in is not None:
+            ranks.append(contained_in)
+        if ranks:
+            return self._alias_canonicals[min(ranks)]
         
         return skill_clean
     
     def fuzzy_similarity(self, skill1: str, skill2: str) -> float:
-        # Normalize both skills
-        norm1 = self.normalize_skill(skill1)
-        norm2 = self.normalize_skill(skill2)
-        
+        return self._normalized_similarity(self.normalize_skill(skill1), self.normalize_skill(skill2))
+    
+    def _normalized_similarity(self, norm1: str, norm2: str) -> float:
         # Exact match after normalization
         if norm1 == norm2:
             return 1.0
+        if norm1 in self._canonical_skills and norm2 in self._canonical_skills:
+            return 0.0
         
-        # Use SequenceMatcher for fuzzy matching
-        similarity = SequenceMatcher(None, norm1, norm2).ratio()
+        # Edit-distance ratio for fuzzy matching
+        if _RAPIDFUZZ:
+            similarity = fuzz.ratio(norm1, norm2) / 100
+        else:
+            similarity = SequenceMatcher(None, norm1, norm2).ratio()
         
         # Additional checks for common patterns
         if norm1 in norm2 or norm2 in norm1:
@@ -130,38 +218,36 @@ class SkillsProcessor:
         # Convert skills to strings using helper method
         resume_skill_strings = [self.extract_skill_string(skill) for skill in resume_skills]
         job_skill_strings = [self.extract_skill_string(skill) for skill in job_skills]
-        
-        matched_skills = []
-        missing_skills = []
-        used_resume_skills = set()
+        # Normalize each skill once rather than once per pair compared; a resume skill listed more than once
+        # ("Python" in two sections) is one candidate, reported under its first listing
+        first_listing: Dict[str, str] = {}
+        for skill in resume_skill_strings:
+            first_listing.setdefault(self.normalize_skill(skill), skill)
+        resume_normalized = list(first_listing)
+        resume_listings = list(first_listing.values())
+        job_normalized = [self.normalize_skill(skill) for skill in job_skill_strings]
         
         # Higher threshold for better precision
         FUZZY_THRESHOLD = 0.75
         
-        for job_skill in job_skill_strings:
-            best_match = None
-            best_similarity = 0.0
-            best_resume_skill = None
-            
-            for i, resume_skill in enumerate(resume_skill_strings):
-                if i in used_resume_skills:
-                    continue
-                    
-                similarity = self.fuzzy_similarity(job_skill, resume_skill)
-                
-                if similarity > best_similarity and similarity >= FUZZY_THRESHOLD:
-                    best_similarity = similarity
-                    best_match = resume_skill
-                    best_resume_skill = i
-            
-            if best_match:
+        if _FAST_MATCHING:
+            assignment = self._optimal_skill_assignment(job_normalized, resume_normalized, FUZZY_THRESHOLD,
+                                                        self._canonical_skills)
+        else:
+            assignment = self._greedy_skill_assignment(job_normalized, resume_normalized, FUZZY_THRESHOLD,
+                                                       self._canonical_skills)
+        
+        matched_skills = []
+        missing_skills = []
+        for j, job_skill in enumerate(job_skill_strings):
+            if j in assignment:
+                resume_index, similarity = assignment[j]
                 matched_skills.append({
                     'job_skill': job_skill,
-                    'resume_skill': best_match,
-                    'similarity': float(best_similarity),
-                    'match_type': 'exact' if best_similarity >= 0.95 else 'fuzzy'
+                    'resume_skill': resume_listings[resume_index],
+                    'similarity': float(similarity),
+                    'match_type': 'exact' if similarity >= 0.95 else 'fuzzy'
                 })
-                used_resume_skills.add(best_resume_skill)
             else:
                 missing_skills.append(job_skill)
         
@@ -180,6 +266,80 @@ class SkillsProcessor:
             }
         }
     
+    @staticmethod
+    def _optimal_skill_assignment(job_normalized: List[str], resume_normalized: List[str], threshold: float,
+                                  canonical_skills: frozenset) -> Dict[int, Tuple[int, float]]:
+        """Pair job and resume skills one-to-one, maximizing total similarity: job index -> (resume index, similarity)"""
+        scores = process.cdist(job_normalized, resume_normalized, scorer=fuzz.ratio, dtype=np.float32) / 100
+        # Same containment rule as _normalized_similarity (exact matches already score 1.0); blank
+        # resume entries never match
+        for i, resume_norm in enumerate(resume_normalized):
+            if not resume_norm:
+                scores[:, i] = 0.0
+                continue
+            for j, job_norm in enumerate(job_normalized):
+                if scores[j, i] < 0.8 and (job_norm in resume_norm or resume_norm in job_norm):
+                    scores[j, i] = 0.8
+        # Different canonical skills never match
+        job_canonical = np.array([name in canonical_skills for name in job_normalized])
+        resume_canonical = np.array([name in canonical_skills for name in resume_normalized])
+        scores[np.outer(job_canonical, resume_canonical) & (scores < 1.0)] = 0.0
+        scores[scores < threshold] = 0.0
+        
+        rows, cols = linear_sum_assignment(scores, maximize=True)
+        return {
+            int(j): (int(i), float(scores[j, i]))
+            for j, i in zip(rows, cols) if scores[j, i] >= threshold
+        }
+    
+    @staticmethod
+    def _greedy_skill_assignment(job_normalized: List[str], resume_normalized: List[str], threshold: float,
+                                 canonical_skills: frozenset) -> Dict[int, Tuple[int, float]]:
+        """Give each job skill, in order, its most similar unused resume skill: job index -> (resume index, similarity)"""
+        assignment = {}
+        # Flag per resume index; cheaper than set membership in the inner loop
+        used_resume_skills = bytearray(len(resume_normalized))
+        
+        for j, job_norm in enumerate(job_normalized):
+            best_similarity = 0.0
+            best_resume_skill = None
+            
+            for i, resume_norm in enumerate(resume_normalized):
+                if used_resume_skills[i] or not resume_norm:
+                    continue
+                
+                if job_norm == resume_norm:
+                    similarity = 1.0
+                elif job_norm in canonical_skills and resume_norm in canonical_skills:
+                    # Different canonical skills never match
+                    continue
+                else:
+                    # Cheap upper bounds rule out most pairs before the full ratio; containment alone
+                    # guarantees 0.8
+                    floor = 0.8 if job_norm in resume_norm or resume_norm in job_norm else 0.0
+                    bar = max(best_similarity, threshold)
+                    if _RAPIDFUZZ:
+                        # Scores under score_cutoff come back as 0 without finishing the comparison
+                        similarity = max(fuzz.ratio(job_norm, resume_norm, score_cutoff=bar * 100) / 100, floor)
+                    else:
+                        matcher = SequenceMatcher(None, job_norm, resume_norm)
+                        if floor < bar and (matcher.real_quick_ratio() < bar or matcher.quick_ratio() < bar):
+                            continue
+                        similarity = max(matcher.ratio(), floor)
+                
+                if similarity > best_similarity and similarity >= threshold:
+                    best_similarity = similarity
+                    best_resume_skill = i
+                    if similarity == 1.0:
+                        # Nothing can beat an exact match
+                        break
+            
+            if best_resume_skill is not None:
+                assignment[j] = (best_resume_skill, best_similarity)
+                used_resume_skills[best_resume_skill] = 1
+        
+        return assignment
+    
     def categorize_skills(self, skills: List[str]) -> Dict[str, List[str]]:
         categories = {
             'programming_languages': [],
@@ -190,27 +350,8 @@ class SkillsProcessor:
             'other': []
         }
         
-        programming_langs = ['python', 'javascript', 'java', 'c++', 'c#', 'typescript', 'php', 'ruby', 'go', 'rust']
-        frameworks = ['react', 'angular', 'vue', 'node', 'express', 'django', 'flask', 'fastapi', 'spring']
-        databases = ['mysql', 'postgresql', 'mongodb', 'redis', 'sqlite']
-        cloud_devops = ['aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins']
-        data_ml = ['pandas', 'numpy', 'tensorflow', 'pytorch', 'scikit-learn']
-        
         for skill in skills:
-            normalized = self.normalize_skill(skill)
-            
-            if normalized in programming_langs:
-                categories['programming_languages'].append(skill)
-            elif normalized in frameworks:
-                categories['frameworks_libraries'].append(skill)
-            elif normalized in databases:
-                categories['databases'].append(skill)
-            elif normalized in cloud_devops:
-                categories['cloud_devops'].append(skill)
-            elif normalized in data_ml:
-                categories['data_ml'].append(skill)
-            else:
-                categories['other'].append(skill)
+            categories[_SKILL_CATEGORIES.get(self.normalize_skill(skill), 'other')].append(skill)
         
         return categories
     
@@ -226,35 +367,23 @@ class SkillsProcessor:
         extracted_skills = []
         
         # Check against our known skills vocabulary
-        all_known_skills = set()
-        for canonical, aliases in self.skill_aliases.items():
-            all_known_skills.add(canonical)
-            all_known_skills.update(aliases)
-        
-        # Simple pattern matching for skills in text
-        for skill in all_known_skills:
-            # Use word boundaries to avoid partial matches
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text_lower):
-                # Add the canonical form
-                canonical = self.normalize_skill(skill)
-                if canonical not in extracted_skills:
-                    extracted_skills.append(canonical)
+        for match in self._vocabulary_re.findall(text_lower):
+            # Add the canonical form; every hit is a known alias or canonical name
+            canonical = self.normalized_skills.get(match, match)
+            if canonical not in extracted_skills:
+                extracted_skills.append(canonical)
         
         # Additional common patterns
-        programming_patterns = [
-            r'\b(python|java|javascript|typescript|c\+\+|c#|php|ruby|go|rust|swift|kotlin)\b',
-            r'\b(html|css|sql|bash|shell|powershell)\b',
-            r'\b(react|angular|vue|node|express|django|flask|spring)\b',
-            r'\b(aws|azure|gcp|docker|kubernetes|jenkins|git)\b',
-            r'\b(mysql|postgresql|mongodb|redis|elasticsearch)\b'
-        ]
-        
-        for pattern in programming_patterns:
-            matches = re.findall(pattern, text_lower)
-            for match in matches:
+        for pattern in _PROGRAMMING_PATTERNS:
+            for match in pattern.findall(text_lower):
                 normalized = self.normalize_skill(match)
                 if normalized not in extracted_skills:
                     extracted_skills.append(normalized)
         
         return extracted_skills
+
+
+@lru_cache(maxsize=None)
+def get_default_skills_processor() -> SkillsProcessor:
+    """Process-wide SkillsProcessor, so the alias tables, regexes and normalization cache are built once"""
+    return SkillsProcessor()
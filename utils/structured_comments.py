@@ -1,77 +1,365 @@
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
-import json
-from openai import OpenAI
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient, APIError
+import numpy as np
+import asyncio
+import copy
+import hashlib
+import logging
 import os
 import re
+import string
+import threading
+from config import config
+from .json_utils import json_loads, loads_partial, stable_json_bytes
+from .embedding_matcher import EmbeddingSkillsMatcher
+from .openai_retries import with_retries
+from .openai_batch import batch_response_body, run_chat_batch
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+def _keyword_re(keywords) -> re.Pattern:
+    """One alternation over literal keywords; search() finds whether any occurs as a substring in a single C-level scan"""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+# Technologies looked for in job descriptions, each with the phrasings that mark it as required
+_TECH_REQUIREMENT_RES = tuple(
+    (tech, _keyword_re((f'required {tech}', f'must have {tech}', f'{tech} required')))
+    for tech in ('python', 'javascript', 'java', 'react', 'angular', 'vue', 'django', 'flask',
+                 'spring', 'node.js', 'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'sql',
+                 'postgresql', 'mysql', 'mongodb', 'redis', 'git', 'ci/cd', 'rest', 'api')
+)
+_WORK_ARRANGEMENT_RES = (
+    ('remote', _keyword_re(('remote', 'work from home', 'distributed'))),
+    ('onsite', _keyword_re(('office', 'onsite', 'on-site', 'in-person'))),
+    ('hybrid', _keyword_re(('hybrid',))),
+)
+_URGENT_RE = _keyword_re(('urgent', 'immediate', 'asap', 'start immediately', 'right away'))
+_SENIOR_TITLE_RE = _keyword_re(('senior', 'lead', 'principal', 'staff'))
+_JUNIOR_TITLE_RE = _keyword_re(('junior', 'entry', 'graduate', 'intern'))
+_YEARS_RE = re.compile(r'(\d+)[\+\-]?\s*(?:years?|yrs?)')
+_WHITESPACE_RE = re.compile(r'\s+')
+# Role-specific keywords per focus type. Each type gets one alternation regex, and a joined keyword string for
+# the reverse "interest within a keyword" check
+_ROLE_KEYWORDS = {
+    'frontend': ('frontend', 'front-end', 'ui', 'ux', 'react', 'angular', 'vue', 'css', 'html', 'javascript'),
+    'backend': ('backend', 'back-end', 'api', 'server', 'database', 'microservices', 'rest'),
+    'fullstack': ('fullstack', 'full-stack', 'full stack'),
+    'data': ('data', 'analytics', 'machine learning', 'ml', 'ai', 'analysis', 'scientist'),
+    'devops': ('devops', 'infrastructure', 'deployment', 'ci/cd', 'docker', 'kubernetes', 'aws'),
+    'mobile': ('mobile', 'ios', 'android', 'react native', 'flutter', 'app'),
+    'web': ('web', 'website', 'application', 'development'),
+}
+_ROLE_KEYWORD_MATCHERS = tuple(
+    (focus_type, _keyword_re(keywords), '\x00'.join(keywords))
+    for focus_type, keywords in _ROLE_KEYWORDS.items()
+)
+
+def _object_schema(properties: Dict[str, Any]) -> Dict[str, Any]:
+    # Structured outputs in strict mode need every property required and no extras
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+# Per-candidate analysis enforced through structured outputs; the enums (with "" for no claim) keep the model
+# from wandering into free text, so responses stay short and need no normalization
+_ANALYSIS_PROPERTIES = {
+    "technical": _object_schema({
+        "claimed_skills": _STRING_LIST,
+        "experience_claims": _STRING_LIST,
+        "technical_confidence": {"type": "number"}
+    }),
+    "work_arrangement": _object_schema({
+        "preferred_arrangement": {"type": "string", "enum": ["remote", "hybrid", "onsite", "flexible", ""]},
+        "arrangement_strength": {"type": "number"}
+    }),
+    "availability": _object_schema({
+        "availability_timeline": {"type": "string", "enum": ["immediate", "weeks", "months", "flexible", ""]},
+        "availability_urgency": {"type": "number"}
+    }),
+    "role_focus": _object_schema({
+        "role_interests": _STRING_LIST,
+        "focus_areas": _STRING_LIST
+    }),
+    "experience_level": _object_schema({
+        "experience_level_claim": {"type": "string", "enum": ["junior", "mid", "senior", "expert", ""]},
+        "confidence_level": {"type": "number"}
+    })
+}
+_ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "comment_analysis", "strict": True, "schema": _object_schema(_ANALYSIS_PROPERTIES)}
+}
+_BATCH_ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "comment_analysis_batch",
+        "strict": True,
+        "schema": _object_schema({
+            "results": {"type": "array", "items": _object_schema({"id": {"type": "integer"}, **_ANALYSIS_PROPERTIES})}
+        })
+    }
+}
+
+# Analysis instructions are invariant and sent as the system message, so they form a stable prefix for OpenAI's
+# prompt caching; field names and allowed values come from the strict response schemas above, not the prompt text.
+# The user message only carries the job's derived requirement fields and the comments
+_ANALYSIS_INSTRUCTIONS = """You are an expert at analyzing candidate comments for alignment with job requirements.
+Extract concrete claims, not general sentiments, across 5 dimensions: technical skills, work arrangement, availability, role focus and experience level.
+Confidence, strength and urgency values are on a 0.0-1.0 scale. Use empty strings and empty arrays where the comments make no specific claim."""
+_BATCH_ANALYSIS_INSTRUCTIONS = f"""{_ANALYSIS_INSTRUCTIONS}
+Several candidates are given; analyze each independently and return exactly one result per candidate, with "id" set to the candidate number."""
+_JOB_CONTEXT_TEXT = """Job Requirements Context:
+- Required Tech: $required_tech
+- Preferred Tech: $preferred_tech
+- Work Arrangement: $work_arrangement
+- Experience Level: $experience_level
+- Required Years: $required_years"""
+_ANALYSIS_PROMPT = string.Template(_JOB_CONTEXT_TEXT + '\n\nCandidate Comments: "$comments"')
+_BATCH_ANALYSIS_PROMPT = string.Template(_JOB_CONTEXT_TEXT + "\n\n$candidates")
+
+# (preferred, job) work arrangement scores; any other pair involving 'flexible' scores _FLEXIBLE_WORK_SCORE,
+# and the rest get NO POINTS for misaligned preferences
+_WORK_COMPAT = {
+    ('remote', 'remote'): 1.0,
+    ('hybrid', 'hybrid'): 1.0,
+    ('onsite', 'onsite'): 1.0,
+    ('flexible', 'flexible'): 1.0,
+    ('hybrid', 'remote'): 0.6,
+    ('hybrid', 'onsite'): 0.6,
+    ('remote', 'hybrid'): 0.7,
+    ('onsite', 'hybrid'): 0.5,
+}
+_FLEXIBLE_WORK_SCORE = 0.8
+
+# Local analysis of short stock comments: a comment qualifies when every clause fully matches one of these
+# patterns, each dimension at most once. Anything else (tech claims, hedges, lists of options) goes to the model
+_LOCAL_CLAUSE_SPLIT_RE = re.compile(r'\s*(?:[,.;!]|\band\b|\balso\b)\s*')
+_LOCAL_CLAUSE_PATTERNS = (
+    ('work_arrangement', re.compile(
+        r"(?:i )?(?:want|prefer|need|looking for|only)? ?(?:a |to work )?(?:fully )?"
+        r"(remote|hybrid|onsite|on-site|in-office)(?: work| working| role| position| job)?(?: only)?"
+    )),
+    ('availability', re.compile(
+        r"(?:i )?(?:can |could )?(?:start|available|join)(?: to start)? "
+        r"(immediately|now|asap|right away|in (?:a few|\d+|two|three) (?:weeks|months))"
+    )),
+    ('experience_level', re.compile(
+        r"(?:i am |i'm )?(?:a )?(junior|mid-level|mid level|senior|expert)(?: level)?(?: developer| engineer)?"
+    )),
+)
+_LOCAL_CLAIM_VALUES = {
+    'on-site': 'onsite', 'in-office': 'onsite',
+    'immediately': 'immediate', 'now': 'immediate', 'asap': 'immediate', 'right away': 'immediate',
+    'mid-level': 'mid', 'mid level': 'mid',
+}
+# Confidence given to a claim the candidate states outright
+_LOCAL_CLAIM_CONFIDENCE = 0.9
+
+# Strict compatibility matrix - NO PARTICIPATION POINTS. Rows are the claimed level, columns the job level,
+# both indexed through _LEVEL_INDEX; unlisted levels score 0
+_LEVEL_INDEX = {'junior': 0, 'mid': 1, 'senior': 2, 'expert': 3}
+_LEVEL_SCORES = (
+    # junior mid  senior expert   <- job level
+    (1.0,   0.6, 0.0,   0.0),   # junior: some points for mid-level, NO POINTS for senior
+    (0.0,   1.0, 0.5,   0.0),   # mid: some points for senior, NO POINTS for overqualification
+    (0.0,   0.0, 1.0,   0.0),   # senior: NO POINTS for overqualification
+    (0.0,   0.0, 1.0,   0.0),   # expert: NO POINTS for overqualification
+)
+
+@dataclass(slots=True)
 class TechnicalAlignment:
-    claimed_skills: List[str] = None
-    experience_claims: List[str] = None
+    claimed_skills: List[str] = field(default_factory=list)
+    experience_claims: List[str] = field(default_factory=list)
     technical_confidence: float = 0.0
     alignment_score: float = 0.0
     
-    def __post_init__(self):
-        if self.claimed_skills is None:
-            self.claimed_skills = []
-        if self.experience_claims is None:
-            self.experience_claims = []
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'claimed_skills': list(self.claimed_skills),
+            'experience_claims': list(self.experience_claims),
+            'technical_confidence': self.technical_confidence,
+            'alignment_score': self.alignment_score
+        }
 
-@dataclass
+@dataclass(slots=True)
 class WorkArrangementAlignment:
     preferred_arrangement: str = ""  # remote/hybrid/onsite/flexible
     arrangement_strength: float = 0.0
     alignment_score: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'preferred_arrangement': self.preferred_arrangement,
+            'arrangement_strength': self.arrangement_strength,
+            'alignment_score': self.alignment_score
+        }
 
-@dataclass
+@dataclass(slots=True)
 class AvailabilityAlignment:
     availability_timeline: str = ""  # immediate/weeks/months/flexible
     availability_urgency: float = 0.0
     alignment_score: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'availability_timeline': self.availability_timeline,
+            'availability_urgency': self.availability_urgency,
+            'alignment_score': self.alignment_score
+        }
 
-@dataclass
+@dataclass(slots=True)
 class RoleFocusAlignment:
-    role_interests: List[str] = None
-    focus_areas: List[str] = None
+    role_interests: List[str] = field(default_factory=list)
+    focus_areas: List[str] = field(default_factory=list)
     alignment_score: float = 0.0
     
-    def __post_init__(self):
-        if self.role_interests is None:
-            self.role_interests = []
-        if self.focus_areas is None:
-            self.focus_areas = []
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'role_interests': list(self.role_interests),
+            'focus_areas': list(self.focus_areas),
+            'alignment_score': self.alignment_score
+        }
 
-@dataclass
+@dataclass(slots=True)
 class ExperienceLevelAlignment:
     experience_level_claim: str = ""  # junior/mid/senior/expert
     confidence_level: float = 0.0
     alignment_score: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'experience_level_claim': self.experience_level_claim,
+            'confidence_level': self.confidence_level,
+            'alignment_score': self.alignment_score
+        }
 
-@dataclass
+@dataclass(slots=True)
 class MultiDimensionalAnalysis:
-    technical: TechnicalAlignment = None
-    work_arrangement: WorkArrangementAlignment = None
-    availability: AvailabilityAlignment = None
-    role_focus: RoleFocusAlignment = None
-    experience_level: ExperienceLevelAlignment = None
-    
-    def __post_init__(self):
-        if self.technical is None:
-            self.technical = TechnicalAlignment()
-        if self.work_arrangement is None:
-            self.work_arrangement = WorkArrangementAlignment()
-        if self.availability is None:
-            self.availability = AvailabilityAlignment()
-        if self.role_focus is None:
-            self.role_focus = RoleFocusAlignment()
-        if self.experience_level is None:
-            self.experience_level = ExperienceLevelAlignment()
+    technical: TechnicalAlignment = field(default_factory=TechnicalAlignment)
+    work_arrangement: WorkArrangementAlignment = field(default_factory=WorkArrangementAlignment)
+    availability: AvailabilityAlignment = field(default_factory=AvailabilityAlignment)
+    role_focus: RoleFocusAlignment = field(default_factory=RoleFocusAlignment)
+    experience_level: ExperienceLevelAlignment = field(default_factory=ExperienceLevelAlignment)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        # Explicit conversion; dataclasses.asdict deep-copies every field recursively
+        return {
+            'technical': self.technical.to_dict(),
+            'work_arrangement': self.work_arrangement.to_dict(),
+            'availability': self.availability.to_dict(),
+            'role_focus': self.role_focus.to_dict(),
+            'experience_level': self.experience_level.to_dict()
+        }
+
+@lru_cache(maxsize=256)
+def _job_requirements(description: str, title: str) -> Dict[str, Any]:
+    """Requirements read from a job's description and title, shared by every candidate scored against it"""
+    description = description.lower()
+    title = title.lower()
+    
+    # Extract technical requirements; every required phrasing contains the tech itself, so the
+    # phrasings are only searched for technologies the description mentions at all
+    required_tech = []
+    preferred_tech = []
+    
+    for tech, required_re in _TECH_REQUIREMENT_RES:
+        if tech not in description:
+            continue
+        if required_re.search(description):
+            required_tech.append(tech)
+        else:
+            preferred_tech.append(tech)
+    
+    # Extract work arrangement
+    work_arrangement = next(
+        (arrangement for arrangement, words_re in _WORK_ARRANGEMENT_RES if words_re.search(description)),
+        'flexible'
+    )
+    
+    # Extract experience level
+    experience_level = 'mid'
+    if _SENIOR_TITLE_RE.search(title):
+        experience_level = 'senior'
+    elif _JUNIOR_TITLE_RE.search(title):
+        experience_level = 'junior'
+    
+    # Check for years of experience
+    exp_match = _YEARS_RE.search(description)
+    required_years = int(exp_match.group(1)) if exp_match else 0
+    
+    # Check if job mentions urgency
+    job_is_urgent = bool(_URGENT_RE.search(description))
+    
+    # Focus areas named in the title or description
+    role_focus = tuple(
+        focus_type for focus_type, keyword_re, _ in _ROLE_KEYWORD_MATCHERS
+        if keyword_re.search(title) or keyword_re.search(description)
+    )
+    
+    return {
+        'required_tech': required_tech,
+        'preferred_tech': preferred_tech,
+        'work_arrangement': work_arrangement,
+        'experience_level': experience_level,
+        'required_years': required_years,
+        'job_is_urgent': job_is_urgent,
+        'role_focus': role_focus,
+        'description': description,
+        'title': title
+    }
+
+def _analysis_timeout() -> httpx.Timeout:
+    return httpx.Timeout(float(config.scoring.timeout_seconds), connect=5.0)
+
+def _analysis_pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_keepalive_connections=config.api.max_keepalive_connections,
+        max_connections=config.api.max_connections,
+    )
 
 class GPTMultiDimensionalAnalyzer:
+    SYSTEM_MESSAGE = {"role": "system", "content": _ANALYSIS_INSTRUCTIONS}
+    BATCH_SYSTEM_MESSAGE = {"role": "system", "content": _BATCH_ANALYSIS_INSTRUCTIONS}
+    
+    # Candidates whose comments share one model call in analyze_comments_batch
+    COMMENTS_PER_REQUEST = 6
+    
+    # Output allowance per candidate; a full analysis is roughly 250 tokens
+    MAX_TOKENS_PER_ANALYSIS = 400
+    
+    # Comments are trimmed to this many characters before prompting; the analysis only extracts a handful of
+    # categorical claims and confidences, which text past the cap barely moves
+    MAX_COMMENT_CHARS = 800
+    
+    # Longest comment, in words, that local analysis will take on
+    LOCAL_ANALYSIS_MAX_WORDS = 12
+    
     def __init__(self):
-        self.openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        # Batched analyses run concurrently on this client, so its keep-alive pool is sized like the scoring engine's.
+        # The SDK retries transient failures (429, 5xx, timeouts, dropped connections) with jittered exponential
+        # backoff, as many times as the scoring engine's client does
+        self.openai_client = OpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'), timeout=_analysis_timeout(), max_retries=config.api.max_retries,
+            http_client=DefaultHttpxClient(limits=_analysis_pool_limits())
+        )
+        self._async_openai_client = None
+        self._async_client_loop = None
         self.model = "gpt-4o-mini"
+        # Validated analyses keyed by model, comments and extracted job requirements; re-scoring a candidate
+        # against the same job (re-runs, debugging) skips the model call
+        self._analysis_cache: OrderedDict = OrderedDict()
+        self._analysis_cache_size = config.cache.comment_analysis_entries
+        self._analysis_cache_lock = threading.Lock()
+        # Opt-in semantic tier: per job, embeddings of analyzed comments next to their analyses, so a reworded
+        # comment ("remote work" vs "I prefer working remotely") reuses an analysis instead of a model call
+        self.semantic_threshold = config.cache.comment_semantic_threshold
+        self._semantic_index: OrderedDict = OrderedDict()
+        self._embedder: Optional[EmbeddingSkillsMatcher] = None
+        self.local_analysis = config.scoring.local_comment_analysis
 
     def analyze_comments(self, comments: str, job_data: Dict[str, Any]) -> MultiDimensionalAnalysis:
         """Analyze user comments across all dimensions and validate against job requirements"""
@@ -81,156 +369,445 @@ class GPTMultiDimensionalAnalyzer:
         # Extract job requirements for validation
         job_requirements = self._extract_job_requirements(job_data)
         
+        cache_key = self._analysis_cache_key(comments, job_requirements)
+        cached = self._known_analysis(cache_key, comments, job_requirements)
+        if cached is not None:
+            return cached
+        similar, embedding = self._find_similar_analysis(comments, job_requirements)
+        if similar is not None:
+            return similar
+        
         # Analyze user claims across all dimensions
         analysis_prompt = self._create_analysis_prompt(comments, job_requirements)
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert at analyzing candidate comments for alignment with job requirements across technical skills, work arrangement, availability, role focus, and experience level."},
-                    {"role": "user", "content": analysis_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1,
-                max_tokens=1200
-            )
-            result = json.loads(response.choices[0].message.content)
+            result = self._request_analysis(analysis_prompt)
         except Exception as e:
             # In case of API error, return an empty analysis object
             return MultiDimensionalAnalysis()
         
         # Parse the GPT response into structured analysis
         multi_analysis = self._parse_multi_dimensional_response(result)
+        self._validate_analysis(multi_analysis, job_requirements)
+        self._remember_analysis(cache_key, multi_analysis)
+        self._index_similar_analysis(job_requirements, embedding, multi_analysis)
+        return multi_analysis
+
+    def analyze_comments_stream(self, comments: str, job_data: Dict[str, Any]) -> Iterator[MultiDimensionalAnalysis]:
+        """analyze_comments on a streamed completion, yielding a validated analysis each time more of it arrives.
+        
+        Partial analyses hold only the fields received so far (every value in them is complete), so callers can
+        surface early results while the model finishes. The last analysis yielded is the full one.
+        """
+        if not comments or not comments.strip():
+            yield MultiDimensionalAnalysis()
+            return
+        
+        job_requirements = self._extract_job_requirements(job_data)
+        cache_key = self._analysis_cache_key(comments, job_requirements)
+        cached = self._known_analysis(cache_key, comments, job_requirements)
+        if cached is not None:
+            yield cached
+            return
+        
+        analysis_prompt = self._create_analysis_prompt(comments, job_requirements)
+        text = ''
+        last_partial = None
+        try:
+            stream = self.openai_client.chat.completions.create(**self._analysis_request(analysis_prompt), stream=True)
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                text += delta
+                partial = loads_partial(text)
+                if not isinstance(partial, dict) or partial == last_partial:
+                    continue
+                last_partial = partial
+                multi_analysis = self._parse_multi_dimensional_response(partial)
+                self._validate_analysis(multi_analysis, job_requirements)
+                yield multi_analysis
+            result = json_loads(text)
+        except Exception:
+            # In case of API error, fall back to an empty analysis unless partial results were already surfaced
+            if last_partial is None:
+                yield MultiDimensionalAnalysis()
+            return
+        
+        multi_analysis = self._parse_multi_dimensional_response(result)
+        self._validate_analysis(multi_analysis, job_requirements)
+        self._remember_analysis(cache_key, multi_analysis)
+        if result != last_partial:
+            yield multi_analysis
+
+    def analyze_comments_batch(self, comments_list: List[str], job_data: Dict[str, Any]) -> List[MultiDimensionalAnalysis]:
+        """analyze_comments for several candidates applying to one job, COMMENTS_PER_REQUEST candidates per model call.
+        
+        The job requirements are sent once per call and the calls run concurrently. Candidates missing
+        from a batched response, or whose batch failed, are analyzed individually.
+        """
+        job_requirements = self._extract_job_requirements(job_data)
+        analyses: Dict[int, MultiDimensionalAnalysis] = {}
+        cache_keys: Dict[int, bytes] = {}
+        pending = []
+        for index, comments in enumerate(comments_list):
+            if not comments or not comments.strip():
+                continue
+            cache_keys[index] = self._analysis_cache_key(comments, job_requirements)
+            cached = self._known_analysis(cache_keys[index], comments, job_requirements)
+            if cached is not None:
+                analyses[index] = cached
+            else:
+                pending.append(index)
+        chunks = [
+            pending[start:start + self.COMMENTS_PER_REQUEST]
+            for start in range(0, len(pending), self.COMMENTS_PER_REQUEST)
+        ]
+        
+        def _analyze_chunk(indices: List[int]) -> Dict[int, MultiDimensionalAnalysis]:
+            if len(indices) < 2:
+                return {}
+            prompt = self._create_batch_analysis_prompt([comments_list[index] for index in indices], job_requirements)
+            try:
+                result = self._request_analysis(prompt, len(indices))
+            except Exception:
+                return {}
+            
+            analyses = {}
+            entries = result.get('results') if isinstance(result, dict) else None
+            for entry in entries if isinstance(entries, list) else []:
+                candidate = entry.get('id') if isinstance(entry, dict) else None
+                if not isinstance(candidate, int) or not 1 <= candidate <= len(indices):
+                    continue
+                try:
+                    analysis = self._parse_multi_dimensional_response(entry)
+                except (TypeError, ValueError, AttributeError):
+                    continue
+                self._validate_analysis(analysis, job_requirements)
+                self._remember_analysis(cache_keys[indices[candidate - 1]], analysis)
+                analyses[indices[candidate - 1]] = analysis
+            return analyses
+        
+        if chunks:
+            with ThreadPoolExecutor(max_workers=min(len(chunks), config.api.max_concurrent_requests)) as pool:
+                for chunk_analyses in pool.map(_analyze_chunk, chunks):
+                    analyses.update(chunk_analyses)
+        
+        return [
+            analyses[index] if index in analyses else self.analyze_comments(comments, job_data)
+            for index, comments in enumerate(comments_list)
+        ]
+
+    async def analyze_comments_async(self, comments: str, job_data: Dict[str, Any],
+                                     semaphore: asyncio.Semaphore = None) -> MultiDimensionalAnalysis:
+        """analyze_comments on the async client; semaphore, when given, bounds the in-flight API calls"""
+        if not comments or not comments.strip():
+            return MultiDimensionalAnalysis()
+        
+        job_requirements = self._extract_job_requirements(job_data)
+        cache_key = self._analysis_cache_key(comments, job_requirements)
+        cached = self._known_analysis(cache_key, comments, job_requirements)
+        if cached is not None:
+            return cached
+        embedding = None
+        if self.semantic_threshold is not None:
+            # Encoding runs on the CPU, so it stays off the event loop
+            similar, embedding = await asyncio.to_thread(self._find_similar_analysis, comments, job_requirements)
+            if similar is not None:
+                return similar
+        
+        analysis_prompt = self._create_analysis_prompt(comments, job_requirements)
+        
+        try:
+            if semaphore is None:
+                result = await self._request_analysis_async(analysis_prompt)
+            else:
+                async with semaphore:
+                    result = await self._request_analysis_async(analysis_prompt)
+        except (APIError, ValueError):
+            # In case of API error or an unreadable response, return an empty analysis object; anything else
+            # (a broken client, a closed event loop) is a bug and propagates instead of zeroing the bonus
+            return MultiDimensionalAnalysis()
+        
+        multi_analysis = self._parse_multi_dimensional_response(result)
+        self._validate_analysis(multi_analysis, job_requirements)
+        self._remember_analysis(cache_key, multi_analysis)
+        self._index_similar_analysis(job_requirements, embedding, multi_analysis)
+        return multi_analysis
+
+    async def analyze_comments_many_async(self, comments_list: List[str], job_data: Dict[str, Any],
+                                          max_concurrency: int = None) -> List[MultiDimensionalAnalysis]:
+        """One analysis per candidate, at most max_concurrency (default config.api.max_concurrent_requests) in flight"""
+        semaphore = asyncio.Semaphore(max_concurrency or config.api.max_concurrent_requests)
+        return list(await asyncio.gather(*(
+            self.analyze_comments_async(comments, job_data, semaphore) for comments in comments_list
+        )))
+
+    def _analysis_cache_key(self, comments: str, job_requirements: Dict[str, Any]) -> bytes:
+        # Keyed on the text actually sent, so comments differing only in whitespace or past the cap share an entry
+        key = [self.model, self._prompt_comments(comments), job_requirements]
+        return hashlib.blake2b(stable_json_bytes(key), digest_size=16).digest()
+
+    def _known_analysis(self, key: bytes, comments: str, job_requirements: Dict[str, Any]) -> Optional[MultiDimensionalAnalysis]:
+        """Cached analysis, else a local one for short stock comments; None when the comments need a model call"""
+        cached = self._get_cached_analysis(key)
+        if cached is None and self.local_analysis:
+            cached = self._local_analysis(comments, job_requirements)
+        return cached
+
+    def _local_analysis(self, comments: str, job_requirements: Dict[str, Any]) -> Optional[MultiDimensionalAnalysis]:
+        """Validated analysis of comments made only of clauses in _LOCAL_CLAUSE_PATTERNS, or None"""
+        text = self._prompt_comments(comments).lower()
+        if len(text.split()) > self.LOCAL_ANALYSIS_MAX_WORDS:
+            return None
+        
+        claims = {}
+        for clause in filter(None, _LOCAL_CLAUSE_SPLIT_RE.split(text)):
+            for dimension, pattern in _LOCAL_CLAUSE_PATTERNS:
+                match = pattern.fullmatch(clause)
+                if match:
+                    break
+            else:
+                return None
+            if dimension in claims:
+                return None
+            value = match.group(1)
+            if dimension == 'availability' and value.startswith('in '):
+                value = value.rsplit(' ', 1)[1]
+            claims[dimension] = _LOCAL_CLAIM_VALUES.get(value, value)
+        if not claims:
+            return None
         
+        analysis = self._parse_multi_dimensional_response({
+            'work_arrangement': {
+                'preferred_arrangement': claims.get('work_arrangement', ''),
+                'arrangement_strength': _LOCAL_CLAIM_CONFIDENCE if 'work_arrangement' in claims else 0.0
+            },
+            'availability': {
+                'availability_timeline': claims.get('availability', ''),
+                'availability_urgency': _LOCAL_CLAIM_CONFIDENCE if 'availability' in claims else 0.0
+            },
+            'experience_level': {
+                'experience_level_claim': claims.get('experience_level', ''),
+                'confidence_level': _LOCAL_CLAIM_CONFIDENCE if 'experience_level' in claims else 0.0
+            }
+        })
+        self._validate_analysis(analysis, job_requirements)
+        return analysis
+
+    def _get_cached_analysis(self, key: bytes) -> Optional[MultiDimensionalAnalysis]:
+        with self._analysis_cache_lock:
+            analysis = self._analysis_cache.get(key)
+            if analysis is None:
+                return None
+            self._analysis_cache.move_to_end(key)
+        # Callers get their own copy, so nothing they do to it leaks into later hits
+        return copy.deepcopy(analysis)
+
+    def _remember_analysis(self, key: bytes, analysis: MultiDimensionalAnalysis) -> None:
+        # Only successful analyses are stored, so a transient API error is retried on the next call
+        if self._analysis_cache_size <= 0:
+            return
+        snapshot = copy.deepcopy(analysis)
+        with self._analysis_cache_lock:
+            self._analysis_cache[key] = snapshot
+            self._analysis_cache.move_to_end(key)
+            while len(self._analysis_cache) > self._analysis_cache_size:
+                self._analysis_cache.popitem(last=False)
+
+    def _semantic_job_key(self, job_requirements: Dict[str, Any]) -> bytes:
+        return hashlib.blake2b(stable_json_bytes([self.model, job_requirements]), digest_size=16).digest()
+
+    def _find_similar_analysis(self, comments: str, job_requirements: Dict[str, Any]):
+        """(copy of the analysis of the most similar comments seen for this job, or None; the comments' embedding).
+        
+        Comments match when their embeddings' cosine similarity reaches semantic_threshold. Returns (None, None)
+        when the semantic tier is disabled or the embedding model is unavailable.
+        """
+        if self.semantic_threshold is None:
+            return None, None
+        if self._embedder is None:
+            self._embedder = EmbeddingSkillsMatcher()
+        embeddings = self._embedder.get_embeddings([comments])
+        if embeddings.size == 0:
+            return None, None
+        embedding = embeddings[0]
+        
+        with self._analysis_cache_lock:
+            entry = self._semantic_index.get(self._semantic_job_key(job_requirements))
+        if entry is None:
+            return None, embedding
+        matrix, analyses = entry
+        # Rows and query are unit-normalized, so the dot product is the cosine similarity
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.semantic_threshold:
+            return None, embedding
+        return copy.deepcopy(analyses[best]), embedding
+
+    def _index_similar_analysis(self, job_requirements: Dict[str, Any], embedding: Optional[np.ndarray],
+                                analysis: MultiDimensionalAnalysis) -> None:
+        if embedding is None:
+            return
+        key = self._semantic_job_key(job_requirements)
+        snapshot = copy.deepcopy(analysis)
+        with self._analysis_cache_lock:
+            matrix, analyses = self._semantic_index.get(key, (np.empty((0, embedding.shape[0])), []))
+            # Oldest entries are dropped first, so the index stays bounded per job and across jobs
+            limit = max(1, config.cache.comment_semantic_entries)
+            self._semantic_index[key] = (np.vstack([matrix, embedding])[-limit:], (analyses + [snapshot])[-limit:])
+            self._semantic_index.move_to_end(key)
+            while len(self._semantic_index) > config.cache.comment_semantic_jobs:
+                self._semantic_index.popitem(last=False)
+
+    def _analysis_request(self, prompt: str, batch_size: int = None) -> Dict[str, Any]:
+        """Request for one candidate's analysis, or a batch_size-candidate batch prompt"""
+        return {
+            'model': self.model,
+            'messages': [
+                self.SYSTEM_MESSAGE if batch_size is None else self.BATCH_SYSTEM_MESSAGE,
+                {"role": "user", "content": prompt}
+            ],
+            'response_format': _ANALYSIS_RESPONSE_FORMAT if batch_size is None else _BATCH_ANALYSIS_RESPONSE_FORMAT,
+            'temperature': 0.1,
+            'max_tokens': self.MAX_TOKENS_PER_ANALYSIS * (batch_size or 1)
+        }
+
+    def _request_analysis(self, prompt: str, batch_size: int = None) -> Dict[str, Any]:
+        response = self.openai_client.chat.completions.create(**self._analysis_request(prompt, batch_size))
+        return json_loads(response.choices[0].message.content)
+
+    def _get_async_client(self) -> AsyncOpenAI:
+        # Created on first use, so callers that only analyze synchronously never build an async client. The
+        # analyzer is shared process-wide but its pooled connections are bound to one event loop, so each new
+        # running loop gets a client of its own
+        loop = asyncio.get_running_loop()
+        if self._async_openai_client is None or self._async_client_loop is not loop:
+            self._async_client_loop = loop
+            self._async_openai_client = AsyncOpenAI(
+                api_key=os.getenv('OPENAI_API_KEY'), max_retries=0, timeout=_analysis_timeout(),
+                http_client=DefaultAsyncHttpxClient(limits=_analysis_pool_limits())
+            )
+        return self._async_openai_client
+
+    async def aclose(self) -> None:
+        """Close the async client's pooled connections while the loop they belong to still runs; a later async
+        analysis opens a new pool"""
+        client, loop = self._async_openai_client, self._async_client_loop
+        self._async_openai_client = self._async_client_loop = None
+        if client is not None and loop is asyncio.get_running_loop():
+            await client.close()
+
+    async def _request_analysis_async(self, prompt: str, batch_size: int = None) -> Dict[str, Any]:
+        response = await with_retries(
+            self._get_async_client().chat.completions.create, **self._analysis_request(prompt, batch_size)
+        )
+        return json_loads(response.choices[0].message.content)
+
+    async def analyze_comments_offline(self, comments_list: List[str], job_data: Dict[str, Any],
+                                       poll_interval: float = None) -> List[MultiDimensionalAnalysis]:
+        """analyze_comments for one job's candidates through the OpenAI Batch API, for offline runs.
+        
+        Half the price of realtime calls and a separate rate-limit pool, at up to 24h turnaround. Cached
+        analyses are reused; candidates whose batch request failed are analyzed in realtime instead.
+        """
+        job_requirements = self._extract_job_requirements(job_data)
+        analyses: Dict[int, MultiDimensionalAnalysis] = {}
+        cache_keys: Dict[int, bytes] = {}
+        for index, comments in enumerate(comments_list):
+            if comments and comments.strip():
+                cache_keys[index] = self._analysis_cache_key(comments, job_requirements)
+                cached = self._known_analysis(cache_keys[index], comments, job_requirements)
+                if cached is not None:
+                    analyses[index] = cached
+        pending = [index for index in cache_keys if index not in analyses]
+        
+        outputs = {}
+        if pending:
+            requests = {
+                f"comments-{index}": self._analysis_request(self._create_analysis_prompt(comments_list[index], job_requirements))
+                for index in pending
+            }
+            try:
+                outputs = await run_chat_batch(self._get_async_client(), requests, "comment_batch.jsonl", poll_interval)
+            except Exception as e:
+                logger.error("OpenAI batch comment analysis failed, analyzing in realtime instead: %s", e)
+        
+        for index in pending:
+            line = outputs.get(f"comments-{index}")
+            if line is None:
+                continue
+            try:
+                result = json_loads(batch_response_body(line)['choices'][0]['message']['content'])
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                logger.warning("Analyzing comments-%s in realtime: %s", index, e)
+                continue
+            analysis = self._parse_multi_dimensional_response(result)
+            self._validate_analysis(analysis, job_requirements)
+            self._remember_analysis(cache_keys[index], analysis)
+            analyses[index] = analysis
+        
+        # Candidates the batch did not cover are analyzed in realtime, concurrently up to the request limit
+        missing = [index for index in range(len(comments_list)) if index not in analyses]
+        fallbacks = await self.analyze_comments_many_async([comments_list[index] for index in missing], job_data)
+        analyses.update(zip(missing, fallbacks))
+        return [analyses[index] for index in range(len(comments_list))]
+
+    def _validate_analysis(self, multi_analysis: MultiDimensionalAnalysis, job_requirements: Dict[str, Any]):
         # Validate each dimension against job requirements
         self._validate_technical_alignment(multi_analysis.technical, job_requirements)
         self._validate_work_arrangement_alignment(multi_analysis.work_arrangement, job_requirements)
         self._validate_availability_alignment(multi_analysis.availability, job_requirements)
         self._validate_role_focus_alignment(multi_analysis.role_focus, job_requirements)
         self._validate_experience_level_alignment(multi_analysis.experience_level, job_requirements)
-        
-        return multi_analysis
 
     def _extract_job_requirements(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract key requirements from job data for validation"""
-        description = job_data.get('description', '').lower()
-        title = job_data.get('title', '').lower()
-        
-        # Extract technical requirements
-        tech_keywords = ['python', 'javascript', 'java', 'react', 'angular', 'vue', 'django', 'flask', 
-                        'spring', 'node.js', 'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'sql', 
-                        'postgresql', 'mysql', 'mongodb', 'redis', 'git', 'ci/cd', 'rest', 'api']
-        
-        required_tech = []
-        preferred_tech = []
-        
-        for tech in tech_keywords:
-            if any(phrase in description for phrase in [f'required {tech}', f'must have {tech}', f'{tech} required']):
-                required_tech.append(tech)
-            elif tech in description:
-                preferred_tech.append(tech)
-        
-        # Extract work arrangement
-        work_arrangement = 'flexible'
-        if any(word in description for word in ['remote', 'work from home', 'distributed']):
-            work_arrangement = 'remote'
-        elif any(word in description for word in ['office', 'onsite', 'on-site', 'in-person']):
-            work_arrangement = 'onsite'
-        elif any(word in description for word in ['hybrid']):
-            work_arrangement = 'hybrid'
-        
-        # Extract experience level
-        experience_level = 'mid'
-        if any(word in title.lower() for word in ['senior', 'lead', 'principal', 'staff']):
-            experience_level = 'senior'
-        elif any(word in title.lower() for word in ['junior', 'entry', 'graduate', 'intern']):
-            experience_level = 'junior'
-        
-        # Check for years of experience
-        exp_match = re.search(r'(\d+)[\+\-]?\s*(?:years?|yrs?)', description)
-        required_years = int(exp_match.group(1)) if exp_match else 0
-        
-        return {
-            'required_tech': required_tech,
-            'preferred_tech': preferred_tech,
-            'work_arrangement': work_arrangement,
-            'experience_level': experience_level,
-            'required_years': required_years,
-            'description': description,
-            'title': title
-        }
+        """Extract key requirements from job data for validation; computed once per job (treat as read-only)"""
+        return _job_requirements(job_data.get('description', ''), job_data.get('title', ''))
+
+    def _prompt_comments(self, comments: str) -> str:
+        """Comments as embedded in the prompt: whitespace collapsed and capped at MAX_COMMENT_CHARS"""
+        return _WHITESPACE_RE.sub(' ', comments).strip()[:self.MAX_COMMENT_CHARS]
 
     def _create_analysis_prompt(self, comments: str, job_requirements: Dict[str, Any]) -> str:
-        return f"""Analyze the candidate's comments for specific claims across 5 dimensions. Extract concrete claims, not general sentiments.
-
-Job Requirements Context:
-- Required Tech: {job_requirements.get('required_tech', [])}
-- Preferred Tech: {job_requirements.get('preferred_tech', [])}
-- Work Arrangement: {job_requirements.get('work_arrangement', 'flexible')}
-- Experience Level: {job_requirements.get('experience_level', 'mid')}
-- Required Years: {job_requirements.get('required_years', 0)}
-
-Candidate Comments: "{comments}"
-
-Extract specific claims and rate confidence (0-1 scale):
-
-Return JSON:
-{{
-    "technical": {{
-        "claimed_skills": ["skill1", "skill2"],
-        "experience_claims": ["claim1", "claim2"], 
-        "technical_confidence": 0.0-1.0
-    }},
-    "work_arrangement": {{
-        "preferred_arrangement": "remote/hybrid/onsite/flexible",
-        "arrangement_strength": 0.0-1.0
-    }},
-    "availability": {{
-        "availability_timeline": "immediate/weeks/months/flexible",
-        "availability_urgency": 0.0-1.0
-    }},
-    "role_focus": {{
-        "role_interests": ["interest1", "interest2"],
-        "focus_areas": ["area1", "area2"]
-    }},
-    "experience_level": {{
-        "experience_level_claim": "junior/mid/senior/expert",
-        "confidence_level": 0.0-1.0
-    }}
-}}
-
-Only extract concrete claims. Empty arrays for no specific claims."""
+        return _ANALYSIS_PROMPT.substitute(job_requirements, comments=self._prompt_comments(comments))
+
+    def _create_batch_analysis_prompt(self, comments_list: List[str], job_requirements: Dict[str, Any]) -> str:
+        candidates = "\n".join(
+            f'Candidate {number}: "{self._prompt_comments(comments)}"' for number, comments in enumerate(comments_list, 1)
+        )
+        return _BATCH_ANALYSIS_PROMPT.substitute(job_requirements, candidates=candidates)
 
     def _parse_multi_dimensional_response(self, response: Dict) -> MultiDimensionalAnalysis:
         """Parse GPT response into structured multi-dimensional analysis"""
-        technical_data = response.get('technical', {})
-        work_data = response.get('work_arrangement', {})
-        availability_data = response.get('availability', {})
-        role_data = response.get('role_focus', {})
-        experience_data = response.get('experience_level', {})
+        # Missing (or null) sections, lists and numbers fall back to empty values
+        technical_data = response.get('technical') or {}
+        work_data = response.get('work_arrangement') or {}
+        availability_data = response.get('availability') or {}
+        role_data = response.get('role_focus') or {}
+        experience_data = response.get('experience_level') or {}
         
         return MultiDimensionalAnalysis(
             technical=TechnicalAlignment(
-                claimed_skills=technical_data.get('claimed_skills', []),
-                experience_claims=technical_data.get('experience_claims', []),
-                technical_confidence=float(technical_data.get('technical_confidence', 0))
+                claimed_skills=technical_data.get('claimed_skills') or [],
+                experience_claims=technical_data.get('experience_claims') or [],
+                technical_confidence=float(technical_data.get('technical_confidence') or 0.0)
             ),
             work_arrangement=WorkArrangementAlignment(
                 preferred_arrangement=work_data.get('preferred_arrangement', ''),
-                arrangement_strength=float(work_data.get('arrangement_strength', 0))
+                arrangement_strength=float(work_data.get('arrangement_strength') or 0.0)
             ),
             availability=AvailabilityAlignment(
                 availability_timeline=availability_data.get('availability_timeline', ''),
-                availability_urgency=float(availability_data.get('availability_urgency', 0))
+                availability_urgency=float(availability_data.get('availability_urgency') or 0.0)
             ),
             role_focus=RoleFocusAlignment(
-                role_interests=role_data.get('role_interests', []),
-                focus_areas=role_data.get('focus_areas', [])
+                role_interests=role_data.get('role_interests') or [],
+                focus_areas=role_data.get('focus_areas') or []
             ),
             experience_level=ExperienceLevelAlignment(
                 experience_level_claim=experience_data.get('experience_level_claim', ''),
-                confidence_level=float(experience_data.get('confidence_level', 0))
+                confidence_level=float(experience_data.get('confidence_level') or 0.0)
             )
         )
 
@@ -250,19 +827,24 @@ Only extract concrete claims. Empty arrays for no specific claims."""
             return
         
         # Calculate skill overlap - ONLY reward actual matches
-        claimed_lower = [skill.lower() for skill in technical.claimed_skills]
+        claimed_lower = {skill.lower() for skill in technical.claimed_skills}
+        # Every claimed skill in one string, so "tech within a claimed skill" is a single substring search
+        claimed_text = '\x00'.join(claimed_lower)
         
-        # Check for exact matches only
-        required_matches = sum(1 for tech in required_tech if tech.lower() in claimed_lower)
-        preferred_matches = sum(1 for tech in preferred_tech if tech.lower() in claimed_lower)
+        def _count_matches(techs: List[str]):
+            # Exact matches, and partial/related matches (substring either way, which includes exact ones)
+            exact = partial = 0
+            for tech in techs:
+                tech = tech.lower()
+                if tech in claimed_lower:
+                    exact += 1
+                    partial += 1
+                elif claimed_lower and (tech in claimed_text or any(skill in tech for skill in claimed_lower)):
+                    partial += 1
+            return exact, partial
         
-        # Check for partial/related matches (substring matching)
-        partial_required = sum(1 for tech in required_tech 
-                             if any(tech.lower() in skill or skill in tech.lower() 
-                                   for skill in claimed_lower))
-        partial_preferred = sum(1 for tech in preferred_tech 
-                              if any(tech.lower() in skill or skill in tech.lower() 
-                                    for skill in claimed_lower))
+        required_matches, partial_required = _count_matches(required_tech)
+        preferred_matches, partial_preferred = _count_matches(preferred_tech)
         
         # Calculate scores - ONLY if there are actual matches
         if required_tech:
@@ -302,19 +884,10 @@ Only extract concrete claims. Empty arrays for no specific claims."""
         user_pref = work.preferred_arrangement.lower()
         
         # ONLY reward actual alignment - no participation points
-        if user_pref == job_arrangement:
-            work.alignment_score = 1.0
-        elif (user_pref == 'flexible') or (job_arrangement == 'flexible'):
-            work.alignment_score = 0.8
-        elif (user_pref == 'hybrid' and job_arrangement in ['remote', 'onsite']):
-            work.alignment_score = 0.6
-        elif (user_pref == 'remote' and job_arrangement == 'hybrid'):
-            work.alignment_score = 0.7
-        elif (user_pref == 'onsite' and job_arrangement == 'hybrid'):
-            work.alignment_score = 0.5
-        else:
-            # NO POINTS for misaligned preferences
-            work.alignment_score = 0.0
+        work.alignment_score = _WORK_COMPAT.get(
+            (user_pref, job_arrangement),
+            _FLEXIBLE_WORK_SCORE if 'flexible' in (user_pref, job_arrangement) else 0.0
+        )
         
         # Apply strength multiplier
         work.alignment_score *= work.arrangement_strength
@@ -327,15 +900,12 @@ Only extract concrete claims. Empty arrays for no specific claims."""
         
         timeline = availability.availability_timeline.lower()
         
-        # Check if job mentions urgency
-        job_desc = job_req.get('description', '').lower()
-        urgent_keywords = ['urgent', 'immediate', 'asap', 'start immediately', 'right away']
-        job_is_urgent = any(keyword in job_desc for keyword in urgent_keywords)
+        job_is_urgent = job_req.get('job_is_urgent', False)
         
         # ONLY reward appropriate availability - no participation points
         if timeline == 'immediate':
             availability.alignment_score = 1.0
-        elif timeline in ['weeks', 'flexible']:
+        elif timeline in ('weeks', 'flexible'):
             availability.alignment_score = 0.8 if not job_is_urgent else 0.7
         elif timeline == 'months':
             # Give points only if job is NOT urgent
@@ -352,25 +922,12 @@ Only extract concrete claims. Empty arrays for no specific claims."""
             role_focus.alignment_score = 0.0
             return
         
-        job_title = job_req.get('title', '').lower()
-        job_desc = job_req.get('description', '').lower()
-        
-        # Look for role-specific keywords
-        role_keywords = {
-            'frontend': ['frontend', 'front-end', 'ui', 'ux', 'react', 'angular', 'vue', 'css', 'html', 'javascript'],
-            'backend': ['backend', 'back-end', 'api', 'server', 'database', 'microservices', 'rest'],
-            'fullstack': ['fullstack', 'full-stack', 'full stack'],
-            'data': ['data', 'analytics', 'machine learning', 'ml', 'ai', 'analysis', 'scientist'],
-            'devops': ['devops', 'infrastructure', 'deployment', 'ci/cd', 'docker', 'kubernetes', 'aws'],
-            'mobile': ['mobile', 'ios', 'android', 'react native', 'flutter', 'app'],
-            'web': ['web', 'website', 'application', 'development']
-        }
-        
         # Determine job focus
-        job_focus = []
-        for focus_type, keywords in role_keywords.items():
-            if any(keyword in job_title or keyword in job_desc for keyword in keywords):
-                job_focus.append(focus_type)
+        job_role_focus = job_req.get('role_focus', ())
+        job_focus = [
+            (keyword_re, keywords_text) for focus_type, keyword_re, keywords_text in _ROLE_KEYWORD_MATCHERS
+            if focus_type in job_role_focus
+        ]
         
         # If we can't determine job focus, NO POINTS
         if not job_focus:
@@ -381,15 +938,12 @@ Only extract concrete claims. Empty arrays for no specific claims."""
         user_interests = [interest.lower() for interest in role_focus.role_interests + role_focus.focus_areas]
         user_text = ' '.join(user_interests)
         
-        alignment_count = 0
         total_checks = len(job_focus)
-        
-        for focus_type in job_focus:
-            keywords = role_keywords[focus_type]
-            # Check for exact keyword matches or partial matches
-            if any(keyword in user_text or any(user_word in keyword for user_word in user_interests) 
-                   for keyword in keywords):
-                alignment_count += 1
+        # Exact keyword matches, or partial matches where an interest appears within a keyword
+        alignment_count = sum(
+            1 for keyword_re, keywords_text in job_focus
+            if keyword_re.search(user_text) or any(user_word in keywords_text for user_word in user_interests)
+        )
         
         # Calculate alignment - NO PARTICIPATION POINTS
         if alignment_count > 0:
@@ -407,68 +961,61 @@ Only extract concrete claims. Empty arrays for no specific claims."""
         job_level = job_req.get('experience_level', 'mid')
         user_level = experience.experience_level_claim.lower()
         
-        # Strict level compatibility matrix - NO PARTICIPATION POINTS
-        level_scores = {
-            ('junior', 'junior'): 1.0,
-            ('junior', 'mid'): 0.6,     # Some points for junior applying to mid-level
-            ('junior', 'senior'): 0.0,  # NO POINTS for junior applying to senior
-            ('mid', 'junior'): 0.0,     # NO POINTS for overqualification
-            ('mid', 'mid'): 1.0,
-            ('mid', 'senior'): 0.5,     # Some points for mid applying to senior
-            ('senior', 'junior'): 0.0,  # NO POINTS for overqualification
-            ('senior', 'mid'): 0.0,     # NO POINTS for overqualification
-            ('senior', 'senior'): 1.0,
-            ('expert', 'senior'): 1.0,
-            ('expert', 'mid'): 0.0,     # NO POINTS for overqualification
-            ('expert', 'junior'): 0.0   # NO POINTS for overqualification
-        }
-        
-        base_score = level_scores.get((user_level, job_level), 0.0)  # Default 0 instead of 0.6
+        user_index = _LEVEL_INDEX.get(user_level)
+        job_index = _LEVEL_INDEX.get(job_level)
+        # Default 0 instead of 0.6
+        base_score = 0.0 if user_index is None or job_index is None else _LEVEL_SCORES[user_index][job_index]
         
         # Apply confidence multiplier
         experience.alignment_score = base_score * experience.confidence_level
 
 
-def calculate_multi_dimensional_bonuses(analysis: MultiDimensionalAnalysis, dynamic_weights: Dict[str, float] = None) -> Dict[str, float]:
-    """Calculate weighted bonuses based on multi-dimensional alignment scores with dynamic weights"""
-    bonuses = {}
-    
+# (bonus key, analysis field, comment weight key) per dimension, in a fixed order for the batched path
+_BONUS_DIMENSIONS = (
+    ('technical_alignment', 'technical', 'technical_skills'),
+    ('work_arrangement', 'work_arrangement', 'work_arrangement'),
+    ('availability', 'availability', 'availability'),
+    ('role_focus', 'role_focus', 'role_focus'),
+    ('experience_level', 'experience_level', 'experience_level'),
+)
+
+def _bonus_maxima(dynamic_weights: Optional[Dict[str, float]]) -> List[float]:
+    """Maximum bonus per dimension, in _BONUS_DIMENSIONS order"""
     # Always use dynamic weights - if not provided, use equal distribution
     max_total_bonus = 20  # Total possible bonus points
     
     if dynamic_weights:
-        technical_max = dynamic_weights.get('technical_skills', 0.2) * max_total_bonus
-        work_max = dynamic_weights.get('work_arrangement', 0.2) * max_total_bonus
-        availability_max = dynamic_weights.get('availability', 0.2) * max_total_bonus
-        role_max = dynamic_weights.get('role_focus', 0.2) * max_total_bonus
-        experience_max = dynamic_weights.get('experience_level', 0.2) * max_total_bonus
-    else:
-        # Equal distribution fallback - no hardcoded preferences
-        equal_weight = 0.2  # 1/5 dimensions
-        technical_max = equal_weight * max_total_bonus
-        work_max = equal_weight * max_total_bonus
-        availability_max = equal_weight * max_total_bonus
-        role_max = equal_weight * max_total_bonus
-        experience_max = equal_weight * max_total_bonus
-    
-    # Calculate bonuses with dynamic or static weights
-    if analysis.technical.alignment_score > 0:
-        bonuses['technical_alignment'] = analysis.technical.alignment_score * technical_max
-    
-    if analysis.work_arrangement.alignment_score > 0:
-        bonuses['work_arrangement'] = analysis.work_arrangement.alignment_score * work_max
-    
-    if analysis.availability.alignment_score > 0:
-        bonuses['availability'] = analysis.availability.alignment_score * availability_max
-    
-    if analysis.role_focus.alignment_score > 0:
-        bonuses['role_focus'] = analysis.role_focus.alignment_score * role_max
-    
-    if analysis.experience_level.alignment_score > 0:
-        bonuses['experience_level'] = analysis.experience_level.alignment_score * experience_max
+        return [dynamic_weights.get(weight_key, 0.2) * max_total_bonus for _, _, weight_key in _BONUS_DIMENSIONS]
+    # Equal distribution fallback - no hardcoded preferences
+    equal_weight = 0.2  # 1/5 dimensions
+    return [equal_weight * max_total_bonus] * len(_BONUS_DIMENSIONS)
+
+def calculate_multi_dimensional_bonuses(analysis: MultiDimensionalAnalysis, dynamic_weights: Dict[str, float] = None) -> Dict[str, float]:
+    """Calculate weighted bonuses based on multi-dimensional alignment scores with dynamic weights"""
+    bonuses = {}
+    for (bonus_key, attr, _), maximum in zip(_BONUS_DIMENSIONS, _bonus_maxima(dynamic_weights)):
+        alignment_score = getattr(analysis, attr).alignment_score
+        # Only dimensions with actual alignment earn a bonus
+        if alignment_score > 0:
+            bonuses[bonus_key] = alignment_score * maximum
     
     return bonuses
 
+def calculate_multi_dimensional_bonuses_batch(analyses: List[MultiDimensionalAnalysis],
+                                              dynamic_weights: Dict[str, float] = None) -> List[Dict[str, float]]:
+    """calculate_multi_dimensional_bonuses for many candidates sharing one job's weights, as one (N, 5) array product"""
+    fields = [attr for _, attr, _ in _BONUS_DIMENSIONS]
+    scores = np.array(
+        [[getattr(analysis, attr).alignment_score for attr in fields] for analysis in analyses], dtype=float
+    ).reshape(len(analyses), len(fields))
+    bonuses = scores * np.array(_bonus_maxima(dynamic_weights))
+    
+    keys = [bonus_key for bonus_key, _, _ in _BONUS_DIMENSIONS]
+    return [
+        {key: bonus for key, bonus, earned in zip(keys, row.tolist(), earned_row.tolist()) if earned}
+        for row, earned_row in zip(bonuses, scores > 0)
+    ]
+
 
 def generate_multi_dimensional_feedback(analysis: MultiDimensionalAnalysis, bonuses: Dict[str, float]) -> str:
     """Generate detailed feedback based on multi-dimensional analysis"""
@@ -537,30 +1084,38 @@ def generate_multi_dimensional_feedback(analysis: MultiDimensionalAnalysis, bonu
     return " | ".join(feedback_parts)
 
 
-def process_user_comments(comments: str, job_data: Dict[str, Any], dynamic_weights: Dict[str, float] = None) -> Dict[str, Any]:
-    """Process user comments using multi-dimensional analysis with dynamic weights"""
-    if not comments or not comments.strip():
-        return {
-            "multi_dimensional_analysis": {},
-            "alignment_scores": {},
-            "scoring_adjustments": {},
-            "structured_feedback": "No context provided",
-            "total_bonus": 0
-        }
-    
-    analyzer = GPTMultiDimensionalAnalyzer()
-    analysis = analyzer.analyze_comments(comments, job_data)
-    
-    # Get dynamic comment weights if not provided
-    if dynamic_weights is None:
-        from .dynamic_weights import DynamicWeightCalculator
-        weight_calculator = DynamicWeightCalculator()
-        try:
-            dynamic_weights = weight_calculator.calculate_comment_weights(job_data)
-        except Exception:
-            dynamic_weights = None  # Will use fallback weights
-    
-    bonuses = calculate_multi_dimensional_bonuses(analysis, dynamic_weights)
+@lru_cache(maxsize=1)
+def _get_analyzer() -> GPTMultiDimensionalAnalyzer:
+    # One analyzer per process, so every comment analysis reuses the same client and its HTTP connection pool
+    return GPTMultiDimensionalAnalyzer()
+
+async def close_comment_analyzer() -> None:
+    """Close the shared analyzer's async connections, if an analyzer was ever created"""
+    if _get_analyzer.cache_info().currsize:
+        await _get_analyzer().aclose()
+
+def _empty_comment_result() -> Dict[str, Any]:
+    return {
+        "multi_dimensional_analysis": {},
+        "alignment_scores": {},
+        "scoring_adjustments": {},
+        "structured_feedback": "No context provided",
+        "total_bonus": 0
+    }
+
+@lru_cache(maxsize=1)
+def _get_weight_calculator():
+    # One calculator per process, so its OpenAI client, connection pool and per-job weights cache are reused
+    from .dynamic_weights import DynamicWeightCalculator
+    return DynamicWeightCalculator()
+
+def _get_comment_weights(job_data: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    try:
+        return _get_weight_calculator().calculate_comment_weights(job_data)
+    except Exception:
+        return None  # Will use fallback weights
+
+def _summarize_comment_analysis(analysis: MultiDimensionalAnalysis, bonuses: Dict[str, float]) -> Dict[str, Any]:
     feedback = generate_multi_dimensional_feedback(analysis, bonuses)
     
     # Extract alignment scores
@@ -573,9 +1128,73 @@ def process_user_comments(comments: str, job_data: Dict[str, Any], dynamic_weigh
     }
     
     return {
-        "multi_dimensional_analysis": asdict(analysis),
+        "multi_dimensional_analysis": analysis.to_dict(),
         "alignment_scores": alignment_scores,
         "scoring_adjustments": bonuses,
         "structured_feedback": feedback,
         "total_bonus": sum(bonuses.values())
-    }
\ No newline at end of file
+    }
+
+def process_user_comments(comments: str, job_data: Dict[str, Any], dynamic_weights: Dict[str, float] = None) -> Dict[str, Any]:
+    """Process user comments using multi-dimensional analysis with dynamic weights"""
+    if not comments or not comments.strip():
+        return _empty_comment_result()
+    
+    analysis = _get_analyzer().analyze_comments(comments, job_data)
+    
+    # Get dynamic comment weights if not provided
+    if dynamic_weights is None:
+        dynamic_weights = _get_comment_weights(job_data)
+    
+    return _summarize_comment_analysis(analysis, calculate_multi_dimensional_bonuses(analysis, dynamic_weights))
+
+async def process_user_comments_async(comments: str, job_data: Dict[str, Any],
+                                      dynamic_weights: Dict[str, float] = None) -> Dict[str, Any]:
+    """process_user_comments with the analysis awaited on the async client instead of blocking a thread"""
+    if not comments or not comments.strip():
+        return _empty_comment_result()
+    
+    analysis = await _get_analyzer().analyze_comments_async(comments, job_data)
+    if dynamic_weights is None:
+        dynamic_weights = await asyncio.to_thread(_get_comment_weights, job_data)
+    
+    return _summarize_comment_analysis(analysis, calculate_multi_dimensional_bonuses(analysis, dynamic_weights))
+
+async def process_user_comments_many_async(items: List[Tuple[str, Dict[str, Any]]],
+                                           max_concurrency: int = None) -> List[Dict[str, Any]]:
+    """process_user_comments for (comments, job_data) pairs concurrently, at most max_concurrency analyses in flight.
+    
+    Comment weights are fetched once per distinct job and shared by its candidates.
+    """
+    analyzer = _get_analyzer()
+    semaphore = asyncio.Semaphore(max_concurrency or config.api.max_concurrent_requests)
+    weights_by_job: Dict[bytes, asyncio.Future] = {}
+    
+    async def _process(comments: str, job_data: Dict[str, Any]) -> Dict[str, Any]:
+        if not comments or not comments.strip():
+            return _empty_comment_result()
+        job_key = stable_json_bytes(job_data)
+        if job_key not in weights_by_job:
+            weights_by_job[job_key] = asyncio.ensure_future(asyncio.to_thread(_get_comment_weights, job_data))
+        analysis, dynamic_weights = await asyncio.gather(
+            analyzer.analyze_comments_async(comments, job_data, semaphore), weights_by_job[job_key]
+        )
+        return _summarize_comment_analysis(analysis, calculate_multi_dimensional_bonuses(analysis, dynamic_weights))
+    
+    return list(await asyncio.gather(*(_process(comments, job_data) for comments, job_data in items)))
+
+def process_user_comments_batch(comments_list: List[str], job_data: Dict[str, Any],
+                                dynamic_weights: Dict[str, float] = None) -> List[Dict[str, Any]]:
+    """process_user_comments for several candidates applying to one job, sharing model calls between them"""
+    if not any(comments and comments.strip() for comments in comments_list):
+        return [_empty_comment_result() for _ in comments_list]
+    
+    analyses = _get_analyzer().analyze_comments_batch(comments_list, job_data)
+    if dynamic_weights is None:
+        dynamic_weights = _get_comment_weights(job_data)
+    
+    bonuses = calculate_multi_dimensional_bonuses_batch(analyses, dynamic_weights)
+    return [
+        _summarize_comment_analysis(analysis, analysis_bonuses) if comments and comments.strip() else _empty_comment_result()
+        for comments, analysis, analysis_bonuses in zip(comments_list, analyses, bonuses)
+    ]